@@ -1,13 +1,21 @@
 import streamlit as st
 import uuid
-from src.workflow import app
+from src.resources import resources
+from src.agents import split_summary_and_roadmap
+from src.followup import FOLLOWUP_NODES, FollowupStreamFilter
+from src.memory import ConversationMemory
+from src.trace import StreamlitTrace, use_trace
+from src.instrumentation import MetricsCallback, metrics
+from src.config import MEMORY_WINDOW_SIZE, MEMORY_MAX_TOKENS, MEMORY_SUMMARY_TOKENS
 from langchain.callbacks.streamlit import StreamlitCallbackHandler
-from langchain_core.messages import HumanMessage
 
 # Config
 st.set_page_config(page_title="OBC Project Assistant", layout="wide")
 st.title("🏡 OBC Project Assistant")
 
+# Builds the graph, clients and caches once per process while the page renders; later reruns skip this.
+resources.warmup(background=True)
+
 # Initialize session state
 if "thread_id" not in st.session_state:
     st.session_state.thread_id = str(uuid.uuid4())
@@ -15,9 +23,16 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "history_list" not in st.session_state:
     st.session_state.history_list = []
+if "memory" not in st.session_state:
+    st.session_state.memory = ConversationMemory(
+        window_size=MEMORY_WINDOW_SIZE, max_tokens=MEMORY_MAX_TOKENS, summary_tokens=MEMORY_SUMMARY_TOKENS
+    )
 
 def clear_chat():
     st.session_state.messages = []
+    st.session_state.memory.clear()
+    # A new thread, so nothing researched before the clear is reused.
+    st.session_state.thread_id = str(uuid.uuid4())
 
 st.sidebar.button("Clear Chat", on_click=clear_chat)
 
@@ -42,39 +57,79 @@ if prompt := st.chat_input("Your Project Query"):
     st.chat_message("user").markdown(prompt)
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    # Build history prompt
-    prev = [m["content"] for m in st.session_state.messages[:-1] if m["role"] == "user"]
-    formatted = "\n".join(f"- {msg}" for msg in prev)
-    combined = f"""Previous Messages:\n{formatted}\n\nLatest Message:\n{prompt}"""
+    # Build a bounded history prompt (sliding window + rolling summary)
+    memory = st.session_state.memory
+    memory.add_user_message(prompt)
+    combined = memory.render(prompt)
 
+    app = resources.graph
     cb = StreamlitCallbackHandler(st.container())
     initial_state = {
         "user_input": combined,
-        "messages": [HumanMessage(content=combined)],
-        "project_type": "unknown",
-        "city": "unknown",
-        "geo_state": "unknown",
+        # Project details carried over from earlier turns; nodes only overwrite them with new findings.
+        **memory.project(),
         "legal_info_found": False,
         "legal_summary": "",
         "suggested_websites": [],
         "project_roadmap": "",
         "route_decision": ""
     }
-    config = {"configurable": {"thread_id": st.session_state.thread_id}, "callbacks": [cb]}
+    config = {"configurable": {"thread_id": st.session_state.thread_id}, "callbacks": [cb, MetricsCallback()]}
 
-    try:
-        for _ in app.stream(initial_state, config=config, stream_mode="debug"):
-            pass
-        final = app.get_state(config).values
-        roadmap = final.get("project_roadmap", "No roadmap generated.")
-    except Exception as e:
-        st.error(f"Execution error: {e}")
-        roadmap = "Roadmap generation failed."
+    # Nodes whose LLM tokens are rendered live as they arrive.
+    answer_nodes = {"generate_roadmap", "handle_general_query"}
+    followup_filters = {node: FollowupStreamFilter() for node in FOLLOWUP_NODES}
+    summary_nodes = {"analyze_and_summarize"} if st.session_state.get("stream_summary") else set()
+
+    with st.chat_message("assistant"):
+        summary_placeholder = st.empty()
+        answer_placeholder = st.empty()
+        summary_text, answer_text, combined_text = "", "", ""
+        try:
+            with use_trace(StreamlitTrace()):
+                for message_chunk, metadata in app.stream(initial_state, config=config, stream_mode="messages"):
+                    node = metadata.get("langgraph_node")
+                    token = message_chunk.content if isinstance(message_chunk.content, str) else ""
+                    if not token:
+                        continue
+                    if node in followup_filters:
+                        # Held back until it is clear the reply is an answer, not a search request.
+                        token = followup_filters[node].feed(token)
+                        if token:
+                            answer_text += token
+                            answer_placeholder.markdown(answer_text + "▌")
+                    elif node in answer_nodes:
+                        answer_text += token
+                        answer_placeholder.markdown(answer_text + "▌")
+                    elif node in summary_nodes:
+                        summary_text += token
+                        summary_placeholder.info(summary_text)
+                    elif node == "summarize_and_plan":
+                        # Single-call mode: the roadmap section follows the summary section.
+                        combined_text += token
+                        summary_text, answer_text = split_summary_and_roadmap(combined_text)
+                        if answer_text:
+                            answer_placeholder.markdown(answer_text + "▌")
+                        if st.session_state.get("stream_summary"):
+                            summary_placeholder.info(summary_text)
+            final = app.get_state(config).values
+            roadmap = final.get("project_roadmap", "No roadmap generated.")
+            memory.update_project(final.get("project_type"), final.get("city"), final.get("geo_state"))
+        except Exception as e:
+            st.error(f"Execution error: {e}")
+            roadmap = "Roadmap generation failed."
+        answer_placeholder.markdown(roadmap)
 
-    st.chat_message("assistant").markdown(roadmap)
     st.session_state.messages.append({"role": "assistant", "content": roadmap})
     # Save to history
     st.session_state.history_list.append({"query": prompt, "answer": roadmap})
 
 # Sidebar verbose toggle
 st.sidebar.checkbox("Show Detailed Agent Trace", key="verbose_output")
+st.sidebar.checkbox("Stream Legal Summary", key="stream_summary")
+
+with st.sidebar.expander("Latency (this process)"):
+    for kind, timings in metrics.snapshot()["latency"].items():
+        st.markdown(f"**{kind}**")
+        for name, timing in sorted(timings.items(), key=lambda item: -item[1]["sum"]):
+            st.caption(f"{name}: {timing['count']} runs, mean {timing['mean'] * 1000:.0f} ms")
@@ -0,0 +1,93 @@
+"""Concurrent checkpoint load: the stock SqliteSaver (one shared connection behind a lock)
+against PooledSqliteSaver (pooled WAL connections, compression, blob dedupe).
+
+Each simulated session runs a small graph whose steps carry the same search-result payload
+the legal path checkpoints, on its own thread_id. Run from the repository root:
+
+    python -m benchmarks.bench_checkpoint --sessions 32 --turns 5 --concurrency 16
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, TypedDict
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import StateGraph, END
+
+from src.checkpoint import PooledSqliteSaver
+
+FIXTURE = Path(__file__).parent / "fixtures" / "search_results_adu_los_angeles.json"
+RESULTS = json.loads(FIXTURE.read_text())["tavily_search_results"] * 4  # ~25 results, like five full queries
+
+
+class State(TypedDict, total=False):
+    user_input: str
+    tavily_search_results: List[dict]
+    legal_summary: str
+    project_roadmap: str
+
+
+def build_graph(checkpointer):
+    graph = StateGraph(State)
+    graph.add_node("search", lambda state: {"tavily_search_results": RESULTS})
+    graph.add_node("summarize", lambda state: {"legal_summary": "Summary. " * 200})
+    graph.add_node("roadmap", lambda state: {"project_roadmap": "Phase. " * 400})
+    graph.set_entry_point("search")
+    graph.add_edge("search", "summarize")
+    graph.add_edge("summarize", "roadmap")
+    graph.add_edge("roadmap", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run(name: str, checkpointer, path: str, sessions: int, turns: int, concurrency: int):
+    app = build_graph(checkpointer)
+    latencies = []
+
+    def session(i: int):
+        config = {"configurable": {"thread_id": f"bench-{i}"}}
+        for turn in range(turns):
+            start = time.perf_counter()
+            app.invoke({"user_input": f"turn {turn}"}, config=config)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(session, range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    # Fold the WAL back into the main file so the size reflects what is actually stored.
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(path)
+    latencies.sort()
+    print(f"{name:>18}: {sessions * turns / elapsed:7.1f} turns/s  "
+          f"p50 {statistics.median(latencies) * 1000:6.1f}ms  p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:6.1f}ms  "
+          f"db {size / 1024:8.0f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stock_path = os.path.join(tmp, "stock.db")
+        stock = SqliteSaver(sqlite3.connect(stock_path, check_same_thread=False))
+        run("SqliteSaver", stock, stock_path, args.sessions, args.turns, args.concurrency)
+
+        pooled_path = os.path.join(tmp, "pooled.db")
+        pooled = PooledSqliteSaver(pooled_path, prune_every=0)
+        run("PooledSqliteSaver", pooled, pooled_path, args.sessions, args.turns, args.concurrency)
+        pooled.pool.close()
+
+
+if __name__ == "__main__":
+    main()
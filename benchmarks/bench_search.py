@@ -0,0 +1,66 @@
+"""Serial vs. concurrent legal search fan-out against a local fake search tool.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_search --latency 0.8 --jitter 0.4 --rounds 5
+"""
+import argparse
+import statistics
+import time
+
+from src.search import run_search_queries
+
+from .fakes import FakeSearchTool
+
+
+QUERIES = [
+    "owner-builder rights Los Angeles, CA",
+    "ADU permit requirements Los Angeles, CA",
+    "zoning laws Los Angeles, CA ADU construction",
+    "local construction ordinances Los Angeles, CA",
+    "building codes ADU Los Angeles, CA",
+]
+
+
+def serial(tool) -> int:
+    found = 0
+    for query in QUERIES:
+        try:
+            found += len(tool.invoke({"query": query})["results"])
+        except Exception:
+            pass
+    return found
+
+
+def concurrent(tool, query_timeout: float, total_timeout: float) -> int:
+    outcomes = run_search_queries(tool, QUERIES, max_workers=len(QUERIES),
+                                  query_timeout=query_timeout, total_timeout=total_timeout)
+    return sum(len(o["response"]["results"]) for o in outcomes if o["response"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.8, help="mean fake search latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.4, help="uniform jitter around the mean (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--query-timeout", type=float, default=15.0)
+    parser.add_argument("--total-timeout", type=float, default=25.0)
+    args = parser.parse_args()
+
+    for name, run in (
+        ("serial", lambda tool: serial(tool)),
+        ("concurrent", lambda tool: concurrent(tool, args.query_timeout, args.total_timeout)),
+    ):
+        tool = FakeSearchTool(args.latency, args.jitter, args.failure_rate)
+        timings, found = [], 0
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            found += run(tool)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:>10}: mean {statistics.mean(timings):.3f}s  "
+              f"min {min(timings):.3f}s  max {max(timings):.3f}s  results {found / args.rounds:.1f}/round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Cold start and per-rerun overhead of the workflow and the Streamlit app.
+
+Every sample runs in a fresh interpreter, so imports and client construction are measured
+cold. Reported per sample (median over `--repeat` runs):
+
+  * import   - `import src.workflow` (should build nothing; see src/resources.py)
+  * warmup   - `resources.warmup()`, with the build time of each resource
+  * first    - time from process start until the compiled graph answers one (fake) query
+  * reruns   - Streamlit's AppTest running app.py once cold, then `--reruns` more times
+
+Run from the repository root (no API calls are made; keys only need to be set):
+
+    python -m benchmarks.bench_startup --repeat 5 --reruns 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE_IMPORT = """
+import time
+start = time.perf_counter()
+import src.workflow
+from src.resources import resources
+imported = time.perf_counter() - start
+start = time.perf_counter()
+builds = resources.warmup()
+print(json.dumps({"import": imported, "warmup": time.perf_counter() - start, "builds": builds}))
+"""
+
+PROBE_FIRST_QUERY = """
+import time
+start = time.perf_counter()
+from benchmarks.fakes import FakeChatModel, FakeSearchTool, Latency, install_fakes
+from src.resources import resources
+install_fakes(FakeChatModel(latency=Latency(0.0)), FakeSearchTool(0.0))
+state = {"user_input": "I want to build an ADU in Los Angeles, CA", "project_type": "unknown", "city": "unknown",
+         "geo_state": "unknown", "legal_info_found": False, "legal_summary": "", "suggested_websites": [],
+         "project_roadmap": "", "route_decision": ""}
+resources.graph.invoke(state, config={"configurable": {"thread_id": "startup"}})
+print(json.dumps({"first": time.perf_counter() - start}))
+"""
+
+PROBE_RERUNS = """
+import time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=120)
+start = time.perf_counter()
+app.run()
+cold = time.perf_counter() - start
+reruns = []
+for _ in range(RERUNS):
+    start = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - start)
+# app.py warms up on a daemon thread; let it finish before the interpreter exits.
+from src.resources import resources
+resources.warmup()
+print(json.dumps({"cold_render": cold, "reruns": reruns}))
+"""
+
+
+def probe(code: str, tmp: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "startup-bench")
+    env.setdefault("TAVILY_API_KEY", "startup-bench")
+    for name, filename in (("CHECKPOINT_PATH", "checkpoints.db"), ("SEARCH_CACHE_PATH", "search_cache.db"),
+                           ("LOCAL_CORPUS_PATH", "legal_corpus.db"), ("ANSWER_CACHE_PATH", "answer_cache.db"),
+                           ("QUERY_LOG_PATH", "query_log.db")):
+        env[name] = os.path.join(tmp, filename)
+    env.update({"METRICS_JSONL_PATH": "", "GROQ_REQUESTS_PER_MINUTE": "0", "GROQ_TOKENS_PER_MINUTE": "0",
+                "GROQ_LARGE_REQUESTS_PER_MINUTE": "0", "GROQ_LARGE_TOKENS_PER_MINUTE": "0"})
+    out = subprocess.run([sys.executable, "-c", "import json\n" + code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh processes per measurement")
+    parser.add_argument("--reruns", type=int, default=10, help="Streamlit reruns after the first render")
+    parser.add_argument("--skip-streamlit", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print the raw samples as JSON")
+    args = parser.parse_args()
+
+    samples = {"import": [], "warmup": [], "first": [], "cold_render": [], "rerun": []}
+    builds = {}
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = probe(PROBE_IMPORT, tmp)
+            samples["import"].append(result["import"])
+            samples["warmup"].append(result["warmup"])
+            for name, seconds in result["builds"].items():
+                builds.setdefault(name, []).append(seconds)
+        with tempfile.TemporaryDirectory() as tmp:
+            samples["first"].append(probe(PROBE_FIRST_QUERY, tmp)["first"])
+        if not args.skip_streamlit:
+            with tempfile.TemporaryDirectory() as tmp:
+                result = probe(PROBE_RERUNS.replace("RERUNS", str(args.reruns)), tmp)
+                samples["cold_render"].append(result["cold_render"])
+                samples["rerun"].extend(result["reruns"])
+
+    if args.json:
+        print(json.dumps({"samples": samples, "builds": builds}, indent=2))
+        return
+    for name, values in samples.items():
+        if values:
+            print(f"{name:>12}: median {statistics.median(values) * 1000:8.1f} ms  "
+                  f"max {max(values) * 1000:8.1f} ms  (n={len(values)})")
+    print("resource builds (median):")
+    for name, values in sorted(builds.items(), key=lambda item: -statistics.median(item[1])):
+        print(f"  {name:>22}: {statistics.median(values) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
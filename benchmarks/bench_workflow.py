@@ -0,0 +1,224 @@
+"""End-to-end load test of the compiled LangGraph workflow against offline fakes.
+
+Drives `src.workflow.app` over the query fixtures (general and legal) at a given concurrency,
+with `benchmarks.fakes` standing in for Groq and Tavily, and reports p50/p95/p99 latency,
+throughput and memory. Needs no network or API keys, so it runs on CI:
+
+    python -m benchmarks.bench_workflow --concurrency 8 --rounds 3 --llm-latency 0.4 --search-latency 0.8
+
+By default every cache starts cold and the local corpus is disabled, so each run pays for
+every LLM call and search; `--warm` keeps them (and the answer cache) on to measure the cached path.
+`--prewarm` simulates the next day: one unmeasured pass fills the query log, the cached answers
+are dropped as if they had expired, and a prewarm pass (src/prewarm.py) runs before the measured rounds.
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def _isolate(tmp: str, warm: bool, prewarm: bool = False) -> None:
+    """Points every on-disk store at a scratch directory; must run before `src` is imported."""
+    os.environ["CHECKPOINT_PATH"] = os.path.join(tmp, "checkpoints.db")
+    os.environ["SEARCH_CACHE_PATH"] = os.path.join(tmp, "search_cache.db")
+    os.environ["LOCAL_CORPUS_PATH"] = os.path.join(tmp, "legal_corpus.db")
+    os.environ["ANSWER_CACHE_PATH"] = os.path.join(tmp, "answer_cache.db")
+    os.environ["QUERY_LOG_PATH"] = os.path.join(tmp, "query_log.db")
+    os.environ["METRICS_JSONL_PATH"] = ""
+    os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+    os.environ.setdefault("TAVILY_API_KEY", "offline-benchmark")
+    # Provider rate limits would dominate the numbers; the fakes have none.
+    for limit in ("GROQ_REQUESTS_PER_MINUTE", "GROQ_TOKENS_PER_MINUTE", "GROQ_LARGE_REQUESTS_PER_MINUTE",
+                  "GROQ_LARGE_TOKENS_PER_MINUTE", "TAVILY_REQUESTS_PER_MINUTE"):
+        os.environ.setdefault(limit, "0")
+    if not warm:
+        os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["SEARCH_CACHE_TTL"] = "0"
+        os.environ["LOCAL_CORPUS_ENABLED"] = "false"
+        os.environ["ANSWER_CACHE_ENABLED"] = "false" if not prewarm else "true"
+
+
+def initial_state(user_input: str) -> dict:
+    return {
+        "user_input": user_input,
+        "project_type": "unknown",
+        "city": "unknown",
+        "geo_state": "unknown",
+        "legal_info_found": False,
+        "legal_summary": "",
+        "suggested_websites": [],
+        "project_roadmap": "",
+        "route_decision": "",
+    }
+
+
+def run(args) -> dict:
+    from benchmarks.fakes import FakeChatModel, FakeSearchTool, Latency, install_fakes, load_query_fixtures
+    from src.instrumentation import MetricsCallback, metrics
+    from src.resources import resources
+    from src.config import MODEL_SMALL, MODEL_LARGE
+
+    # Named after the configured models so the cost counters use their prices.
+    large_latency = args.large_llm_latency if args.large_llm_latency is not None else args.llm_latency
+    install_fakes(
+        FakeChatModel(model_name=MODEL_SMALL, failure_rate=args.llm_failure_rate,
+                      seconds_per_1k_prompt_tokens=args.llm_seconds_per_1k_tokens,
+                      latency=Latency(args.llm_latency, args.llm_jitter, args.distribution, args.seed)),
+        FakeSearchTool(args.search_latency, args.search_jitter, args.search_failure_rate, args.seed + 1,
+                       args.distribution, gov_fraction=args.search_gov_fraction),
+        FakeChatModel(model_name=MODEL_LARGE, failure_rate=args.llm_failure_rate,
+                      seconds_per_1k_prompt_tokens=args.llm_seconds_per_1k_tokens,
+                      latency=Latency(large_latency, args.llm_jitter, args.distribution, args.seed + 2)),
+    )
+    app = resources.graph
+    fixtures = load_query_fixtures()
+    jobs = [(round_, i, row) for round_ in range(args.rounds) for i, row in enumerate(fixtures)]
+    latencies = {"general_query": [], "legal_query": [], "all": []}
+    errors = 0
+
+    def turn(job) -> None:
+        nonlocal errors
+        round_, i, row = job
+        config = {"configurable": {"thread_id": f"bench-{round_}-{i}"}, "callbacks": [MetricsCallback()]}
+        start = time.perf_counter()
+        try:
+            if args.stream:
+                for _ in app.stream(initial_state(row["query"]), config=config, stream_mode="messages"):
+                    pass
+            else:
+                app.invoke(initial_state(row["query"]), config=config)
+        except Exception:
+            errors += 1
+            return
+        elapsed = time.perf_counter() - start
+        latencies[row["query_type"]].append(elapsed)
+        latencies["all"].append(elapsed)
+
+    prewarm_report = None
+    if args.prewarm:
+        from src.prewarm import prewarm
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(turn, [(-1, i, row) for i, row in enumerate(fixtures)]))
+        resources.answer_cache.clear()
+        start = time.perf_counter()
+        prewarm_report = prewarm(top=len(fixtures), budget=args.prewarm_budget, min_requests=1)
+        prewarm_report["seconds"] = time.perf_counter() - start
+        for values in latencies.values():
+            values.clear()
+        errors = 0
+
+    metrics.reset()
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(turn, jobs))
+    wall = time.perf_counter() - start
+
+    report = {
+        "runs": len(jobs),
+        "errors": errors,
+        "concurrency": args.concurrency,
+        "wall_seconds": wall,
+        "throughput_per_second": len(latencies["all"]) / wall if wall else 0.0,
+        # ru_maxrss is in KiB on Linux.
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_rss_growth_mib": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+        "latency": {},
+        "nodes": {name: timing["mean"] for name, timing in metrics.snapshot()["latency"].get("node", {}).items()},
+        "llm_cost_usd": sum(c["value"] for c in metrics.snapshot()["counters"] if c["name"] == "llm_cost_usd_total"),
+        "model_fallbacks": sum(c["value"] for c in metrics.snapshot()["counters"] if c["name"] == "model_fallbacks_total"),
+        "searches": sum(c["value"] for c in metrics.snapshot()["counters"] if c["name"] == "search_queries_total"),
+        "answer_cache_hits": sum(c["value"] for c in metrics.snapshot()["counters"]
+                                 if c["name"] == "cache_lookups_total" and c["labels"] == {"cache": "answer", "result": "hit"}),
+    }
+    if prewarm_report is not None:
+        report["prewarm"] = {"seconds": prewarm_report["seconds"], "spent": prewarm_report["spent"],
+                             "refreshed": sum(1 for item in prewarm_report["jurisdictions"]
+                                              if item["result"] in ("refreshed", "touched"))}
+    if args.tracemalloc:
+        report["tracemalloc_peak_mib"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    for name, values in latencies.items():
+        values.sort()
+        report["latency"][name] = {
+            "n": len(values),
+            "mean": statistics.mean(values) if values else 0.0,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the query fixtures")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="mean fake LLM call latency (s)")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-seconds-per-1k-tokens", type=float, default=0.0,
+                        help="extra fake LLM latency per 1k prompt tokens (prompt processing)")
+    parser.add_argument("--large-llm-latency", type=float, default=None,
+                        help="mean latency of the large-tier model (defaults to --llm-latency)")
+    parser.add_argument("--search-latency", type=float, default=0.8, help="mean fake search latency (s)")
+    parser.add_argument("--search-jitter", type=float, default=0.3)
+    parser.add_argument("--search-gov-fraction", type=float, default=1.0,
+                        help="share of fake search results on .gov hosts (drives the planner's early exit)")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--search-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--stream", action="store_true", help="drive the graph with stream_mode='messages'")
+    parser.add_argument("--warm", action="store_true", help="keep the LLM/search caches and the local corpus on")
+    parser.add_argument("--prewarm", action="store_true",
+                        help="fill the query log, expire the answers and run a prewarm pass before measuring")
+    parser.add_argument("--prewarm-budget", type=int, default=1000, help="provider calls for the prewarm pass")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report the Python allocation peak (slower)")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON (e.g. for CI comparisons)")
+    args = parser.parse_args()
+
+    if "src" in sys.modules or "src.workflow" in sys.modules:
+        raise SystemExit("run as `python -m benchmarks.bench_workflow` so the stores can be isolated")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _isolate(tmp, args.warm, args.prewarm)
+        report = run(args)
+
+    print(f"{report['runs']} runs at concurrency {report['concurrency']}: "
+          f"{report['throughput_per_second']:.2f} runs/s, {report['errors']} errors, "
+          f"peak RSS {report['peak_rss_mib']:.0f} MiB (+{report['peak_rss_growth_mib']:.0f}), "
+          f"LLM cost ${report['llm_cost_usd']:.4f}, {report['model_fallbacks']:.0f} model fallbacks, "
+          f"{report['searches']:.0f} web searches, {report['answer_cache_hits']:.0f} answer cache hits")
+    if "prewarm" in report:
+        print(f"prewarm pass: {report['prewarm']['refreshed']} jurisdictions refreshed in "
+              f"{report['prewarm']['seconds']:.2f}s ({report['prewarm']['spent']} provider calls budgeted)")
+    for name, stats in report["latency"].items():
+        print(f"{name:>14}: n={stats['n']:<4} p50 {stats['p50']:6.2f}s  p95 {stats['p95']:6.2f}s  "
+              f"p99 {stats['p99']:6.2f}s  mean {stats['mean']:6.2f}s")
+    for node, mean in sorted(report["nodes"].items(), key=lambda item: -item[1]):
+        print(f"{'':>14}  {node:<24} mean {mean * 1000:7.0f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Latency/accuracy comparison of the combined `analyze_query` node against the original
+`classify_query` -> `parse_user_input` path, over benchmarks/fixtures/query_analysis.jsonl.
+
+This calls the real Groq model, so GROQ_API_KEY must be set. Run from the repository root:
+
+    python -m benchmarks.compare_query_analysis
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+
+from src import agents
+
+FIXTURES = Path(__file__).parent / "fixtures" / "query_analysis.jsonl"
+FIELDS = ("query_type", "project_type", "city", "geo_state")
+
+
+def _matches(expected: str, actual: str) -> bool:
+    expected, actual = expected.strip().lower(), (actual or "").strip().lower()
+    return expected == actual or (expected != "unknown" and (expected in actual or actual in expected))
+
+
+def two_call(state: dict) -> dict:
+    result = agents.classify_query(state)
+    if result["query_type"] == "legal_query":
+        result.update(agents.parse_user_input(state))
+    return result
+
+
+def combined(state: dict) -> dict:
+    return agents.analyze_query(state)
+
+
+def main():
+    fixtures = [json.loads(line) for line in FIXTURES.read_text().splitlines() if line.strip()]
+    for name, run in (("two_call", two_call), ("combined", combined)):
+        agents.llm_response_cache.clear()
+        timings, correct = [], {field: 0 for field in FIELDS}
+        for fixture in fixtures:
+            start = time.perf_counter()
+            result = run({"user_input": fixture["query"]})
+            timings.append(time.perf_counter() - start)
+            for field in FIELDS:
+                # Project details are only scored for legal queries.
+                if field != "query_type" and fixture["query_type"] != "legal_query":
+                    correct[field] += 1
+                elif _matches(fixture[field], result.get(field, "unknown")):
+                    correct[field] += 1
+        accuracy = "  ".join(f"{field} {correct[field] / len(fixtures):.0%}" for field in FIELDS)
+        print(f"{name:>8}: mean {statistics.mean(timings):.3f}s  p50 {statistics.median(timings):.3f}s  "
+              f"max {max(timings):.3f}s  |  {accuracy}")
+
+
+if __name__ == "__main__":
+    main()
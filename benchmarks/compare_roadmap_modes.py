@@ -0,0 +1,48 @@
+"""Latency comparison of the two-call legal path (analyze_and_summarize -> generate_roadmap)
+against the single-call `summarize_and_plan` node, over a fixed set of search results so
+only the LLM calls are timed.
+
+This calls the real Groq model, so GROQ_API_KEY must be set. Run from the repository root:
+
+    python -m benchmarks.compare_roadmap_modes --rounds 3
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from src import agents
+
+FIXTURE = Path(__file__).parent / "fixtures" / "search_results_adu_los_angeles.json"
+
+
+def two_call(state: dict) -> dict:
+    state = {**state, **agents.analyze_and_summarize(state)}
+    return {**state, **agents.generate_project_roadmap(state)}
+
+
+def single_call(state: dict) -> dict:
+    return {**state, **agents.summarize_and_plan(state)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    state = json.loads(FIXTURE.read_text())
+    state["legal_info_found"] = True
+    for name, run in (("two_call", two_call), ("single_call", single_call)):
+        timings, roadmap_chars = [], []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            result = run(state)
+            timings.append(time.perf_counter() - start)
+            roadmap_chars.append(len(result["project_roadmap"]))
+        print(f"{name:>11}: mean {statistics.mean(timings):.3f}s  min {min(timings):.3f}s  "
+              f"max {max(timings):.3f}s  roadmap {statistics.mean(roadmap_chars):.0f} chars")
+
+
+if __name__ == "__main__":
+    main()
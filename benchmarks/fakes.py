@@ -0,0 +1,191 @@
+"""Deterministic, offline stand-ins for ChatGroq and TavilySearch.
+
+    from benchmarks.fakes import install_fakes
+    install_fakes(FakeChatModel(latency=Latency(0.4, 0.1)), FakeSearchTool(0.8, 0.4))
+
+After `install_fakes`, `src.workflow.app` runs end to end without network access or API keys.
+Structured outputs (QueryClassifier, ProjectLocation, QueryAnalysis) come from the fixture
+rows in `fixtures/query_analysis.jsonl`, matched against the prompt text.
+"""
+import json
+import math
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import ConfigDict, Field
+
+FIXTURES = Path(__file__).parent / "fixtures"
+QUERY_FIXTURES = FIXTURES / "query_analysis.jsonl"
+
+CANNED_ANSWER = (
+    "## LEGAL SUMMARY\n"
+    "Owner-builders may pull permits for accessory dwelling units provided they occupy the property "
+    "and follow the local building code [Source: https://example.gov/permits].\n\n"
+    "## PROJECT ROADMAP\n"
+    "1. Confirm zoning and setbacks with the planning department.\n"
+    "2. Prepare plans and submit the building permit application.\n"
+    "3. Schedule inspections at foundation, framing and final stages.\n\n"
+    "Disclaimer: This information is for general guidance only and does not constitute legal advice."
+)
+
+
+class Latency:
+    """A latency distribution in seconds: 'fixed', 'uniform' (mean ± jitter) or 'lognormal'
+    (mean with a long tail; `jitter` is the standard deviation)."""
+
+    def __init__(self, mean: float, jitter: float = 0.0, distribution: str = "uniform", seed: int = 7):
+        if distribution not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"unknown latency distribution: {distribution}")
+        self.mean = mean
+        self.jitter = jitter
+        self.distribution = distribution
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.distribution == "fixed" or self.mean <= 0:
+                return max(0.0, self.mean)
+            if self.distribution == "uniform":
+                return max(0.0, self.mean + self._random.uniform(-self.jitter, self.jitter))
+            sigma2 = math.log(1 + (self.jitter / self.mean) ** 2)
+            return self._random.lognormvariate(math.log(self.mean) - sigma2 / 2, math.sqrt(sigma2))
+
+    def random(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+
+def load_query_fixtures(path: Path = QUERY_FIXTURES) -> List[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+class FakeChatModel(BaseChatModel):
+    """Stands in for ChatGroq: sleeps for a sampled latency and returns canned text.
+
+    `with_structured_output(schema)` fills the schema from the fixture whose query appears in
+    the prompt, so classification and location extraction are deterministic. Token usage is
+    reported like a real provider (estimated at ~4 characters per token), and
+    `seconds_per_1k_prompt_tokens` adds prompt-processing time that grows with the prompt.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    model_name: str = "fake-groq"
+    latency: Any = Field(default_factory=lambda: Latency(0.0))
+    failure_rate: float = 0.0
+    seconds_per_1k_prompt_tokens: float = 0.0
+    answer: str = CANNED_ANSWER
+    fixtures: List[dict] = Field(default_factory=load_query_fixtures)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    def _usage(self, messages: List[BaseMessage], text: str) -> dict:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = len(text) // 4
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _call_latency(self, messages: List[BaseMessage]) -> float:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        return self.latency.sample() + prompt_tokens / 1000 * self.seconds_per_1k_prompt_tokens
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate and self.latency.random() < self.failure_rate:
+            raise RuntimeError("fake LLM failure")
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._call_latency(messages))
+        self._maybe_fail()
+        message = AIMessage(content=self.answer, usage_metadata=self._usage(messages, self.answer))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        total = self._call_latency(messages)
+        words = self.answer.split(" ")
+        # Time to first token is a third of the call; the rest is spread over the tokens.
+        time.sleep(total / 3)
+        self._maybe_fail()
+        per_word = (total * 2 / 3) / max(1, len(words))
+        for i, word in enumerate(words):
+            time.sleep(per_word)
+            text = word if i == len(words) - 1 else word + " "
+            usage = self._usage(messages, self.answer) if i == len(words) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text, usage_metadata=usage))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    def fixture_for(self, prompt: str) -> Optional[dict]:
+        """The fixture whose query is the prompt's latest message, else the longest one contained in it."""
+        latest = prompt.rsplit("Latest Message:", 1)[-1].strip().lower()
+        exact = [row for row in self.fixtures if row["query"].lower() == latest]
+        if exact:
+            return exact[0]
+        matches = [row for row in self.fixtures if len(row["query"]) > 8 and row["query"].lower() in latest]
+        return max(matches, key=lambda row: len(row["query"])) if matches else None
+
+    def with_structured_output(self, schema, **kwargs):
+        def _structured(prompt_value) -> Any:
+            # Match against the user's message only; system prompts mention example queries.
+            messages = prompt_value.to_messages() if hasattr(prompt_value, "to_messages") else []
+            prompt = str(messages[-1].content) if messages else str(prompt_value)
+            # Go through invoke() so latency, failures and callbacks behave like a real call.
+            self.invoke(prompt_value)
+            row = self.fixture_for(prompt) or {"query_type": "legal_query"}
+            values: Dict[str, Any] = {}
+            for field in schema.model_fields:
+                values[field] = row.get(field, "unknown")
+            return schema(**values)
+
+        return RunnableLambda(_structured)
+
+
+class FakeSearchTool:
+    """Stands in for TavilySearch: sleeps for a sampled latency and returns canned results.
+
+    The first `gov_fraction` of each query's results are on a .gov host, the rest on a .com one.
+    """
+
+    def __init__(self, latency: float, jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 7,
+                 distribution: str = "uniform", results_per_query: int = 5, gov_fraction: float = 1.0):
+        self.latency = Latency(latency, jitter, distribution, seed)
+        self.failure_rate = failure_rate
+        self.results_per_query = results_per_query
+        self.gov_fraction = gov_fraction
+
+    def invoke(self, tool_input: dict) -> dict:
+        query = tool_input["query"]
+        time.sleep(self.latency.sample())
+        if self.failure_rate and self.latency.random() < self.failure_rate:
+            raise RuntimeError(f"fake search failure for '{query}'")
+        slug = "-".join(query.lower().replace(",", "").split())
+        gov_results = round(self.results_per_query * self.gov_fraction)
+        return {
+            "query": query,
+            "results": [
+                {"title": f"{query} #{i}",
+                 "url": f"https://example.{'gov' if i < gov_results else 'com'}/{slug}/{i}",
+                 "content": f"About {query}. Section {i} covers permits, inspections and owner-builder duties."}
+                for i in range(self.results_per_query)
+            ],
+        }
+
+
+def install_fakes(llm: FakeChatModel, search_tool: FakeSearchTool, llm_large: Optional[FakeChatModel] = None) -> None:
+    """Points the workflow's shared LLMs (both model tiers) and search tool at the fakes."""
+    from src.resources import resources
+    resources.override("llm", llm)
+    resources.override("llm_large", llm_large or llm)
+    # The retry/circuit-breaker layer is rebuilt around the fake, but never hedges to the real web.
+    resources.override("search_tool", search_tool)
+    resources.override("hedge_tool", None)
@@ -1,24 +1,177 @@
 from typing import List
-import streamlit as st
-import time
 from pprint import pformat
 from langchain_core.prompts import ChatPromptTemplate
-from .models import ProjectLocation, TavilyResult, AgentState, QueryClassifier
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langgraph.constants import TAG_NOSTREAM
+from .models import ProjectLocation, TavilyResult, AgentState, QueryClassifier, QueryAnalysis
+from .config import (SEARCH_MAX_WORKERS, SEARCH_QUERY_TIMEOUT, SEARCH_TOTAL_TIMEOUT,
+                     SEARCH_PLANNER_ENABLED, SEARCH_EARLY_EXIT_SOURCES, SEARCH_AUTHORITATIVE_SUFFIXES,
+                     CONTEXT_TOKEN_BUDGET, CONTEXT_CHUNK_TOKENS,
+                     MAP_REDUCE_SUMMARY, MAP_REDUCE_TOPIC_TOKENS, MAP_REDUCE_MAX_WORKERS,
+                     LOCAL_CORPUS_ENABLED, LOCAL_CORPUS_MIN_RESULTS,
+                     ANSWER_CACHE_ENABLED, GAZETTEER_FAST_PATH, QUERY_LOG_ENABLED, SINGLE_CALL_ROADMAP,
+                     FOLLOWUP_REUSE, FOLLOWUP_CONTEXT_TOKENS)
+from .search import run_search_queries
+from .context import build_context, normalize_url
+from .trace import trace
+from .instrumentation import metrics
+from .singleflight import SingleFlight, jurisdiction_key
+from .answer_cache import fingerprint_results
+from .gazetteer import match_project_type
+from .followup import NEEDS_SEARCH, jurisdiction_id, search_request
+from .memory import LATEST_MESSAGE, has_history, latest_message
+from .planner import JURISDICTION_TOPICS, JURISDICTION_WIDE_TOPICS, PlannedQuery, parse_suffixes, plan_queries, should_stop
+# LLM clients, search tools and caches are built on first use; see src/resources.py.
+from .resources import resources
 from langchain_core.messages import HumanMessage
-from langchain_groq import ChatGroq
-from langchain.callbacks.streamlit import StreamlitCallbackHandler
-from langchain_tavily import TavilySearch
 import os
 
-llm = ChatGroq(model="llama-3.1-8b-instant")
-tavily_search_tool = TavilySearch(max_results=5, search_depth="advanced")
+
+
+def __getattr__(name: str):
+    # Keeps `agents.llm`, `agents.search_cache`, ... working for scripts written before the registry.
+    if name in resources:
+        return resources.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Concurrent sessions asking about the same jurisdiction share one search and one summary.
+search_flight = SingleFlight("legal_search")
+summary_flight = SingleFlight("summary")
+
+ROADMAP_GUIDELINES = (
+    "When detailing actions in a phase where information from a search result is used, "
+    "always cite the URL of the relevant search result directly within that phase's description. "
+    "For example: 'Action: Obtain permit (Source: https://example.com/permit-info)'. "
+    "Do not present any timelines."
+    "Always mention this descliminet Disclaimer to Embed:"
+    "Owner Builder Concepts (OBC) provides educational and informational content designed to help property owners better understand construction project planning, permitting, and owner-builder rights. OBC and its chatbot do not offer legal, engineering, or contracting advice."
+    "All information presented through our chatbot, website, Substack posts, and roadmap materials is provided as-is and is based on publicly available sources, general building practices, and user-supplied data. Construction laws and building codes vary by city and state. Always consult with your local building authority, a licensed professional, or legal advisor before making decisions related to your project."
+    "OBC is not responsible for any actions taken based on the information provided through this platform. Use of this information is at your own risk."
+)
+
+# Section markers for the single-call summary + roadmap output.
+SUMMARY_MARKER = "## LEGAL SUMMARY"
+ROADMAP_MARKER = "## PROJECT ROADMAP"
+
+
+def _format_search_results(tavily_search_results: List[TavilyResult]) -> str:
+    formatted_search_results = []
+    for i, result in enumerate(tavily_search_results):
+        formatted_search_results.append(
+            f"--- Result {i+1} ---\n"
+            f"Title: {result.get('title', 'N/A')}\n"
+            f"URL: {result.get('url', 'N/A')}\n"
+            f"Content: {result.get('content', 'N/A')}\n"
+            f"-------------------\n"
+        )
+    return "\n".join(formatted_search_results)
+
+
+def _budgeted_search_results(state: AgentState) -> str:
+    """Dedupes, ranks and packs the search results into the context token budget, then formats them for the LLM."""
+    packed_results, report = build_context(
+        state["tavily_search_results"],
+        f"{state['project_type']} {state['city']} {state['geo_state']}",
+        token_budget=CONTEXT_TOKEN_BUDGET,
+        chunk_tokens=CONTEXT_CHUNK_TOKENS,
+    )
+    if trace.enabled():
+        trace.caption(
+            f"Context budget: {report['results_in']} results -> {report['results_after_dedupe']} unique -> "
+            f"{report['results_packed']} packed; ~{report['packed_tokens']} tokens "
+            f"(saved ~{report['tokens_saved']} of {report['original_tokens']})."
+        )
+    return _format_search_results(packed_results)
+
+
+def _invoke_llm(node: str, prompt, inputs: dict, schema=None, tags=None):
+    """Invokes `prompt | model` on the node's model tier (see src/routing.py), through that model's
+    shared rate limits, retry policy and circuit breaker."""
+    return resources.router.invoke(node, prompt, inputs, schema, tags)
+
+
+def _researched(state: AgentState, legal_summary: str) -> dict:
+    """Marks the thread's search results and summary as reusable by follow-up turns."""
+    return {"researched_jurisdiction": jurisdiction_id(state["project_type"], state["city"], state["geo_state"]),
+            "researched_summary": legal_summary}
+
+
+def _sources_fallback(tavily_search_results: List[TavilyResult], limit: int = 8) -> str:
+    """What we can still offer when the LLM is unavailable: the sources the search found."""
+    links = "\n".join(f"- [{r['title']}]({r['url']})" for r in tavily_search_results[:limit])
+    return ("The legal assistant is temporarily unavailable, so a summary and roadmap could not be written. "
+            "These sources cover your project's requirements:\n\n" + links)
+
+
+def _store_answer(state: AgentState, legal_summary: str, roadmap: str) -> None:
+    if not ANSWER_CACHE_ENABLED or not state.get("legal_info_found"):
+        return
+    try:
+        resources.answer_cache.set(state["project_type"], state["city"], state["geo_state"],
+                         fingerprint_results(state["tavily_search_results"]), legal_summary, roadmap)
+    except Exception as e:
+        print(f"Warning: Could not cache the answer. Error: {e}")
+
+
+def _cache_lookup(namespace: str, prompt: str, semantic: bool = False):
+    cached = resources.llm_response_cache.get(namespace, prompt, semantic=semantic)
+    metrics.count("cache_lookups_total", cache="llm", namespace=namespace, result="miss" if cached is None else "hit")
+    return cached
+
+
+def _keep_known(extracted: str, state: AgentState, key: str) -> str:
+    """Prefers a newly extracted project detail, but keeps the one carried over from earlier turns over 'unknown'."""
+    if extracted and extracted.lower() != "unknown":
+        return extracted
+    return state.get(key) or "unknown"
+
+
+def _latest_message(user_input: str) -> str:
+    """The newest message of a rendered conversation (see ConversationMemory.render)."""
+    return latest_message(user_input)
+
+
+def _single_turn(user_input: str) -> bool:
+    """True when the rendered input carries no earlier turns, project details or summary."""
+    return not user_input.rsplit(LATEST_MESSAGE, 1)[0].strip() if LATEST_MESSAGE in user_input else True
+
+
+def _fast_project_details(state: AgentState):
+    """Project details matched by the gazetteer and keyword rules, or None if the LLM is needed."""
+    if not GAZETTEER_FAST_PATH:
+        return None
+    message = _latest_message(state["user_input"])
+    location = resources.gazetteer.extract_location(message)
+    project_type = match_project_type(message) or _keep_known("unknown", state, "project_type")
+    if location is None or project_type == "unknown":
+        metrics.count("fast_path_total", result="miss")
+        return None
+    metrics.count("fast_path_total", result="hit")
+    return {"project_type": project_type, "city": location[0], "geo_state": location[1]}
+
+
+def _canonical_details(project_type: str, city: str, geo_state: str) -> dict:
+    """Maps extracted spellings ("LA", "Calif.", "garage conversion") to one key per jurisdiction."""
+    city, geo_state = resources.gazetteer.canonicalize(city, geo_state)
+    if project_type and project_type != "unknown":
+        project_type = match_project_type(project_type) or project_type
+    return {"project_type": project_type, "city": city, "geo_state": geo_state}
+
+
+def split_summary_and_roadmap(text: str) -> tuple:
+    """Splits the single-call output into (legal_summary, roadmap) on the section markers."""
+    if ROADMAP_MARKER not in text:
+        return text.replace(SUMMARY_MARKER, "").strip(), ""
+    summary, roadmap = text.split(ROADMAP_MARKER, 1)
+    return summary.replace(SUMMARY_MARKER, "").strip(), roadmap.strip()
+
 
 def classify_query(state: AgentState) -> dict:
     user_input = state["user_input"]
-    if st.session_state.get('verbose_output'):
-        st.info("Executing Node: classify_query - Determining query type...")
-        # st.markdown(f"**User Query:** `{user_input}`")
-        time.sleep(0.05)
+    if trace.enabled():
+        trace.info("Executing Node: classify_query - Determining query type...")
+        # trace.markdown(f"**User Query:** `{user_input}`")
 
     prompt_classifier = ChatPromptTemplate.from_messages([
         ("system", 
@@ -29,27 +182,28 @@ def classify_query(state: AgentState) -> dict:
         ("human", "{query}")
     ])
 
-    classifier_chain = prompt_classifier | llm.with_structured_output(QueryClassifier)
-    
     query_classification = "legal_query" # Default to general
     try:
-        classification_result: QueryClassifier = classifier_chain.invoke({"query": user_input})
+        # Classification is robust to rephrasing, so near-duplicate prompts may share an answer. Later turns
+        # of one conversation share most of their rendered text, so those only reuse exact matches.
+        classification_result = _cache_lookup("query_classifier", user_input, semantic=_single_turn(user_input))
+        if classification_result is None:
+            classification_result: QueryClassifier = _invoke_llm("classify_query", prompt_classifier, {"query": user_input}, QueryClassifier)
+            resources.llm_response_cache.set("query_classifier", user_input, classification_result)
         query_classification = classification_result.query_type
     except Exception as e:
         print(f"Warning: Could not classify query using LLM. Defaulting to 'general_query'. Error: {e}") # Log to console
 
-    if st.session_state.get('verbose_output'): # Removed direct st.markdown
-        st.markdown(f"**Query Classified as:** `{query_classification}`")
-        time.sleep(0.05)
+    if trace.enabled(): # Removed direct st.markdown
+        trace.markdown(f"**Query Classified as:** `{query_classification}`")
     
     return {"query_type": query_classification}
 
 def handle_general_query(state: AgentState) -> dict:
     user_input = state["user_input"]
-    if st.session_state.get('verbose_output'): # Removed direct st.info/markdown
-        st.info("Executing Node: handle_general_query - Responding to general query...")
-        st.markdown(f"**User Query:** `{user_input}`")
-        time.sleep(0.05)
+    if trace.enabled(): # Removed direct st.info/markdown
+        trace.info("Executing Node: handle_general_query - Responding to general query...")
+        trace.markdown(f"**User Query:** `{user_input}`")
 
     prompt_general_response = ChatPromptTemplate.from_messages([
         ("system", 
@@ -62,21 +216,18 @@ def handle_general_query(state: AgentState) -> dict:
         ("human", "{query}")
     ])
 
-    general_response_chain = prompt_general_response | llm
-    
     response_content = "Hello there! I'm here to help you with legal information and project roadmaps related to construction. How can I assist you today?"
     try:
-        llm_response = general_response_chain.invoke({"query": user_input})
+        llm_response = _invoke_llm("handle_general_query", prompt_general_response, {"query": user_input})
         response_content = llm_response.content
     except Exception as e:
-        if st.session_state.get('verbose_output'): # Removed direct st.error
-            st.error(f"Error generating general response: {e}")
+        if trace.enabled(): # Removed direct st.error
+            trace.error(f"Error generating general response: {e}")
         print(f"Error generating general response: {e}") # Log to console
 
-    if st.session_state.get('verbose_output'): # Removed direct st.markdown/write
-        st.markdown(f"**General Response:**")
-        st.write(response_content)
-        time.sleep(0.05)
+    if trace.enabled(): # Removed direct st.markdown/write
+        trace.markdown(f"**General Response:**")
+        trace.write(response_content)
     
     return {"project_roadmap": response_content}
 
@@ -84,25 +235,33 @@ def handle_general_query(state: AgentState) -> dict:
 def parse_user_input(state: AgentState) -> dict:
     user_input = state["user_input"]
     
-    if st.session_state.get('verbose_output'):
-        st.info("Executing Node: parse_user_input - Extracting project details...")
-        st.markdown(f"**User Query:** `{user_input}`")
-        time.sleep(0.05)
+    if trace.enabled():
+        trace.info("Executing Node: parse_user_input - Extracting project details...")
+        trace.markdown(f"**User Query:** `{user_input}`")
+
+    fast = _fast_project_details(state)
+    if fast is not None:
+        if trace.enabled():
+            trace.markdown(f"**Extracted Project Details (gazetteer):**")
+            trace.json(fast)
+        return fast
     
     prompt_parser = ChatPromptTemplate.from_messages([
         ("system", "You are a helpful assistant that extracts project details from user queries. Identify the project type, city, and state."),
         ("human", "{query}")
     ])
     
-    # Using .with_structured_output from ChatGroq (real LLM)
-    chain = prompt_parser | llm.with_structured_output(ProjectLocation) 
-    
     extracted_project_type = "unknown"
     extracted_city = "unknown"
     extracted_geo_state = "unknown"
 
     try:
-        parsed_info = chain.invoke({"query": user_input})
+        # Exact matches only: a similar prompt about another city must not reuse this location.
+        parsed_info = _cache_lookup("project_location", user_input)
+        if parsed_info is None:
+            parsed_info = _invoke_llm("parse_user_input", prompt_parser, {"query": user_input}, ProjectLocation)
+            if isinstance(parsed_info, ProjectLocation):
+                resources.llm_response_cache.set("project_location", user_input, parsed_info)
         # ChatGroq's with_structured_output will typically return a Pydantic object directly.
         if isinstance(parsed_info, ProjectLocation):
             extracted_project_type = parsed_info.project_type
@@ -118,36 +277,173 @@ def parse_user_input(state: AgentState) -> dict:
                     extracted_city = parsed_info.city
                     extracted_geo_state = parsed_info.geo_state
                 except (json.JSONDecodeError, AttributeError):
-                    if st.session_state.get('verbose_output'):
-                        st.error(f"Error decoding structured output from LLM for ProjectLocation: {type(parsed_info)} - {str(parsed_info)}")
+                    if trace.enabled():
+                        trace.error(f"Error decoding structured output from LLM for ProjectLocation: {type(parsed_info)} - {str(parsed_info)}")
                     parsed_info = ProjectLocation(project_type="unknown", city="unknown", geo_state="unknown") # Fallback
             elif isinstance(parsed_info, dict): # For direct dictionary return
                 extracted_project_type = parsed_info.get("project_type", "unknown")
                 extracted_city = parsed_info.get("city", "unknown")
                 extracted_geo_state = parsed_info.get("geo_state", "unknown")
 
-        if st.session_state.get('verbose_output'):
-            st.markdown(f"**Extracted Project Details:**")
-            st.json({
+        if trace.enabled():
+            trace.markdown(f"**Extracted Project Details:**")
+            trace.json({
                 "project_type": extracted_project_type,
                 "city": extracted_city,
                 "geo_state": extracted_geo_state
             })
-            time.sleep(0.05) # Small delay for rendering
 
     except Exception as e:
-        if st.session_state.get('verbose_output'):
-            st.warning(f"Warning: Could not extract structured info from LLM. Error: {e}")
+        if trace.enabled():
+            trace.warning(f"Warning: Could not extract structured info from LLM. Error: {e}")
         pass
         
+    return _canonical_details(
+        _keep_known(extracted_project_type, state, "project_type"),
+        _keep_known(extracted_city, state, "city"),
+        _keep_known(extracted_geo_state, state, "geo_state"),
+    )
+
+
+def analyze_query(state: AgentState) -> dict:
+    """Classifies the query and extracts project details in a single structured LLM call."""
+    user_input = state["user_input"]
+
+    if trace.enabled():
+        trace.info("Executing Node: analyze_query - Classifying query and extracting project details...")
+
+    # A recognized city, state and project type can only be a legal query.
+    fast = _fast_project_details(state)
+    if fast is not None:
+        if trace.enabled():
+            trace.markdown(f"**Query Classified as:** `legal_query` (gazetteer)")
+            trace.json(fast)
+        return {"query_type": "legal_query", **fast}
+
+    prompt_analyzer = ChatPromptTemplate.from_messages([
+        ("system",
+         "You are an AI assistant that analyzes user queries for a construction legal assistant. "
+         "Set query_type to 'legal_query' if the input is related to construction, permits, zoning, or owner-builder rights, "
+         "or to 'general_query' for anything else (e.g., greetings, questions about your capabilities, company information, 'hello', 'hi'). "
+         "For legal queries, also extract the project type, city, and state. "
+         "Use 'unknown' for any project detail that is not stated."),
+        ("human", "{query}")
+    ])
+
+    analysis = QueryAnalysis(query_type="legal_query")
+    try:
+        cached = _cache_lookup("query_analysis", user_input)
+        if cached is None:
+            analysis = _invoke_llm("analyze_query", prompt_analyzer, {"query": user_input}, QueryAnalysis)
+            resources.llm_response_cache.set("query_analysis", user_input, analysis)
+        else:
+            analysis = cached
+    except Exception as e:
+        print(f"Warning: Could not analyze query using LLM. Defaulting to 'legal_query'. Error: {e}")
+
+    if trace.enabled():
+        trace.markdown(f"**Query Classified as:** `{analysis.query_type}`")
+        trace.json(analysis.model_dump())
+
     return {
-        "project_type": extracted_project_type,
-        "city": extracted_city,
-        "geo_state": extracted_geo_state,
+        "query_type": analysis.query_type,
+        **_canonical_details(
+            _keep_known(analysis.project_type, state, "project_type"),
+            _keep_known(analysis.city, state, "city"),
+            _keep_known(analysis.geo_state, state, "geo_state"),
+        ),
     }
 
 
-def legal_search_agent(state: AgentState) -> AgentState:
+AUTHORITATIVE_SUFFIXES = parse_suffixes(SEARCH_AUTHORITATIVE_SUFFIXES)
+
+
+def _search_wave(planned: List[PlannedQuery], project_type: str, city: str, geo_state: str, fresh: bool = False):
+    """Runs one wave of planned queries: local corpus first, the web for the rest.
+
+    Project-specific topics only use corpus documents fetched for the same project type.
+    `fresh` skips the corpus and the search cache so every query goes to the web.
+    Returns (all results in plan order, the web results among them).
+    """
+    queries = [item["query"] for item in planned]
+    by_query = {item["query"]: item for item in planned}
+    all_valid_search_results: List[TavilyResult] = []
+
+    # First tier: the offline corpus. Only queries it can't cover go to the web.
+    local_results = {query: [] for query in queries}
+    if LOCAL_CORPUS_ENABLED and not fresh:
+        for query in queries:
+            with metrics.timer("corpus", "fts5"):
+                topic = by_query[query]["topic"]
+                found = resources.legal_corpus.search(
+                    query, city, geo_state, limit=5,
+                    project_type=None if topic in JURISDICTION_WIDE_TOPICS else project_type)
+                local_results[query] = [{**result, "topic": topic} for result in found]
+            metrics.count("cache_lookups_total", cache="corpus",
+                          result="hit" if len(local_results[query]) >= LOCAL_CORPUS_MIN_RESULTS else "miss")
+    web_queries = [query for query in queries if len(local_results[query]) < LOCAL_CORPUS_MIN_RESULTS]
+
+    if trace.enabled():
+        trace.markdown("---") # Separator for clarity
+        trace.info(f"Legal Search Agent: {len(queries) - len(web_queries)} of {len(queries)} queries answered from the local corpus; "
+                f"starting {len(web_queries)} web searches in parallel...")
+        for query in web_queries:
+            trace.markdown(f"Searching Tavily ({by_query[query]['search_depth']}) for: **`{query}`**")
+
+    outcomes = run_search_queries(
+        resources.cached_search_tool.refreshing() if fresh else resources.cached_search_tool,
+        web_queries,
+        max_workers=SEARCH_MAX_WORKERS,
+        query_timeout=SEARCH_QUERY_TIMEOUT,
+        total_timeout=SEARCH_TOTAL_TIMEOUT,
+        search_options={query: {"search_depth": by_query[query]["search_depth"]} for query in web_queries},
+    )
+    for outcome in outcomes:
+        metrics.observe("search", "tavily", outcome["elapsed"], query=outcome["query"], error=outcome["error"])
+        metrics.count("search_queries_total", depth=by_query[outcome["query"]]["search_depth"])
+        if outcome["error"] is not None:
+            metrics.count("errors_total", kind="search", name="tavily")
+    outcomes_by_query = {outcome["query"]: outcome for outcome in outcomes}
+    web_results: List[TavilyResult] = []
+
+    for query in queries:
+        if query not in outcomes_by_query:
+            all_valid_search_results.extend(local_results[query])
+            continue
+
+        outcome = outcomes_by_query[query]
+        if outcome["error"] is not None:
+            if trace.enabled():
+                trace.error(f"Error during Tavily search for '{query}': {outcome['error']}")
+            # Whatever the corpus had is still better than nothing.
+            all_valid_search_results.extend(local_results[query])
+            continue
+
+        tavily_response_dict = outcome["response"]
+        if isinstance(tavily_response_dict, dict) and isinstance(tavily_response_dict.get("results"), list):
+            # A cached or deeper response may carry more results than this query was planned for.
+            for result in tavily_response_dict["results"][:by_query[query]["max_results"]]:
+                if all(k in result for k in ["title", "content", "url"]):
+                    web_results.append(
+                        TavilyResult(
+                            title=result["title"],
+                            content=result["content"],
+                            url=result["url"],
+                            topic=by_query[query]["topic"]
+                        )
+                    )
+                    all_valid_search_results.append(web_results[-1])
+                else:
+                    if trace.enabled():
+                        trace.warning(f"Skipping malformed Tavily result (missing 'title', 'content', or 'url'): {result}")
+        else:
+            if trace.enabled():
+                trace.warning(f"Tavily response for '{query}' did not contain a valid 'results' list or was empty. Response: {tavily_response_dict}")
+
+    return all_valid_search_results, web_results
+
+
+def _run_legal_search(state: AgentState, fresh: bool = False) -> AgentState:
     new_state = state.copy()
 
     project_type = new_state["project_type"]
@@ -155,75 +451,132 @@ def legal_search_agent(state: AgentState) -> AgentState:
     geo_state = new_state["geo_state"]
 
     if project_type == "unknown" or city == "unknown" or geo_state == "unknown":
-        if st.session_state.get('verbose_output'):
-            st.warning("Legal Search Agent: Skipping search due to unknown project details from user input.")
+        if trace.enabled():
+            trace.warning("Legal Search Agent: Skipping search due to unknown project details from user input.")
         new_state["legal_info_found"] = False
         new_state["tavily_search_results"] = []
         return new_state
 
-    queries = [
-        f"owner-builder rights {city}, {geo_state}",
-        f"{project_type} permit requirements {city}, {geo_state}",
-        f"zoning laws {city}, {geo_state} {project_type} construction",
-        f"local construction ordinances {city}, {geo_state}",
-        f"building codes {project_type} {city}, {geo_state}"
-    ]
+    plan_class, planned = plan_queries(project_type, city, geo_state, enabled=SEARCH_PLANNER_ENABLED)
+    waves = sorted({item["wave"] for item in planned})
+    metrics.count("search_plans_total", project_class=plan_class)
+    metrics.count("search_queries_skipped_total", len(JURISDICTION_TOPICS) - len(planned), reason="not_planned")
+    if trace.enabled():
+        trace.info(f"Search planner: '{project_type}' is planned as {plan_class}; "
+                   f"{len(planned)} of {len(JURISDICTION_TOPICS)} topics in {len(waves)} wave(s).")
+        trace.json(planned)
 
     all_valid_search_results: List[TavilyResult] = []
-    legal_info_found = False
-
-    if st.session_state.get('verbose_output'):
-        st.markdown("---") # Separator for clarity
-        st.info("Legal Search Agent: Starting web searches for legal information...")
-        time.sleep(0.05)
-
-    for query in queries:
+    web_results: List[TavilyResult] = []
+    for wave in waves:
+        wave_results, wave_web_results = _search_wave([item for item in planned if item["wave"] == wave], project_type,
+                                                      city, geo_state, fresh=fresh)
+        all_valid_search_results.extend(wave_results)
+        web_results.extend(wave_web_results)
+        remaining = [item for item in planned if item["wave"] > wave]
+        if not remaining:
+            break
+        found = should_stop(all_valid_search_results, SEARCH_EARLY_EXIT_SOURCES, AUTHORITATIVE_SUFFIXES)
+        if found is not None:
+            metrics.count("search_early_exits_total", project_class=plan_class)
+            metrics.count("search_queries_skipped_total", len(remaining), reason="early_exit")
+            if trace.enabled():
+                trace.info(f"Search planner: {found} authoritative sources after wave {wave}; "
+                           f"skipping {len(remaining)} queries ({', '.join(item['topic'] for item in remaining)}).")
+            break
+    # Results are presented in topic order whatever wave found them.
+    all_valid_search_results.sort(key=lambda result: JURISDICTION_TOPICS.index(result["topic"]))
+    legal_info_found = bool(all_valid_search_results)
+
+    if LOCAL_CORPUS_ENABLED and web_results:
         try:
-            if st.session_state.get('verbose_output'):
-                st.markdown(f"Searching Tavily for: **`{query}`**")
-                time.sleep(0.05)
-            tavily_response_dict = tavily_search_tool.invoke({"query": query}) # This is the Mock Tool call
-
-            if "results" in tavily_response_dict and isinstance(tavily_response_dict["results"], list):
-                for result in tavily_response_dict["results"]:
-                    if all(k in result for k in ["title", "content", "url"]):
-                        all_valid_search_results.append(
-                            TavilyResult(
-                                title=result["title"],
-                                content=result["content"],
-                                url=result["url"]
-                            )
-                        )
-                        legal_info_found = True
-                    else:
-                        if st.session_state.get('verbose_output'):
-                            st.warning(f"Skipping malformed Tavily result (missing 'title', 'content', or 'url'): {result}")
-            else:
-                if st.session_state.get('verbose_output'):
-                    st.warning(f"Tavily response for '{query}' did not contain a valid 'results' list or was empty. Response: {tavily_response_dict}")
-
+            resources.legal_corpus.ingest(web_results, city, geo_state, project_type)
         except Exception as e:
-            if st.session_state.get('verbose_output'):
-                st.error(f"Error during Tavily search for '{query}': {e}")
-        time.sleep(0.05) # Small delay after each search query
+            print(f"Warning: Could not add search results to the local corpus. Error: {e}")
 
     new_state["tavily_search_results"] = all_valid_search_results
     new_state["legal_info_found"] = legal_info_found
 
-    if st.session_state.get('verbose_output'):
-        st.success(f"Legal Search Agent: Completed search. Found {len(all_valid_search_results)} valid results. Legal information found: {legal_info_found}")
+    if ANSWER_CACHE_ENABLED and legal_info_found:
+        # A cached answer built from other sources than these is stale.
+        if resources.answer_cache.invalidate_if_changed(project_type, city, geo_state, fingerprint_results(all_valid_search_results)):
+            metrics.count("answer_cache_invalidations_total", reason="sources_changed")
+
+    if trace.enabled():
+        trace.success(f"Legal Search Agent: Completed search. Found {len(all_valid_search_results)} valid results. Legal information found: {legal_info_found}")
+        trace.caption(f"Search cache: {resources.search_cache.stats()}")
         if all_valid_search_results:
-            st.markdown("**Tavily Search Results (Preview):**")
+            trace.markdown("**Tavily Search Results (Preview):**")
             for i, result in enumerate(all_valid_search_results): # Show top 3 results
-                st.markdown(f"**Result {i+1}:** [{result.get('title', 'N/A')}]({result.get('url', '#')})")
-                st.write(f"Content: {result.get('content', '')}") # Truncate content, show more
-                time.sleep(0.01) # Very small delay per result
-            time.sleep(0.05) # Small delay for rendering
+                trace.markdown(f"**Result {i+1}:** [{result.get('title', 'N/A')}]({result.get('url', '#')})")
+                trace.write(f"Content: {result.get('content', '')}") # Truncate content, show more
 
     return new_state
 
 
-def analyze_and_summarize(state: AgentState) -> dict:
+def _summarize_topic(state: AgentState, topic: str, results: List[TavilyResult]) -> str:
+    """Map step: a short, cited note on one topic from that topic's results only."""
+    project_type, city, geo_state = state["project_type"], state["city"], state["geo_state"]
+    packed, _ = build_context(results, f"{topic} {project_type} {city} {geo_state}",
+                              token_budget=MAP_REDUCE_TOPIC_TOKENS, chunk_tokens=CONTEXT_CHUNK_TOKENS)
+    prompt_topic = ChatPromptTemplate.from_messages([
+        ("system",
+         f"You are a legal expert. From the search results below, summarize only what they say about {topic.lower()} "
+         f"for a {project_type} project in {city}, {geo_state}, for an owner-builder. Use at most 150 words. "
+         "Cite the URL of the result each fact comes from, in parentheses. "
+         "If the results say nothing relevant, reply exactly: Not found in the provided results."),
+        ("human", "Here are the search results:\n\n{search_results}")
+    ])
+    # Map outputs are intermediate, so they are kept out of the token stream shown to the user.
+    return _invoke_llm("summarize_topic", prompt_topic, {"search_results": _format_search_results(packed)},
+                       tags=[TAG_NOSTREAM]).content
+
+
+def _map_reduce_summary(state: AgentState) -> str:
+    """Summarizes each search topic concurrently, then merges the topic notes in one short call.
+
+    Each map prompt holds one topic's results, so the wall time is that of the slowest topic
+    plus a reduce call whose input is only the notes. Topics whose map call fails are left out;
+    if the reduce call fails, the notes are returned under topic headings.
+    """
+    groups = {}
+    for result in state["tavily_search_results"]:
+        groups.setdefault(result.get("topic") or "Other requirements", []).append(result)
+
+    notes = {}
+    # The context-copying pool keeps callbacks, tracing and the routing metadata of this node.
+    with ContextThreadPoolExecutor(max_workers=max(1, min(MAP_REDUCE_MAX_WORKERS, len(groups)))) as pool:
+        futures = {topic: pool.submit(_summarize_topic, state, topic, results) for topic, results in groups.items()}
+        for topic, future in futures.items():
+            try:
+                notes[topic] = future.result()
+            except Exception as e:
+                print(f"Warning: Could not summarize the '{topic}' results. Error: {e}")
+    if not notes:
+        raise RuntimeError("every topic summary failed")
+    combined_notes = "\n\n".join(f"### {topic}\n{note}" for topic, note in notes.items())
+    if trace.enabled():
+        trace.caption(f"Map-reduce summary: {len(notes)} of {len(groups)} topics summarized.")
+    if len(notes) == 1:
+        return combined_notes
+
+    prompt_reduce = ChatPromptTemplate.from_messages([
+        ("system",
+         f"You are a legal expert. Merge the per-topic notes below into one clear, concise summary of owner-builder rights, "
+         f"permit requirements, zoning laws, and local construction ordinances for a {state['project_type']} project in "
+         f"{state['city']}, {state['geo_state']}. Focus on actionable information for an owner-builder. Remove repetition, "
+         "keep every URL citation exactly as written next to the facts it supports, and do not add URLs. "
+         "Say which topics were not found in the provided results."),
+        ("human", "{notes}")
+    ])
+    try:
+        return _invoke_llm("analyze_and_summarize", prompt_reduce, {"notes": combined_notes}).content
+    except Exception as e:
+        print(f"Warning: Could not merge the topic summaries. Error: {e}")
+        return combined_notes
+
+
+def _run_analyze_and_summarize(state: AgentState) -> dict:
     legal_info_found = state["legal_info_found"]
     project_type = state["project_type"]
     city = state["city"]
@@ -234,44 +587,111 @@ def analyze_and_summarize(state: AgentState) -> dict:
     route_decision = "end"
 
     if legal_info_found and tavily_search_results:
-        formatted_search_results = []
-        for i, result in enumerate(tavily_search_results):
-            formatted_search_results.append(
-                f"--- Result {i+1} ---\n"
-                f"Title: {result.get('title', 'N/A')}\n"
-                f"URL: {result.get('url', 'N/A')}\n"
-                f"Content: {result.get('content', 'N/A')}\n"
-                f"-------------------\n"
-            )
-        search_results_for_llm = "\n".join(formatted_search_results)
-
         prompt_summarizer = ChatPromptTemplate.from_messages([
             ("system",
              f"You are a legal expert. Synthesize the following search results to provide a clear, concise summary of owner-builder rights, permit requirements, zoning laws, and local construction ordinances for a {project_type} project in {city}, {geo_state}. Focus on actionable information for an owner-builder. "
              "If a specific piece of information isn't found across all provided results, state that it's not available in the provided results. Cite sources by URL for each piece of information extracted from a specific result.Do include the urls provided by the user"),
-            ("human", f"Here are the search results:\n\n{search_results_for_llm}")
+            ("human", "Here are the search results:\n\n{search_results}")
         ])
         
         
         # Invoke real LLM for summarization
-        summary_chain = prompt_summarizer | llm
-        final_legal_summary = summary_chain.invoke({"search_results": search_results_for_llm}).content
-        route_decision = "roadmap"
-
-    if st.session_state.get('verbose_output'):
-        st.markdown("---") # Separator for clarity
-        st.info(f"Analyze and Summarize: Legal summary generated. Routing to '{route_decision}'.")
-        st.markdown(f"**Generated Legal Summary:**")
-        st.write(final_legal_summary) # Display the full summary
-        time.sleep(0.05) # Small delay for rendering
+        try:
+            if MAP_REDUCE_SUMMARY:
+                final_legal_summary = _map_reduce_summary(state)
+            else:
+                final_legal_summary = _invoke_llm("analyze_and_summarize", prompt_summarizer,
+                                                  {"search_results": _budgeted_search_results(state)}).content
+            route_decision = "roadmap"
+        except Exception as e:
+            print(f"Warning: Could not generate the legal summary. Error: {e}")
+            if trace.enabled():
+                trace.error(f"Legal summary failed: {e}")
+            # Skip the roadmap call and answer with the sources instead of failing the run.
+            fallback = _sources_fallback(tavily_search_results)
+            return {"legal_summary": fallback, "project_roadmap": fallback, "route_decision": "end"}
+
+    if trace.enabled():
+        trace.markdown("---") # Separator for clarity
+        trace.info(f"Analyze and Summarize: Legal summary generated. Routing to '{route_decision}'.")
+        trace.markdown(f"**Generated Legal Summary:**")
+        trace.write(final_legal_summary) # Display the full summary
 
     return {
         "legal_summary": final_legal_summary,
-        "route_decision": route_decision
+        "route_decision": route_decision,
+        **(_researched(state, final_legal_summary) if route_decision == "roadmap" else {}),
     }
 
 
+def _coalesced(flight: SingleFlight, stage: str, state: AgentState, fn) -> dict:
+    """Runs `fn(state)` once per in-flight jurisdiction; all waiting sessions get its result."""
+    key = jurisdiction_key(state["project_type"], state["city"], state["geo_state"])
+    result, shared = flight.do((stage, key), lambda: fn(state))
+    if shared and trace.enabled():
+        trace.caption(f"{stage}: joined an identical in-flight lookup for {state['city']}, {state['geo_state']}.")
+    return dict(result)
+
+
+def _log_jurisdiction(project_type: str, city: str, geo_state: str, warm: bool) -> None:
+    if not QUERY_LOG_ENABLED:
+        return
+    try:
+        resources.query_log.record(project_type, city, geo_state, warm=warm)
+    except Exception as e:
+        print(f"Warning: Could not record the jurisdiction in the query log. Error: {e}")
+
+
+def check_answer_cache(state: AgentState) -> dict:
+    """Answers from the jurisdiction cache when possible, skipping the search and both LLM calls."""
+    project_type, city, geo_state = state["project_type"], state["city"], state["geo_state"]
+    if "unknown" in (project_type, city, geo_state):
+        return {"route_decision": "search"}
+    if not ANSWER_CACHE_ENABLED:
+        _log_jurisdiction(project_type, city, geo_state, warm=False)
+        return {"route_decision": "search"}
+    cached = resources.answer_cache.get(project_type, city, geo_state)
+    metrics.count("cache_lookups_total", cache="answer", result="miss" if cached is None else "hit")
+    _log_jurisdiction(project_type, city, geo_state, warm=cached is not None)
+    if cached is None:
+        return {"route_decision": "search"}
+    if trace.enabled():
+        trace.success(f"Answer Cache: Reusing the summary and roadmap for {project_type} in {city}, {geo_state} "
+                      f"(written {cached['age'] / 3600:.1f} hours ago).")
+    return {
+        "legal_summary": cached["legal_summary"],
+        "project_roadmap": cached["project_roadmap"],
+        "legal_info_found": True,
+        "tavily_search_results": [],
+        "route_decision": "cached",
+        **_researched(state, cached["legal_summary"]),
+    }
+
+
+def route_answer_cache(state: AgentState) -> str:
+    return "cached" if state.get("route_decision") == "cached" else "search"
+
+
+def legal_search_agent(state: AgentState) -> AgentState:
+    if "unknown" in (state["project_type"], state["city"], state["geo_state"]):
+        return _run_legal_search(state)
+    found = _coalesced(search_flight, "legal_search", state, _run_legal_search)
+    new_state = state.copy()
+    # Only the search outputs are shared; the leader's copy of the rest of its state is not ours.
+    new_state["tavily_search_results"] = list(found["tavily_search_results"])
+    new_state["legal_info_found"] = found["legal_info_found"]
+    return new_state
+
+
+def analyze_and_summarize(state: AgentState) -> dict:
+    # The summary depends only on the jurisdiction and its search results, never on the user's wording.
+    return _coalesced(summary_flight, "analyze_and_summarize", state, _run_analyze_and_summarize)
+
+
 def generate_project_roadmap(state: AgentState) -> dict:
+    if state.get("route_decision") == "end" and state.get("project_roadmap"):
+        # analyze_and_summarize already answered with a fallback.
+        return {}
     legal_summary = state["legal_summary"]
     project_type = state["project_type"]
     city = state["city"]
@@ -288,38 +708,247 @@ def generate_project_roadmap(state: AgentState) -> dict:
             f"Legal Summary:\n{legal_summary}\n\n"
         )
         
-        system_prompt_content += (
-            f"When detailing actions in a phase where information from a search result is used, "
-            f"always cite the URL of the relevant search result directly within that phase's description. "
-            f"For example: 'Action: Obtain permit (Source: https://example.com/permit-info)'. "
-            f"Do not present any timelines."
-            f"Always mention this descliminet Disclaimer to Embed:"
-            f"Owner Builder Concepts (OBC) provides educational and informational content designed to help property owners better understand construction project planning, permitting, and owner-builder rights. OBC and its chatbot do not offer legal, engineering, or contracting advice."
-            f"All information presented through our chatbot, website, Substack posts, and roadmap materials is provided as-is and is based on publicly available sources, general building practices, and user-supplied data. Construction laws and building codes vary by city and state. Always consult with your local building authority, a licensed professional, or legal advisor before making decisions related to your project."
-            f"OBC is not responsible for any actions taken based on the information provided through this platform. Use of this information is at your own risk."
-        )
+        system_prompt_content += ROADMAP_GUIDELINES
 
         prompt_roadmap = ChatPromptTemplate.from_messages([
             ("system", system_prompt_content),
             ("human", "Generate the project roadmap.")
         ])
 
-        roadmap_chain = prompt_roadmap | llm
-        roadmap = roadmap_chain.invoke({}).content
+        try:
+            roadmap = _invoke_llm("generate_roadmap", prompt_roadmap, {}).content
+            _store_answer(state, legal_summary, roadmap)
+        except Exception as e:
+            print(f"Warning: Could not generate the project roadmap. Error: {e}")
+            if trace.enabled():
+                trace.error(f"Roadmap generation failed: {e}")
+            roadmap = ("The project roadmap could not be generated right now. "
+                       f"Here is the legal summary for your project:\n\n{legal_summary}")
         
-    if st.session_state.get('verbose_output'):
-        st.markdown("---")
-        st.success(f"Generate Project Roadmap: Roadmap created for {project_type} in {city}, {geo_state}.")
-        st.markdown(f"**Generated Project Roadmap (Preview):**")
-        st.write(roadmap)
-        time.sleep(0.05)
+    if trace.enabled():
+        trace.markdown("---")
+        trace.success(f"Generate Project Roadmap: Roadmap created for {project_type} in {city}, {geo_state}.")
+        trace.markdown(f"**Generated Project Roadmap (Preview):**")
+        trace.write(roadmap)
         
     return {"project_roadmap": roadmap}
 
+
+def _run_summarize_and_plan(state: AgentState) -> dict:
+    legal_info_found = state["legal_info_found"]
+    project_type = state["project_type"]
+    city = state["city"]
+    geo_state = state["geo_state"]
+    tavily_search_results = state["tavily_search_results"]
+
+    final_legal_summary = "No legal summary could be generated."
+    roadmap = "A project roadmap could not be generated due to missing legal information."
+    route_decision = "end"
+    researched = {}
+
+    if legal_info_found and tavily_search_results:
+        prompt_single_call = ChatPromptTemplate.from_messages([
+            ("system",
+             "You are a legal expert and project manager expert. Using only the search results provided by the user, "
+             "write two sections for a {project_type} project in {city}, {geo_state}, each starting with its heading on its own line.\n\n"
+             f"{SUMMARY_MARKER}\n"
+             "A clear, concise summary of owner-builder rights, permit requirements, zoning laws, and local construction ordinances. "
+             "Focus on actionable information for an owner-builder. If a specific piece of information isn't found across all provided results, "
+             "state that it's not available in the provided results. Cite sources by URL for each piece of information extracted from a specific result.\n\n"
+             f"{ROADMAP_MARKER}\n"
+             "A step-by-step project roadmap from Phase 1: Legal Understanding through Phase 7: Final Inspections. "
+             "Detail the key actions in each phase. Incorporate the legal requirements from the summary where relevant.\n\n"
+             "{roadmap_guidelines}"),
+            ("human", "Here are the search results:\n\n{search_results}")
+        ])
+
+        try:
+            output = _invoke_llm("summarize_and_plan", prompt_single_call, {
+                "project_type": project_type,
+                "city": city,
+                "geo_state": geo_state,
+                "roadmap_guidelines": ROADMAP_GUIDELINES,
+                "search_results": _budgeted_search_results(state),
+            }).content
+            final_legal_summary, roadmap = split_summary_and_roadmap(output)
+            if not roadmap:
+                # The model ignored the section markers; show everything rather than nothing.
+                roadmap = output
+            else:
+                _store_answer(state, final_legal_summary, roadmap)
+                researched = _researched(state, final_legal_summary)
+        except Exception as e:
+            print(f"Warning: Could not generate the summary and roadmap. Error: {e}")
+            if trace.enabled():
+                trace.error(f"Summarize and Plan failed: {e}")
+            final_legal_summary = roadmap = _sources_fallback(tavily_search_results)
+
+    if trace.enabled():
+        trace.markdown("---")
+        trace.success(f"Summarize and Plan: Summary and roadmap created for {project_type} in {city}, {geo_state} in a single LLM call.")
+        trace.markdown(f"**Generated Legal Summary:**")
+        trace.write(final_legal_summary)
+
+    return {
+        "legal_summary": final_legal_summary,
+        "project_roadmap": roadmap,
+        "route_decision": route_decision,
+        **researched,
+    }
+
+
+def summarize_and_plan(state: AgentState) -> dict:
+    """Writes the legal summary and the project roadmap in one LLM call, as two marked sections."""
+    return _coalesced(summary_flight, "summarize_and_plan", state, _run_summarize_and_plan)
+
+
+def _followup_answer(state: AgentState, results: List[TavilyResult], allow_search: bool, node: str) -> str:
+    project_type, city, geo_state = state["project_type"], state["city"], state["geo_state"]
+    packed, _ = build_context(results, f"{_latest_message(state['user_input'])} {project_type} {city} {geo_state}",
+                              token_budget=FOLLOWUP_CONTEXT_TOKENS, chunk_tokens=CONTEXT_CHUNK_TOKENS)
+    if allow_search:
+        missing = (f"If they do not contain what is needed to answer, reply with exactly one line, "
+                   f"'{NEEDS_SEARCH} <a web search query that would find it>', and nothing else.")
+    else:
+        missing = ("If they still do not answer the question, say so and suggest asking the local building "
+                   "department.")
+    prompt_followup = ChatPromptTemplate.from_messages([
+        ("system",
+         f"You are a legal expert helping an owner-builder with a {project_type} project in {city}, {geo_state}. "
+         "Their project has already been researched. Answer the latest message using only the legal summary and "
+         "search results below, focused on what was asked, and cite sources by URL. " + missing + "\n\n"
+         "Legal Summary:\n{legal_summary}\n\nSearch Results:\n{search_results}"),
+        ("human", "{question}")
+    ])
+    return _invoke_llm(node, prompt_followup, {
+        "legal_summary": state.get("researched_summary", ""),
+        "search_results": _format_search_results(packed) or "(none)",
+        "question": state["user_input"],
+    }).content
+
+
+def answer_followup(state: AgentState) -> dict:
+    """Answers a follow-up about the jurisdiction this thread already researched with one LLM call
+    over the checkpointed search results and summary, instead of searching and summarizing again."""
+    if trace.enabled():
+        trace.info(f"Executing Node: answer_followup - Reusing this conversation's research for "
+                   f"{state['project_type']} in {state['city']}, {state['geo_state']}...")
+    try:
+        answer = _followup_answer(state, state.get("tavily_search_results") or [], True, "answer_followup")
+    except Exception as e:
+        print(f"Warning: Could not answer the follow-up. Error: {e}")
+        metrics.count("followup_turns_total", result="failed")
+        return {"project_roadmap": ("The assistant could not answer your follow-up right now. Here is the legal "
+                                    f"summary for your project:\n\n{state.get('researched_summary', '')}"),
+                "route_decision": "end"}
+    query = search_request(answer)
+    if query is not None:
+        metrics.count("followup_turns_total", result="needs_search")
+        if trace.enabled():
+            trace.info(f"Answer Follow-up: the stored research does not cover this; searching for `{query}`.")
+        return {"followup_query": query or _latest_message(state["user_input"]), "route_decision": "followup_search"}
+    metrics.count("followup_turns_total", result="answered")
+    return {"project_roadmap": answer, "legal_summary": state.get("researched_summary", ""), "route_decision": "end"}
+
+
+def research_followup(state: AgentState) -> dict:
+    """Runs the one search `answer_followup` asked for, adds its results to the thread's research and answers."""
+    city, geo_state = state["city"], state["geo_state"]
+    query = state.get("followup_query") or _latest_message(state["user_input"])
+    if city.lower() not in query.lower():
+        query = f"{query} {city}, {geo_state}"
+    outcome = run_search_queries(resources.cached_search_tool, [query], max_workers=1,
+                                 query_timeout=SEARCH_QUERY_TIMEOUT, total_timeout=SEARCH_QUERY_TIMEOUT)[0]
+    metrics.observe("search", "tavily", outcome["elapsed"], query=query, error=outcome["error"])
+    results = list(state.get("tavily_search_results") or [])
+    seen = {normalize_url(result["url"]) for result in results}
+    if outcome["error"] is not None:
+        metrics.count("errors_total", kind="search", name="tavily")
+        if trace.enabled():
+            trace.error(f"Error during Tavily search for '{query}': {outcome['error']}")
+    elif isinstance(outcome["response"], dict) and isinstance(outcome["response"].get("results"), list):
+        for result in outcome["response"]["results"]:
+            if all(k in result for k in ["title", "content", "url"]) and normalize_url(result["url"]) not in seen:
+                seen.add(normalize_url(result["url"]))
+                results.append(TavilyResult(title=result["title"], content=result["content"], url=result["url"],
+                                            topic="Follow-up"))
+    if trace.enabled():
+        trace.info(f"Research Follow-up: {len(results) - len(state.get('tavily_search_results') or [])} new results for `{query}`.")
+    try:
+        answer = _followup_answer(state, results, False, "research_followup")
+    except Exception as e:
+        print(f"Warning: Could not answer the follow-up. Error: {e}")
+        answer = _sources_fallback(results)
+    if search_request(answer) is not None:
+        # Only one search per follow-up; a second request gets the project's summary instead.
+        answer = ("The research for this conversation does not answer that question. Here is the legal "
+                  f"summary for your project:\n\n{state.get('researched_summary', '')}")
+    return {"project_roadmap": answer, "tavily_search_results": results,
+            "legal_summary": state.get("researched_summary", ""), "route_decision": "end"}
+
+
+def prewarm_jurisdiction(project_type: str, city: str, geo_state: str) -> str:
+    """Rebuilds the cached answer for one jurisdiction outside of a user request (see src/prewarm.py).
+
+    Returns "touched" when the search found the sources the cached answer was written from
+    (its TTL is restarted without any LLM call), "refreshed" when a new answer was written,
+    "no_results" or "failed".
+    """
+    state: AgentState = {
+        "user_input": f"{project_type} in {city}, {geo_state}",
+        "project_type": project_type,
+        "city": city,
+        "geo_state": geo_state,
+        "legal_info_found": False,
+        "legal_summary": "",
+        "suggested_websites": [],
+        "project_roadmap": "",
+        "route_decision": "",
+    }
+    # The search drops the cached answer if its sources changed, so one that survives is still current.
+    # It goes to the web: the corpus and the search cache would return the sources the answer was built from.
+    # The fresh results are written back to both.
+    state = _run_legal_search(state, fresh=True)
+    if not state["legal_info_found"]:
+        return "no_results"
+    if resources.answer_cache.touch(project_type, city, geo_state):
+        return "touched"
+    if SINGLE_CALL_ROADMAP:
+        state.update(summarize_and_plan(state))
+    else:
+        state.update(analyze_and_summarize(state))
+        state.update(generate_project_roadmap(state))
+    # There was no entry before, so any entry now was written by this run.
+    return "refreshed" if resources.answer_cache.age(project_type, city, geo_state) is not None else "failed"
+
+
 def route_query_type(state: AgentState) -> str:
     """Routes based on the 'query_type' field in the state."""
     if state["query_type"] == "legal_query":
         return "legal_query"
     elif state["query_type"] == "general_query":
         return "general_query"
-    return "general_query" # Fallback
\ No newline at end of file
+    return "general_query" # Fallback
+
+
+def route_followup(state: AgentState) -> str:
+    """'followup' when this conversation has already researched the jurisdiction the query is about.
+
+    The input must carry earlier messages: a checkpoint alone may belong to a cleared chat or an
+    earlier batch run on the same thread_id.
+    """
+    if (FOLLOWUP_REUSE and state.get("researched_summary") and has_history(state["user_input"])
+            and "unknown" not in (state["project_type"], state["city"], state["geo_state"])
+            and state.get("researched_jurisdiction") == jurisdiction_id(state["project_type"], state["city"], state["geo_state"])):
+        return "followup"
+    return "research"
+
+
+def route_analyzed_query(state: AgentState) -> str:
+    """route_query_type, with legal follow-ups about the researched jurisdiction sent to 'followup'."""
+    route = route_query_type(state)
+    return "followup" if route == "legal_query" and route_followup(state) == "followup" else route
+
+
+def route_followup_answer(state: AgentState) -> str:
+    return "search" if state.get("route_decision") == "followup_search" else "answered"
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""Disk-backed cache of final legal summaries and roadmaps per jurisdiction.
+
+The summary and roadmap depend only on (project_type, city, geo_state) and the search
+results, so once they have been written for a jurisdiction, later questions about it are
+answered straight from this cache; the graph skips the search and both LLM calls.
+
+Each entry records a fingerprint of the search results it was written from. When a search
+for the same jurisdiction comes back with different sources, the entry is dropped so the
+next request rebuilds it. Jurisdictions can also be invalidated by hand:
+
+    python -m src.answer_cache invalidate --city "Los Angeles" --state CA [--project-type ADU] [--with-searches]
+    python -m src.answer_cache stats
+"""
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from .corpus import normalize_place
+from .context import normalize_url
+
+
+def fingerprint_results(results: Iterable[dict]) -> str:
+    """Order-independent hash of the sources (URL and content) an answer was built from."""
+    parts = sorted(
+        normalize_url(r.get("url", "")) + "\0" + hashlib.sha256(r.get("content", "").encode()).hexdigest()
+        for r in results
+    )
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class AnswerCache:
+    """SQLite cache of {legal_summary, project_roadmap} keyed on the normalized jurisdiction.
+
+    Entries expire after `ttl` seconds and are evicted least-recently-used first once the
+    cache holds more than `max_entries` rows.
+    """
+
+    def __init__(self, path: str = "answer_cache.db", ttl: float = 7 * 24 * 3600, max_entries: int = 2000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answer_cache ("
+                " project_type TEXT NOT NULL,"
+                " city TEXT NOT NULL,"
+                " geo_state TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " legal_summary TEXT NOT NULL,"
+                " project_roadmap TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " PRIMARY KEY (project_type, city, geo_state))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answer_cache_access ON answer_cache(last_access)")
+            self._conn.commit()
+
+    @staticmethod
+    def _key(project_type: str, city: str, geo_state: str) -> tuple:
+        return normalize_place(project_type), normalize_place(city), normalize_place(geo_state)
+
+    def get(self, project_type: str, city: str, geo_state: str) -> Optional[dict]:
+        key = self._key(project_type, city, geo_state)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT legal_summary, project_roadmap, fingerprint, created_at FROM answer_cache "
+                "WHERE project_type = ? AND city = ? AND geo_state = ?", key
+            ).fetchone()
+            if row is None or now - row[3] > self.ttl:
+                if row is not None:
+                    self._conn.execute(
+                        "DELETE FROM answer_cache WHERE project_type = ? AND city = ? AND geo_state = ?", key
+                    )
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE answer_cache SET last_access = ? WHERE project_type = ? AND city = ? AND geo_state = ?",
+                (now,) + key,
+            )
+            self._conn.commit()
+            self.hits += 1
+        return {"legal_summary": row[0], "project_roadmap": row[1], "fingerprint": row[2], "age": now - row[3]}
+
+    def age(self, project_type: str, city: str, geo_state: str) -> Optional[float]:
+        """Seconds since the entry was written, or None if there is no live entry; counts nothing."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM answer_cache WHERE project_type = ? AND city = ? AND geo_state = ?",
+                self._key(project_type, city, geo_state),
+            ).fetchone()
+        age = time.time() - row[0] if row else None
+        return age if age is not None and age <= self.ttl else None
+
+    def touch(self, project_type: str, city: str, geo_state: str) -> bool:
+        """Restarts the entry's TTL (its sources were found unchanged); True if there was one."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE answer_cache SET created_at = ? WHERE project_type = ? AND city = ? AND geo_state = ?",
+                (time.time(),) + self._key(project_type, city, geo_state),
+            )
+            self._conn.commit()
+        return cur.rowcount > 0
+
+    def set(self, project_type: str, city: str, geo_state: str, fingerprint: str,
+            legal_summary: str, project_roadmap: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answer_cache (project_type, city, geo_state, fingerprint, legal_summary, "
+                "project_roadmap, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._key(project_type, city, geo_state) + (fingerprint, legal_summary, project_roadmap, now, now),
+            )
+            self._conn.execute("DELETE FROM answer_cache WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM answer_cache WHERE rowid IN ("
+                " SELECT rowid FROM answer_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def invalidate_if_changed(self, project_type: str, city: str, geo_state: str, fingerprint: str) -> bool:
+        """Drops the entry if it was built from different sources; True if one was dropped."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM answer_cache WHERE project_type = ? AND city = ? AND geo_state = ? AND fingerprint != ?",
+                self._key(project_type, city, geo_state) + (fingerprint,),
+            )
+            self._conn.commit()
+        return cur.rowcount > 0
+
+    def invalidate(self, city: str, geo_state: str, project_type: Optional[str] = None) -> int:
+        """Drops the entries for a jurisdiction (every project type unless one is given)."""
+        params = (normalize_place(city), normalize_place(geo_state))
+        sql = "DELETE FROM answer_cache WHERE city = ? AND geo_state = ?"
+        if project_type:
+            sql += " AND project_type = ?"
+            params += (normalize_place(project_type),)
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            self._conn.commit()
+        return cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answer_cache")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the jurisdiction answer cache.")
+    parser.add_argument("--db", default=None, help="cache database (defaults to ANSWER_CACHE_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    invalidate = sub.add_parser("invalidate", help="drop the cached answers for a jurisdiction")
+    invalidate.add_argument("--city", required=True)
+    invalidate.add_argument("--state", required=True)
+    invalidate.add_argument("--project-type", default=None)
+    invalidate.add_argument("--with-searches", action="store_true",
+                            help="also drop the cached web searches and the local corpus documents, "
+                                 "so the answer is rebuilt from fresh sources")
+    sub.add_parser("clear", help="drop every cached answer")
+    sub.add_parser("stats", help="print entry counts")
+    args = parser.parse_args()
+
+    from .config import ANSWER_CACHE_PATH, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES
+    cache = AnswerCache(args.db or ANSWER_CACHE_PATH, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES)
+    if args.command == "invalidate":
+        print(f"Dropped {cache.invalidate(args.city, args.state, args.project_type)} cached answers.")
+        if args.with_searches:
+            from .planner import jurisdiction_queries
+            from .resources import resources
+            for query in jurisdiction_queries(args.project_type or "", args.city, args.state):
+                resources.search_cache.invalidate(query)
+            # The corpus would otherwise serve the same documents, and so the same answer, again.
+            removed = resources.legal_corpus.invalidate(args.city, args.state, args.project_type)
+            print(f"Dropped {removed} local corpus documents.")
+            if not args.project_type:
+                print("Note: project-specific searches are only dropped when --project-type is given.")
+    elif args.command == "clear":
+        cache.clear()
+    else:
+        print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
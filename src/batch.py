@@ -0,0 +1,169 @@
+"""Run the workflow over a JSONL file of queries.
+
+    python -m src.batch jurisdictions.jsonl roadmaps.jsonl --concurrency 8
+
+Each input line is either {"query": "..."} or {"project_type": ..., "city": ..., "geo_state": ...}
+(an optional "id" is copied to the output). Lines run on their own thread_id (new for every run) with at most
+`--concurrency` in flight, and each result is appended to the output file as soon as it
+finishes, so results arrive in completion order and carry the input line number.
+
+Re-running the same command resumes: lines that already have a successful result in the
+output file are skipped, failed ones are retried. The search cache, LLM response cache and
+local corpus are shared by all lines, so overlapping jurisdictions get cheaper as the run goes.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Set, Tuple
+
+from .instrumentation import MetricsCallback
+
+UNKNOWN = "unknown"
+
+
+def query_for(record: dict) -> str:
+    if record.get("query"):
+        return record["query"]
+    project_type = record.get("project_type") or "construction project"
+    place = ", ".join(p for p in (record.get("city"), record.get("geo_state")) if p)
+    return (f"I want to build a {project_type} in {place} as an owner-builder. "
+            "What permits, zoning rules and steps do I need?")
+
+
+def initial_state(record: dict) -> dict:
+    return {
+        "user_input": query_for(record),
+        # Structured rows skip extraction of details we already know.
+        "project_type": record.get("project_type") or UNKNOWN,
+        "city": record.get("city") or UNKNOWN,
+        "geo_state": record.get("geo_state") or UNKNOWN,
+        "legal_info_found": False,
+        "legal_summary": "",
+        "suggested_websites": [],
+        "project_roadmap": "",
+        "route_decision": "",
+    }
+
+
+def completed_lines(output_path: str) -> Set[int]:
+    """Input line numbers that already have a successful result in the output file."""
+    done = set()
+    try:
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by an interrupted run.
+                    continue
+                if record.get("error") is None and "line" in record:
+                    done.add(record["line"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def read_input(input_path: str, skip: Set[int]) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(line number, record, None), or (line number, None, error) for a line that is not a JSON object."""
+    with open(input_path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip() or number in skip:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, None, f"JSONDecodeError: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, f"ValueError: expected a JSON object, got {type(record).__name__}"
+                continue
+            yield number, record, None
+
+
+def run_line(graph, number: int, record: dict, thread_prefix: str) -> dict:
+    thread_id = f"{thread_prefix}:{record.get('id', number)}"
+    config = {"configurable": {"thread_id": thread_id}, "callbacks": [MetricsCallback()]}
+    result = {"line": number, "id": record.get("id"), "thread_id": thread_id, "error": None}
+    start = time.perf_counter()
+    try:
+        final = graph.invoke(initial_state(record), config=config)
+        result.update({
+            "query_type": final.get("query_type"),
+            "project_type": final.get("project_type"),
+            "city": final.get("city"),
+            "geo_state": final.get("geo_state"),
+            "legal_info_found": final.get("legal_info_found"),
+            "legal_summary": final.get("legal_summary", ""),
+            "project_roadmap": final.get("project_roadmap", ""),
+        })
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(input_path: str, output_path: str, concurrency: int = 4, thread_prefix: str = "batch",
+              graph=None, log=sys.stderr) -> dict:
+    # Threads are per run: a re-run must not find (and answer from) the checkpoints of an earlier one.
+    thread_prefix = f"{thread_prefix}:{uuid.uuid4().hex[:8]}"
+    if graph is None:
+        from .resources import resources
+        resources.warmup()
+        graph = resources.graph
+    skip = completed_lines(output_path)
+    counts = {"skipped": len(skip), "succeeded": 0, "failed": 0}
+    # Keeps at most `concurrency` lines in flight so huge inputs are streamed, not loaded.
+    in_flight = threading.BoundedSemaphore(concurrency)
+    write_lock = threading.Lock()
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="batch"
+    ) as pool:
+        def _write(result):
+            with write_lock:
+                out.write(json.dumps(result, default=str) + "\n")
+                out.flush()
+                counts["failed" if result["error"] else "succeeded"] += 1
+                finished = counts["succeeded"] + counts["failed"]
+                if log is not None and finished % 10 == 0:
+                    print(f"{finished} lines done, {finished / (time.perf_counter() - start):.2f}/s", file=log)
+
+        def _done(future):
+            _write(future.result())
+            in_flight.release()
+
+        for number, record, error in read_input(input_path, skip):
+            if error is not None:
+                # Unreadable lines fail on their own; a re-run retries them once they are fixed.
+                _write({"line": number, "id": None, "thread_id": None, "error": error, "elapsed": 0.0})
+                continue
+            in_flight.acquire()
+            pool.submit(run_line, graph, number, record, thread_prefix).add_done_callback(_done)
+
+    counts["elapsed"] = round(time.perf_counter() - start, 3)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the workflow over a JSONL file of queries.")
+    parser.add_argument("input", help="JSONL with {query} or {project_type, city, geo_state} per line")
+    parser.add_argument("output", help="JSONL results; appended to, and used to resume")
+    parser.add_argument("--concurrency", type=int, default=None, help="lines in flight (defaults to BATCH_CONCURRENCY)")
+    parser.add_argument("--thread-prefix", default="batch", help="prefix of the per-line thread_id")
+    args = parser.parse_args()
+
+    from .config import BATCH_CONCURRENCY
+    counts = run_batch(args.input, args.output, concurrency=args.concurrency or BATCH_CONCURRENCY,
+                       thread_prefix=args.thread_prefix)
+    print(counts)
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
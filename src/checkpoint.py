@@ -0,0 +1,360 @@
+"""Concurrency-safe, compact SQLite checkpoint store.
+
+`PooledSqliteSaver` is a drop-in `SqliteSaver` that
+  * draws connections from a bounded pool of WAL-mode connections instead of sharing one
+    connection behind a process-wide lock, so reads run concurrently and only writes queue,
+  * supports the async checkpointer API by running the same calls on worker threads,
+    so `app.astream` works against the same store as `app.stream`,
+  * compresses checkpoint and write blobs, and stores large channel values (e.g.
+    `tavily_search_results`) once by content hash instead of once per step,
+  * prunes threads idle for longer than the retention period and old checkpoints
+    beyond the last `keep_last` of each thread.
+
+    python -m src.checkpoint prune     # apply the retention policy now
+    python -m src.checkpoint stats
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+_BLOB_REF = "__checkpoint_blob__"
+
+
+class _ConnectionPool:
+    """A bounded pool of WAL-mode connections to one SQLite file.
+
+    `borrow()` is re-entrant per thread: nested borrows (e.g. the serializer writing a
+    blob while the saver holds a cursor) reuse the connection the thread already holds.
+    """
+
+    def __init__(self, path: str, size: int = 8, busy_timeout_ms: int = 10000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.busy_timeout_ms / 1000)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def current(self) -> Optional[sqlite3.Connection]:
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def borrow(self) -> Iterator[sqlite3.Connection]:
+        held = self.current()
+        if held is not None:
+            yield held
+            return
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            self._local.conn = conn
+            try:
+                yield conn
+            finally:
+                self._local.conn = None
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        self._idle = queue.LifoQueue()
+
+
+class _BlobStore:
+    """Content-addressed, compressed storage for large serialized values."""
+
+    def __init__(self, pool: _ConnectionPool, write_lock: threading.RLock, touch_interval: float = 3600):
+        self.pool = pool
+        self.write_lock = write_lock
+        self.touch_interval = touch_interval
+        # hash -> when this process last wrote/touched it; skips redundant writes for hot blobs.
+        self._touched = {}
+        with pool.borrow() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint_blobs ("
+                " hash TEXT PRIMARY KEY, type TEXT NOT NULL, data BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.commit()
+
+    def put(self, type_: str, data: bytes) -> str:
+        digest = hashlib.sha256(type_.encode() + b"\0" + data).hexdigest()
+        now = time.time()
+        if now - self._touched.get(digest, 0.0) < self.touch_interval:
+            return digest
+        with self.write_lock, self.pool.borrow() as conn:
+            conn.execute(
+                "INSERT INTO checkpoint_blobs (hash, type, data, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(hash) DO UPDATE SET last_used = excluded.last_used",
+                (digest, type_, zlib.compress(data), now),
+            )
+            # Inside a saver write the blob commits together with the checkpoint that references it.
+            if not getattr(self.pool._local, "tx_depth", 0):
+                conn.commit()
+        if len(self._touched) > 10000:
+            self._touched.clear()
+        self._touched[digest] = now
+        return digest
+
+    def forget(self) -> None:
+        """Drops the touch memo, e.g. after pruning deleted blobs."""
+        self._touched.clear()
+
+    def get(self, digest: str) -> Optional[Tuple[str, bytes]]:
+        with self.pool.borrow() as conn:
+            row = conn.execute("SELECT type, data FROM checkpoint_blobs WHERE hash = ?", (digest,)).fetchone()
+        return (row[0], zlib.decompress(row[1])) if row else None
+
+
+class CompactSerializer:
+    """Wraps the LangGraph serializer with compression and blob externalization.
+
+    Channel values of a checkpoint that serialize to at least `externalize_bytes` are
+    replaced by a reference into the blob store, so identical search results shared by
+    consecutive checkpoints are written once. Everything else over `compress_bytes`
+    is zlib-compressed in place.
+    """
+
+    def __init__(self, blobs: _BlobStore, inner=None, compress_bytes: int = 512, externalize_bytes: int = 4096):
+        self.blobs = blobs
+        self.inner = inner or JsonPlusSerializer()
+        self.compress_bytes = compress_bytes
+        self.externalize_bytes = externalize_bytes
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if isinstance(obj, dict) and isinstance(obj.get("channel_values"), dict):
+            channel_values = {}
+            for channel, value in obj["channel_values"].items():
+                type_, data = self.inner.dumps_typed(value)
+                if len(data) >= self.externalize_bytes:
+                    channel_values[channel] = {_BLOB_REF: self.blobs.put(type_, data)}
+                else:
+                    channel_values[channel] = value
+            obj = {**obj, "channel_values": channel_values}
+            type_, data = self.inner.dumps_typed(obj)
+        else:
+            type_, data = self.inner.dumps_typed(obj)
+            if len(data) >= self.externalize_bytes:
+                return f"blob:{type_}", self.blobs.put(type_, data).encode()
+        if len(data) >= self.compress_bytes:
+            return f"zlib:{type_}", zlib.compress(data)
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith("blob:"):
+            stored = self.blobs.get(bytes(payload).decode())
+            if stored is None:
+                return None
+            type_, payload = stored
+        elif type_.startswith("zlib:"):
+            type_, payload = type_[len("zlib:"):], zlib.decompress(payload)
+        obj = self.inner.loads_typed((type_, payload))
+        if isinstance(obj, dict) and isinstance(obj.get("channel_values"), dict):
+            for channel, value in obj["channel_values"].items():
+                if isinstance(value, dict) and set(value) == {_BLOB_REF}:
+                    stored = self.blobs.get(value[_BLOB_REF])
+                    # A blob can only be missing if retention pruned it from under a very old checkpoint.
+                    obj["channel_values"][channel] = self.inner.loads_typed(stored) if stored else None
+        return obj
+
+    # Older callers use the untyped API.
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+
+class PooledSqliteSaver(SqliteSaver):
+    def __init__(self, path: str = "checkpoints.db", retention_seconds: Optional[float] = 30 * 24 * 3600,
+                 keep_last: Optional[int] = 20, prune_every: int = 500, pool_size: int = 8):
+        self.pool = _ConnectionPool(path, size=pool_size)
+        self.path = path
+        # SQLite allows one writer at a time; queueing writers on a lock avoids busy-wait backoff.
+        self.write_lock = threading.RLock()
+        self.blobs = _BlobStore(self.pool, self.write_lock)
+        super().__init__(None, serde=CompactSerializer(self.blobs))
+        self.retention_seconds = retention_seconds
+        self.keep_last = keep_last
+        self.prune_every = prune_every
+        self._puts = 0
+        self._puts_lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # SqliteSaver code that reaches for `self.conn` inside a cursor() block gets the
+        # connection this thread borrowed for it.
+        return self.pool.current()
+
+    @conn.setter
+    def conn(self, value: sqlite3.Connection) -> None:
+        pass
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        with self.lock, self.pool.borrow() as conn:
+            if self.is_setup:
+                return
+            super().setup()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+            )
+            conn.commit()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        self.setup()
+        if not transaction:
+            # Reads run concurrently under WAL.
+            with self.pool.borrow() as conn:
+                cur = conn.cursor()
+                try:
+                    yield cur
+                finally:
+                    cur.close()
+            return
+        with self.write_lock, self.pool.borrow() as conn:
+            local = self.pool._local
+            depth = getattr(local, "tx_depth", 0)
+            local.tx_depth = depth + 1
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                local.tx_depth = depth
+                # Nested write blocks share the outermost transaction.
+                if depth == 0:
+                    conn.commit()
+                cur.close()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        # One transaction for the checkpoint and its thread's activity stamp.
+        with self.cursor() as cur:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            cur.execute(
+                "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (str(config["configurable"]["thread_id"]), time.time()),
+            )
+        with self._puts_lock:
+            self._puts += 1
+            due = self.prune_every and self._puts % self.prune_every == 0
+        if due:
+            self.prune()
+        return next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def prune(self, retention_seconds: Optional[float] = None, keep_last: Optional[int] = None) -> dict:
+        """Deletes idle threads, checkpoints beyond the last `keep_last` per thread, their
+        writes, and blobs nobody has written for the whole retention period."""
+        retention_seconds = self.retention_seconds if retention_seconds is None else retention_seconds
+        keep_last = self.keep_last if keep_last is None else keep_last
+        report = {"threads": 0, "checkpoints": 0, "writes": 0, "blobs": 0}
+        with self.cursor() as cur:
+            if retention_seconds is not None:
+                cutoff = time.time() - retention_seconds
+                stale = [row[0] for row in cur.execute(
+                    "SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,)
+                ).fetchall()]
+                for thread_id in stale:
+                    cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                    report["checkpoints"] += cur.rowcount
+                    cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                    report["writes"] += cur.rowcount
+                    cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+                report["threads"] = len(stale)
+                cur.execute("DELETE FROM checkpoint_blobs WHERE last_used < ?", (cutoff,))
+                report["blobs"] = cur.rowcount
+                self.blobs.forget()
+            if keep_last:
+                cur.execute(
+                    "DELETE FROM checkpoints WHERE rowid IN ("
+                    " SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+                    "  PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rank FROM checkpoints)"
+                    " WHERE rank > ?)",
+                    (keep_last,),
+                )
+                report["checkpoints"] += cur.rowcount
+                cur.execute(
+                    "DELETE FROM writes WHERE (thread_id, checkpoint_ns, checkpoint_id) NOT IN ("
+                    " SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints)"
+                )
+                report["writes"] += cur.rowcount
+        return report
+
+    def stats(self) -> dict:
+        with self.cursor(transaction=False) as cur:
+            counts = {
+                table: cur.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("thread_activity", "checkpoints", "writes", "checkpoint_blobs")
+            }
+        counts["bytes"] = sum(os.path.getsize(p) for p in (self.path, f"{self.path}-wal") if os.path.exists(p))
+        return counts
+
+    # Async API: the same pooled calls on worker threads.
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator:
+        for item in await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the checkpoint store.")
+    parser.add_argument("command", choices=["prune", "stats"])
+    parser.add_argument("--db", default=None, help="checkpoint database (defaults to CHECKPOINT_PATH)")
+    args = parser.parse_args()
+
+    from .config import CHECKPOINT_PATH, CHECKPOINT_RETENTION_DAYS, CHECKPOINT_KEEP_LAST
+    saver = PooledSqliteSaver(args.db or CHECKPOINT_PATH, retention_seconds=CHECKPOINT_RETENTION_DAYS * 24 * 3600,
+                              keep_last=CHECKPOINT_KEEP_LAST)
+    if args.command == "prune":
+        print(saver.prune())
+    print(saver.stats())
+
+
+if __name__ == "__main__":
+    main()
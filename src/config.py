@@ -2,5 +2,119 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
-os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
\ No newline at end of file
+for _key in ("GROQ_API_KEY", "TAVILY_API_KEY"):
+    if os.getenv(_key):
+        os.environ[_key] = os.getenv(_key)
+
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "checkpoints.db")
+CHECKPOINT_RETENTION_DAYS = float(os.getenv("CHECKPOINT_RETENTION_DAYS", "30"))  # threads idle longer are pruned
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))  # checkpoints kept per thread
+
+# Legal search fan-out
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "5"))
+SEARCH_QUERY_TIMEOUT = float(os.getenv("SEARCH_QUERY_TIMEOUT", "15"))  # seconds per Tavily query
+SEARCH_TOTAL_TIMEOUT = float(os.getenv("SEARCH_TOTAL_TIMEOUT", "25"))  # seconds for the whole fan-out
+
+# Query planner (src/planner.py): pick topics and search depth per project type, stop once enough .gov sources are found
+SEARCH_PLANNER_ENABLED = os.getenv("SEARCH_PLANNER_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_EARLY_EXIT_SOURCES = int(os.getenv("SEARCH_EARLY_EXIT_SOURCES", "4"))  # distinct authoritative pages; 0 runs every wave
+SEARCH_AUTHORITATIVE_SUFFIXES = os.getenv("SEARCH_AUTHORITATIVE_SUFFIXES", ".gov")  # comma-separated host suffixes
+
+# Disk-backed search result cache (lives next to checkpoints.db)
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "search_cache.db")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(7 * 24 * 3600)))  # ordinances change slowly
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+# In-process cache for structured LLM outputs (classification / location extraction)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", "0.9"))  # 0 disables semantic lookups
+
+# Classify + extract project details in one LLM call instead of classify_query -> parse_user_input
+COMBINED_QUERY_ANALYSIS = os.getenv("COMBINED_QUERY_ANALYSIS", "true").lower() in ("1", "true", "yes")
+
+# Write the legal summary and roadmap in one LLM call (summarize_and_plan) instead of two serial calls
+SINGLE_CALL_ROADMAP = os.getenv("SINGLE_CALL_ROADMAP", "false").lower() in ("1", "true", "yes")
+
+# Context assembly before summarization (llama-3.1-8b-instant has a small context window)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_CHUNK_TOKENS = int(os.getenv("CONTEXT_CHUNK_TOKENS", "200"))
+
+# Summarize each search topic in parallel (map), then merge the topic notes (reduce), instead of one big prompt
+MAP_REDUCE_SUMMARY = os.getenv("MAP_REDUCE_SUMMARY", "false").lower() in ("1", "true", "yes")
+MAP_REDUCE_TOPIC_TOKENS = int(os.getenv("MAP_REDUCE_TOPIC_TOKENS", "800"))  # context budget per topic prompt
+MAP_REDUCE_MAX_WORKERS = int(os.getenv("MAP_REDUCE_MAX_WORKERS", "5"))
+
+# Answer follow-ups about an already researched jurisdiction from the stored results (src/followup.py)
+FOLLOWUP_REUSE = os.getenv("FOLLOWUP_REUSE", "true").lower() in ("1", "true", "yes")
+FOLLOWUP_CONTEXT_TOKENS = int(os.getenv("FOLLOWUP_CONTEXT_TOKENS", "2000"))
+
+# Offline legal corpus (SQLite FTS5) queried before the web
+LOCAL_CORPUS_ENABLED = os.getenv("LOCAL_CORPUS_ENABLED", "true").lower() in ("1", "true", "yes")
+LOCAL_CORPUS_PATH = os.getenv("LOCAL_CORPUS_PATH", "legal_corpus.db")
+LOCAL_CORPUS_MAX_AGE = float(os.getenv("LOCAL_CORPUS_MAX_AGE", str(30 * 24 * 3600)))  # ignore documents older than this
+LOCAL_CORPUS_MIN_RESULTS = int(os.getenv("LOCAL_CORPUS_MIN_RESULTS", "2"))  # on-topic hits needed to skip the web for a query
+
+# Conversation memory in app.py: verbatim window + rolling summary, capped in tokens
+MEMORY_WINDOW_SIZE = int(os.getenv("MEMORY_WINDOW_SIZE", "4"))
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "600"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "200"))
+REACT_HISTORY_MAX_TOKENS = int(os.getenv("REACT_HISTORY_MAX_TOKENS", "6000"))  # streamlit_app.py ReAct agent
+REACT_MAX_TOOL_ROUNDS = int(os.getenv("REACT_MAX_TOOL_ROUNDS", "3"))  # tool rounds per user turn (src/react_tools.py)
+REACT_TOOL_BUDGET_SECONDS = float(os.getenv("REACT_TOOL_BUDGET_SECONDS", "30"))  # wall time after which no new tool round starts
+REACT_TOOL_OUTPUT_TOKENS = int(os.getenv("REACT_TOOL_OUTPUT_TOKENS", "600"))  # per tool call, after compaction
+REACT_TOOL_MEMO_ENTRIES = int(os.getenv("REACT_TOOL_MEMO_ENTRIES", "512"))  # memoized tool outputs across threads
+
+# Headless HTTP/SSE service (src/service.py)
+SERVICE_MAX_CONCURRENCY = int(os.getenv("SERVICE_MAX_CONCURRENCY", "16"))  # graph runs executing at once
+SERVICE_MAX_QUEUE = int(os.getenv("SERVICE_MAX_QUEUE", "64"))  # runs waiting for a slot before 429s
+SERVICE_WORKER_THREADS = int(os.getenv("SERVICE_WORKER_THREADS", "32"))  # threads for the sync graph nodes
+SERVICE_RUN_TIMEOUT = float(os.getenv("SERVICE_RUN_TIMEOUT", "120"))
+
+# Instrumentation (src/instrumentation.py): append every timing event to this JSON-lines file
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", "")
+
+# Provider limits (src/resilience.py); 0 disables a limit. Defaults match Groq's free tier.
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+GROQ_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("GROQ_COMPLETION_TOKENS_ESTIMATE", "400"))  # reserved per call
+TAVILY_REQUESTS_PER_MINUTE = float(os.getenv("TAVILY_REQUESTS_PER_MINUTE", "100"))
+PROVIDER_MAX_ATTEMPTS = int(os.getenv("PROVIDER_MAX_ATTEMPTS", "3"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # consecutive failures that open the circuit
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+SEARCH_HEDGE_AFTER = float(os.getenv("SEARCH_HEDGE_AFTER", "0"))  # seconds before a DuckDuckGo hedge fires; 0 disables
+
+# Final summary + roadmap per jurisdiction (src/answer_cache.py); a hit skips search and both LLM calls
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "answer_cache.db")
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(7 * 24 * 3600)))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+
+# Jurisdiction request counts (src/query_log.py), used to keep popular answers warm (src/prewarm.py)
+QUERY_LOG_ENABLED = os.getenv("QUERY_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH", "query_log.db")
+QUERY_LOG_RETENTION_DAYS = float(os.getenv("QUERY_LOG_RETENTION_DAYS", "30"))
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() in ("1", "true", "yes")  # scheduler in src/service.py
+PREWARM_HOURS = os.getenv("PREWARM_HOURS", "2-5")  # off-peak window, local hours [start, end)
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "20"))
+PREWARM_WINDOW_DAYS = float(os.getenv("PREWARM_WINDOW_DAYS", "7"))  # popularity is counted over this many days
+PREWARM_MIN_REQUESTS = int(os.getenv("PREWARM_MIN_REQUESTS", "2"))
+PREWARM_BUDGET_CALLS = int(os.getenv("PREWARM_BUDGET_CALLS", "100"))  # web searches + LLM calls per pass
+PREWARM_REFRESH_MARGIN = float(os.getenv("PREWARM_REFRESH_MARGIN", str(24 * 3600)))  # refresh answers expiring sooner
+PREWARM_CHECK_SECONDS = float(os.getenv("PREWARM_CHECK_SECONDS", "600"))
+
+# Offline gazetteer (src/gazetteer.py): skip the extraction LLM call when city, state and project type are matched by rules
+GAZETTEER_FAST_PATH = os.getenv("GAZETTEER_FAST_PATH", "true").lower() in ("1", "true", "yes")
+
+# Model routing (src/routing.py): a tier per graph node; nodes not listed use the small model
+MODEL_SMALL = os.getenv("MODEL_SMALL", "llama-3.1-8b-instant")
+MODEL_LARGE = os.getenv("MODEL_LARGE", "llama-3.3-70b-versatile")
+NODE_MODEL_TIERS = os.getenv("NODE_MODEL_TIERS", "analyze_and_summarize=large,generate_roadmap=large,summarize_and_plan=large")
+MODEL_LARGE_TIMEOUT = float(os.getenv("MODEL_LARGE_TIMEOUT", "20"))  # seconds before a large-model call falls back to the small model
+GROQ_LARGE_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_LARGE_REQUESTS_PER_MINUTE", "30"))  # Groq limits are per model
+GROQ_LARGE_TOKENS_PER_MINUTE = float(os.getenv("GROQ_LARGE_TOKENS_PER_MINUTE", "12000"))
+# USD per million input/output tokens, for the llm_cost_usd_total counter
+MODEL_PRICES = os.getenv("MODEL_PRICES", "llama-3.1-8b-instant=0.05/0.08,llama-3.3-70b-versatile=0.59/0.79")
+REACT_MODEL = os.getenv("REACT_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")  # streamlit_app.py agent
+
+# Batch mode (python -m src.batch): lines in flight at once
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
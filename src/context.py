@@ -0,0 +1,146 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from .models import TavilyResult
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Terms that mark a passage as relevant to every legal query, whatever the jurisdiction.
+LEGAL_TERMS = "owner builder rights permit requirements zoning ordinance building code setback inspection"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _shingles(text: str, size: int = 5) -> set:
+    words = _tokenize(text)
+    return {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+
+def dedupe_results(results: List[TavilyResult], similarity: float = 0.8) -> List[TavilyResult]:
+    """Drops results whose URL was already seen, or whose content is a near-duplicate
+    (word 5-gram Jaccard similarity >= `similarity`) of an earlier result."""
+    seen_urls = set()
+    kept, kept_shingles = [], []
+    for result in results:
+        url = normalize_url(result.get("url", ""))
+        if url and url in seen_urls:
+            continue
+        shingles = _shingles(result.get("content", ""))
+        if any(len(shingles & other) / len(shingles | other) >= similarity for other in kept_shingles if shingles | other):
+            continue
+        seen_urls.add(url)
+        kept.append(result)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def chunk_text(text: str, max_tokens: int = 200) -> List[str]:
+    """Splits text into passages of at most ~`max_tokens`, breaking on sentence boundaries."""
+    sentences = re.split(r"(?<=[.!?])\s+|\n+", text.strip())
+    chunks, current = [], ""
+    for sentence in filter(None, (s.strip() for s in sentences)):
+        while estimate_tokens(sentence) > max_tokens:
+            # A single run-on "sentence" longer than a chunk: hard-split it.
+            head, sentence = sentence[:max_tokens * 4], sentence[max_tokens * 4:]
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(head)
+        if current and estimate_tokens(current + " " + sentence) > max_tokens:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def authority_boost(url: str) -> float:
+    host = urlsplit(url.lower()).netloc
+    if host.endswith(".gov") or ".gov." in host or host.endswith(".us"):
+        return 1.5
+    if host.endswith(".edu") or host.endswith(".org"):
+        return 1.1
+    return 1.0
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    tokenized = [_tokenize(doc) for doc in documents]
+    if not tokenized:
+        return []
+    avg_len = sum(len(doc) for doc in tokenized) / len(tokenized) or 1.0
+    doc_freq = Counter(term for doc in tokenized for term in set(doc))
+    query_terms = set(_tokenize(query))
+    scores = []
+    for doc in tokenized:
+        freqs = Counter(doc)
+        score = 0.0
+        for term in query_terms:
+            if term not in freqs:
+                continue
+            idf = math.log(1 + (len(tokenized) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            tf = freqs[term]
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def build_context(results: List[TavilyResult], query: str, token_budget: int = 3000,
+                  chunk_tokens: int = 200) -> Tuple[List[TavilyResult], Dict[str, int]]:
+    """Dedupes, chunks and ranks the search results, then greedily packs the best passages
+    into `token_budget`. Returns the packed passages (grouped per source, best source first)
+    and a report of how many tokens were saved compared with sending every result in full."""
+    original_tokens = sum(estimate_tokens(r.get("title", "")) + estimate_tokens(r.get("content", "")) for r in results)
+    unique = dedupe_results(results)
+
+    passages = []
+    for source_rank, result in enumerate(unique):
+        for chunk in chunk_text(result.get("content", ""), chunk_tokens):
+            passages.append({"source": source_rank, "order": len(passages), "text": chunk})
+    scores = bm25_scores(f"{query} {LEGAL_TERMS}", [f"{unique[p['source']].get('title', '')} {p['text']}" for p in passages])
+    for passage, score in zip(passages, scores):
+        passage["score"] = score * authority_boost(unique[passage["source"]].get("url", ""))
+
+    selected: Dict[int, List[dict]] = {}
+    used_tokens = 0
+    for passage in sorted(passages, key=lambda p: p["score"], reverse=True):
+        source = unique[passage["source"]]
+        cost = estimate_tokens(passage["text"]) + (0 if passage["source"] in selected else estimate_tokens(source.get("title", "")) + 10)
+        if used_tokens + cost > token_budget:
+            continue
+        selected.setdefault(passage["source"], []).append(passage)
+        used_tokens += cost
+
+    packed: List[TavilyResult] = []
+    for source_rank in sorted(selected, key=lambda s: max(p["score"] for p in selected[s]), reverse=True):
+        source = unique[source_rank]
+        # Keep the passages of one source in their original reading order.
+        texts = [p["text"] for p in sorted(selected[source_rank], key=lambda p: p["order"])]
+        packed.append(TavilyResult(title=source.get("title", ""), url=source.get("url", ""), content=" ... ".join(texts)))
+
+    report = {
+        "results_in": len(results),
+        "results_after_dedupe": len(unique),
+        "results_packed": len(packed),
+        "original_tokens": original_tokens,
+        "packed_tokens": used_tokens,
+        "tokens_saved": max(0, original_tokens - used_tokens),
+    }
+    return packed, report
@@ -0,0 +1,161 @@
+"""Offline legal corpus: a SQLite FTS5 (BM25) index of fetched documents, filtered by jurisdiction.
+
+`legal_search_agent` queries this index first and only falls back to the web for queries the
+corpus can't cover. Documents can also be loaded from JSONL files:
+
+    python -m src.corpus ingest documents.jsonl --city "Los Angeles" --state CA
+    python -m src.corpus search "ADU permit requirements" --city "Los Angeles" --state CA
+"""
+import argparse
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from .models import TavilyResult
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_place(value: str) -> str:
+    return " ".join(_WORD.findall((value or "").lower()))
+
+
+class LegalCorpus:
+    def __init__(self, path: str = "legal_corpus.db", max_age: Optional[float] = None):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS corpus USING fts5("
+                " title, content,"
+                " url UNINDEXED, city UNINDEXED, geo_state UNINDEXED, project_type UNINDEXED,"
+                " source UNINDEXED, fetched_at UNINDEXED,"
+                " tokenize = 'porter unicode61')"
+            )
+            self._conn.commit()
+
+    def ingest(self, documents: Iterable[TavilyResult], city: str, geo_state: str,
+               project_type: str = "", source: str = "tavily") -> int:
+        """Adds or refreshes documents for a jurisdiction; a URL is stored once per jurisdiction and project type."""
+        city, geo_state = normalize_place(city), normalize_place(geo_state)
+        now = time.time()
+        count = 0
+        with self._lock:
+            for doc in documents:
+                if not all(doc.get(k) for k in ("title", "content", "url")):
+                    continue
+                self._conn.execute(
+                    "DELETE FROM corpus WHERE url = ? AND city = ? AND geo_state = ? AND project_type = ?",
+                    (doc["url"], city, geo_state, project_type),
+                )
+                self._conn.execute(
+                    "INSERT INTO corpus (title, content, url, city, geo_state, project_type, source, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (doc["title"], doc["content"], doc["url"], city, geo_state, project_type, source, now),
+                )
+                count += 1
+            self._conn.commit()
+        return count
+
+    def search(self, query: str, city: str, geo_state: str, limit: int = 5,
+               min_term_coverage: float = 0.5, project_type: Optional[str] = None) -> List[TavilyResult]:
+        """BM25 search restricted to one jurisdiction.
+
+        Jurisdiction words are dropped from the query (the filter already covers them) and a
+        document only counts as a hit if it contains at least `min_term_coverage` of the
+        remaining topic terms, so "covered" means on-topic rather than merely same-city.
+        With `project_type`, only documents fetched for that project type (or loaded without
+        one) are searched: a deck's permit pages do not answer a fence's permit query.
+        """
+        city, geo_state = normalize_place(city), normalize_place(geo_state)
+        place_words = set(city.split()) | set(geo_state.split())
+        terms = [t for t in dict.fromkeys(_WORD.findall(query.lower())) if t not in place_words]
+        if not terms:
+            return []
+        match = " OR ".join(f'"{t}"' for t in terms)
+        sql = (
+            "SELECT title, content, url, fetched_at, "
+            " highlight(corpus, 0, '\x02', '\x03') || ' ' || highlight(corpus, 1, '\x02', '\x03') "
+            "FROM corpus WHERE corpus MATCH ? AND city = ? AND geo_state = ?"
+        )
+        params = [match, city, geo_state]
+        if project_type:
+            sql += " AND (project_type = '' OR lower(project_type) = lower(?))"
+            params.append(project_type)
+        if self.max_age is not None:
+            sql += " AND fetched_at >= ?"
+            params.append(time.time() - self.max_age)
+        sql += " ORDER BY bm25(corpus) LIMIT ?"
+        params.append(limit * 4)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results: List[TavilyResult] = []
+        for title, content, url, _, highlighted in rows:
+            matched = {m.lower() for m in re.findall("\x02(.*?)\x03", highlighted)}
+            # Highlights are surface forms of porter-stemmed matches; compare on prefixes.
+            covered = sum(1 for t in terms if any(m.startswith(t[:5]) or t.startswith(m[:5]) for m in matched))
+            if covered / len(terms) >= min_term_coverage:
+                results.append(TavilyResult(title=title, content=content, url=url))
+            if len(results) >= limit:
+                break
+        return results
+
+    def invalidate(self, city: str, geo_state: str, project_type: Optional[str] = None) -> int:
+        """Drops a jurisdiction's documents (only those of `project_type` when given); returns how many."""
+        city, geo_state = normalize_place(city), normalize_place(geo_state)
+        sql, params = "DELETE FROM corpus WHERE city = ? AND geo_state = ?", [city, geo_state]
+        if project_type:
+            sql += " AND lower(project_type) = lower(?)"
+            params.append(project_type)
+        with self._lock:
+            removed = self._conn.execute(sql, params).rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM corpus").fetchone()[0]
+            jurisdictions = self._conn.execute("SELECT COUNT(DISTINCT city || '|' || geo_state) FROM corpus").fetchone()[0]
+        return {"documents": documents, "jurisdictions": jurisdictions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the offline legal corpus.")
+    parser.add_argument("--db", default=None, help="corpus database (defaults to LOCAL_CORPUS_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="load a JSONL file of {title, content, url} documents")
+    ingest.add_argument("path")
+    ingest.add_argument("--city", required=True)
+    ingest.add_argument("--state", required=True)
+    ingest.add_argument("--project-type", default="")
+    search = sub.add_parser("search", help="query the corpus for one jurisdiction")
+    search.add_argument("query")
+    search.add_argument("--city", required=True)
+    search.add_argument("--state", required=True)
+    search.add_argument("--project-type", default=None)
+    search.add_argument("--limit", type=int, default=5)
+    sub.add_parser("stats", help="print document and jurisdiction counts")
+    args = parser.parse_args()
+
+    from .config import LOCAL_CORPUS_PATH
+    corpus = LegalCorpus(args.db or LOCAL_CORPUS_PATH)
+    if args.command == "ingest":
+        with open(args.path, encoding="utf-8") as f:
+            documents = [json.loads(line) for line in f if line.strip()]
+        added = corpus.ingest(documents, args.city, args.state, args.project_type, source=args.path)
+        print(f"Ingested {added} of {len(documents)} documents.")
+    elif args.command == "search":
+        for result in corpus.search(args.query, args.city, args.state, limit=args.limit, project_type=args.project_type):
+            print(f"{result['title']}\n  {result['url']}\n  {result['content'][:160]}\n")
+    else:
+        print(corpus.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Follow-up turns about a jurisdiction the thread has already researched.
+
+After a legal answer, the checkpoint keeps the thread's search results together with
+`researched_jurisdiction` and `researched_summary`. When a later turn in the same thread
+resolves to the same (project_type, city, geo_state), e.g. "what about setbacks?", the
+graph skips the searches and the summary and routes to `answer_followup` instead. That node
+makes one LLM call over the stored results. If they do not cover the question, the model
+replies with `NEEDS_SEARCH: <query>` and `research_followup` runs that one targeted search
+before answering.
+
+The marker must not reach the user while the answer streams, so UIs pass the tokens of both
+nodes through a `FollowupStreamFilter`.
+"""
+from typing import Optional
+
+from .singleflight import jurisdiction_key
+
+NEEDS_SEARCH = "NEEDS_SEARCH:"
+
+# Follow-up answers are built by these nodes; their tokens are the answer.
+FOLLOWUP_NODES = {"answer_followup", "research_followup"}
+
+
+def jurisdiction_id(project_type: str, city: str, geo_state: str) -> str:
+    return "|".join(jurisdiction_key(project_type, city, geo_state))
+
+
+def search_request(text: str) -> Optional[str]:
+    """The query of a `NEEDS_SEARCH: <query>` reply, or None for an answer."""
+    text = text.strip()
+    if not text.upper().startswith(NEEDS_SEARCH):
+        return None
+    rest = text[len(NEEDS_SEARCH):].strip()
+    return rest.splitlines()[0].strip() if rest else ""
+
+
+class FollowupStreamFilter:
+    """Holds back a follow-up node's streamed text while it could still be a NEEDS_SEARCH reply."""
+
+    def __init__(self):
+        self.text = ""
+        self.suppressed = False
+        self._released = False
+
+    def feed(self, token: str) -> str:
+        """Returns the text that can be shown now ("" while undecided or suppressed)."""
+        self.text += token
+        if self.suppressed:
+            return ""
+        if self._released:
+            return token
+        head = self.text.lstrip().upper()
+        if head.startswith(NEEDS_SEARCH):
+            self.suppressed = True
+            return ""
+        if NEEDS_SEARCH.startswith(head):
+            return ""
+        self._released = True
+        return self.text
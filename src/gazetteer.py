@@ -0,0 +1,253 @@
+"""Offline US place gazetteer: canonical city/state names and rule-based location extraction.
+
+`src/data/us_places.csv` lists the ~7,500 US places with at least 5,000 inhabitants
+(GeoNames data, CC BY 4.0). It is loaded once into an in-memory index keyed on
+normalized names, so "St. Louis, Mo.", "saint louis MO" and "St Louis, Missouri" all
+resolve to ("St. Louis", "MO").
+
+`extract_location` finds a city together with its state in free text without an LLM call,
+and `match_project_type` recognizes common project types by keyword. When both succeed the
+query-parsing nodes skip their LLM call; otherwise the LLM output is still canonicalized here
+so every spelling of a jurisdiction shares one search, cache and corpus key.
+"""
+import csv
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PLACES_PATH = Path(__file__).parent / "data" / "us_places.csv"
+
+STATES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina", "SD": "South Dakota",
+    "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia",
+    "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+}
+
+# AP-style and other common state abbreviations (matched only right after a city).
+STATE_ABBREVIATIONS = {
+    "ala": "AL", "ariz": "AZ", "ark": "AR", "cal": "CA", "calif": "CA", "colo": "CO", "conn": "CT",
+    "del": "DE", "fla": "FL", "ga": "GA", "ill": "IL", "ind": "IN", "kan": "KS", "kans": "KS",
+    "ky": "KY", "la": "LA", "md": "MD", "mass": "MA", "mich": "MI", "minn": "MN", "miss": "MS",
+    "mo": "MO", "mont": "MT", "neb": "NE", "nebr": "NE", "nev": "NV", "n h": "NH", "n j": "NJ",
+    "n m": "NM", "n y": "NY", "n c": "NC", "n d": "ND", "okla": "OK", "ore": "OR", "oreg": "OR",
+    "pa": "PA", "penn": "PA", "r i": "RI", "s c": "SC", "s d": "SD", "tenn": "TN", "tex": "TX",
+    "vt": "VT", "va": "VA", "wash": "WA", "w va": "WV", "wis": "WI", "wisc": "WI", "wyo": "WY",
+    "d c": "DC", "washington dc": "DC", "washington d c": "DC",
+}
+
+# Nicknames that name one place; the state comes with them.
+CITY_ALIASES = {
+    "la": ("Los Angeles", "CA"), "l a": ("Los Angeles", "CA"), "nyc": ("New York City", "NY"),
+    "new york": ("New York City", "NY"), "sf": ("San Francisco", "CA"), "san fran": ("San Francisco", "CA"),
+    "philly": ("Philadelphia", "PA"), "vegas": ("Las Vegas", "NV"), "nola": ("New Orleans", "LA"),
+    "dc": ("Washington", "DC"), "d c": ("Washington", "DC"), "washington dc": ("Washington", "DC"),
+    "atl": ("Atlanta", "GA"), "chi town": ("Chicago", "IL"), "slc": ("Salt Lake City", "UT"),
+    "okc": ("Oklahoma City", "OK"), "kc": ("Kansas City", "MO"), "nashvegas": ("Nashville", "TN"),
+}
+# Aliases that are also state codes are too ambiguous to imply a state on their own.
+_AMBIGUOUS_ALIASES = {"la", "dc", "d c"}
+
+# A city named without its state is accepted only if it is this large and unique by name.
+UNIQUE_CITY_MIN_POPULATION = 250000
+
+# Checked in order; the first type whose keywords appear wins ("garage ADU" is an ADU).
+PROJECT_TYPES = [
+    ("ADU", ["adu", "accessory dwelling unit", "accessory dwelling", "granny flat", "in law unit",
+             "in law suite", "backyard cottage", "casita", "guest house", "jadu"]),
+    ("tiny home", ["tiny home", "tiny house"]),
+    ("duplex", ["duplex", "triplex", "fourplex"]),
+    ("home addition", ["room addition", "home addition", "house addition", "second story addition",
+                       "second floor addition", "bedroom addition", "addition to my house", "addition to my home",
+                       "addition to the house", "addition to our house", "addition to our home"]),
+    ("single-family home", ["single family home", "single family house", "new home", "custom home",
+                            "new house", "build a house", "build my house", "build a home", "build my home"]),
+    ("garage", ["garage", "carport"]),
+    ("kitchen remodel", ["kitchen remodel", "kitchen renovation"]),
+    ("bathroom remodel", ["bathroom remodel", "bathroom renovation"]),
+    ("basement finish", ["basement finish", "finish my basement", "finish the basement", "basement"]),
+    ("remodel", ["remodel", "renovation", "renovate"]),
+    ("deck", ["deck"]),
+    ("porch", ["porch", "patio cover", "patio"]),
+    ("pool", ["swimming pool", "pool"]),
+    ("fence", ["fence", "fencing"]),
+    ("retaining wall", ["retaining wall"]),
+    ("shed", ["shed"]),
+    ("barn", ["barn", "pole building"]),
+    ("pergola", ["pergola", "gazebo"]),
+    ("solar panels", ["solar panel", "solar panels", "solar"]),
+    ("roof replacement", ["roof replacement", "new roof", "reroof", "roof"]),
+    ("window replacement", ["window replacement", "replacement windows", "replace windows", "replace my windows",
+                            "replace the windows", "new windows"]),
+    ("driveway", ["driveway"]),
+]
+
+_PREFIXES = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount", "pt": "point"}
+_WORD = re.compile(r"[A-Za-z0-9]+")
+
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+
+
+def normalize_name(text: str) -> str:
+    """Lower-case ASCII words with St./Ft./Mt. spelled out: "St. Louis" -> "saint louis"."""
+    words = [w.lower() for w in _WORD.findall(_fold(text or ""))]
+    return " ".join(_PREFIXES.get(w, w) for w in words)
+
+
+def _compile_keywords(keywords: List[str]) -> re.Pattern:
+    return re.compile(r"\b(" + "|".join(re.escape(k).replace(r"\ ", r"[\s-]+") for k in keywords) + r")s?\b")
+
+
+_PROJECT_PATTERNS = [(name, _compile_keywords(keywords)) for name, keywords in PROJECT_TYPES]
+
+
+def match_project_type(text: str) -> Optional[str]:
+    lowered = _fold(text or "").lower()
+    for name, pattern in _PROJECT_PATTERNS:
+        if pattern.search(lowered):
+            return name
+    return None
+
+
+class Gazetteer:
+    def __init__(self, path: Path = PLACES_PATH):
+        # normalized city name -> [(canonical name, state, population)], most populous first
+        self.cities: Dict[str, List[Tuple[str, str, int]]] = defaultdict(list)
+        self.states: Dict[str, str] = {}
+        self.max_city_words = 1
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                key = normalize_name(row["city"])
+                self.cities[key].append((row["city"], row["state"], int(row["population"])))
+                self.max_city_words = max(self.max_city_words, len(key.split()))
+        for entries in self.cities.values():
+            entries.sort(key=lambda entry: -entry[2])
+        for code, name in STATES.items():
+            self.states[code.lower()] = code
+            self.states[normalize_name(name)] = code
+
+    def canonical_state(self, value: str, loose: bool = False) -> Optional[str]:
+        """Two-letter code for a state name or code; `loose` also accepts abbreviations like "Calif."."""
+        key = normalize_name(value)
+        code = self.states.get(key)
+        if code is None and loose:
+            code = STATE_ABBREVIATIONS.get(key)
+        return code
+
+    def unique_city(self, key: str) -> Optional[Tuple[str, str]]:
+        """The (city, state) of a normalized name that can only mean one large place, else None."""
+        entries = self.cities.get(key)
+        if entries and len(entries) == 1 and entries[0][2] >= UNIQUE_CITY_MIN_POPULATION and key not in self.states:
+            return entries[0][0], entries[0][1]
+        return None
+
+    def lookup(self, city: str, state: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Canonical (city, state) for a city name, restricted to `state` when given.
+
+        Without a state only nicknames and unique large cities resolve; "Springfield" stays unresolved.
+        """
+        key = normalize_name(city)
+        if state is None and key in CITY_ALIASES and key not in _AMBIGUOUS_ALIASES:
+            return CITY_ALIASES[key]
+        if state is not None and key in CITY_ALIASES and CITY_ALIASES[key][1] == state:
+            return CITY_ALIASES[key]
+        if state is None:
+            return self.unique_city(key)
+        for name, code, population in self.cities.get(key, []):
+            if code == state:
+                return name, code
+        return None
+
+    def canonicalize(self, city: str, geo_state: str) -> Tuple[str, str]:
+        """Canonical spellings for an extracted (city, state); unknown values pass through."""
+        code = self.canonical_state(geo_state, loose=True) if geo_state and geo_state != "unknown" else None
+        if city and city != "unknown":
+            # The model sometimes puts the whole "City, ST" into the city field.
+            if code is None and "," in city:
+                city, _, maybe_state = city.rpartition(",")
+                code = self.canonical_state(maybe_state, loose=True)
+            match = self.lookup(city, code)
+            if match:
+                return match
+        return city, code or geo_state
+
+    def extract_location(self, text: str) -> Optional[Tuple[str, str]]:
+        """A (city, state) named in `text`, or None when no unambiguous pair is found.
+
+        Accepts a city followed by its state ("Austin, TX", "austin texas", "St. Louis, Mo."),
+        a nickname that implies its state ("NYC"), or a large city whose name is unique
+        ("Chicago") when no other state is mentioned.
+        """
+        folded = _fold(text or "")
+        words = [(m.group(), m.start(), m.end()) for m in _WORD.finditer(folded)]
+        lowered = [_PREFIXES.get(w[0].lower(), w[0].lower()) for w in words]
+        mentioned_states = set()
+        for n in (1, 2, 3):
+            for i in range(len(lowered) - n + 1):
+                phrase = " ".join(lowered[i:i + n])
+                code = self.states.get(phrase)
+                # Two-letter codes only count in capitals ("IN" yes, "in" no).
+                if code and (n > 1 or len(phrase) > 2 or words[i][0].isupper()):
+                    mentioned_states.add(code)
+
+        # City immediately followed by its state, longest city names first.
+        for i in range(len(lowered)):
+            for n in range(min(self.max_city_words, len(lowered) - i), 0, -1):
+                city = " ".join(lowered[i:i + n])
+                if city not in self.cities and city not in CITY_ALIASES:
+                    continue
+                for m in (3, 2, 1):
+                    state_words = lowered[i + n:i + n + m]
+                    if len(state_words) < m:
+                        continue
+                    state_text = " ".join(state_words)
+                    code = self.states.get(state_text) or STATE_ABBREVIATIONS.get(state_text)
+                    if code is None:
+                        continue
+                    # "Portland or Salem": a lower-case code needs a comma ("portland, or").
+                    state_word = words[i + n][0]
+                    if (m == 1 and len(state_word) == 2 and not state_word.isupper()
+                            and "," not in folded[words[i + n - 1][2]:words[i + n][1]]):
+                        continue
+                    match = self.lookup(city, code)
+                    if match:
+                        return match
+
+        # A nickname or a big, uniquely named city, as long as no other state is in play.
+        for i in range(len(lowered)):
+            for n in range(min(self.max_city_words, len(lowered) - i), 0, -1):
+                city = " ".join(lowered[i:i + n])
+                if city in CITY_ALIASES and city not in _AMBIGUOUS_ALIASES:
+                    name, code = CITY_ALIASES[city]
+                    if mentioned_states <= {code}:
+                        return name, code
+                match = self.unique_city(city)
+                if match and words[i][0][:1].isupper() and mentioned_states <= {match[1]}:
+                    return match
+        return None
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """The shared index, loaded on first use (~7,500 rows, a few milliseconds)."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
@@ -0,0 +1,198 @@
+"""Structured timings and token counts for the LangGraph pipeline.
+
+`metrics` is the process-wide collector. It receives:
+  * node and LLM call timings (plus prompt/completion tokens) from `MetricsCallback`,
+    which is passed to the graph as a LangChain callback,
+  * search, corpus and cache events recorded directly by the code that performs them.
+
+Every event can be streamed to a JSON-lines file (`METRICS_JSONL_PATH`), and the
+aggregates are available in the Prometheus text format via `metrics.prometheus()`
+(served at `GET /metrics` by the HTTP service).
+"""
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Histogram bucket bounds in seconds; LLM calls dominate, so the tail is long.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_labels(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    """Thread-safe collector of timing events, histograms and counters."""
+
+    def __init__(self, jsonl_path: Optional[str] = None):
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, _Labels], dict] = {}
+        self._counters: Dict[Tuple[str, _Labels], float] = defaultdict(float)
+
+    def observe(self, kind: str, name: str, seconds: float, **fields: Any) -> None:
+        """Records one timed operation: `kind` is node, llm, search, corpus, ...; `name` what ran."""
+        key = (kind, _labels(name=name))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(LATENCY_BUCKETS), "count": 0, "sum": 0.0}
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+        self._export({"ts": time.time(), "kind": kind, "name": name, "seconds": round(seconds, 6), **fields})
+
+    def count(self, counter: str, amount: float = 1, **labels: Any) -> None:
+        with self._lock:
+            self._counters[(counter, _labels(**labels))] += amount
+
+    @contextmanager
+    def timer(self, kind: str, name: str, **fields: Any):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, time.perf_counter() - start, **fields)
+
+    def _export(self, event: dict) -> None:
+        if not self.jsonl_path:
+            return
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock, open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def snapshot(self) -> dict:
+        """Aggregates as plain data: {"latency": {kind: {name: {...}}}, "counters": [...]}."""
+        with self._lock:
+            latency = defaultdict(dict)
+            for (kind, labels), h in self._histograms.items():
+                latency[kind][dict(labels)["name"]] = {
+                    "count": h["count"], "sum": h["sum"], "mean": h["sum"] / h["count"] if h["count"] else 0.0,
+                }
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+        return {"latency": dict(latency), "counters": counters}
+
+    def prometheus(self) -> str:
+        lines = ["# HELP legal_bot_latency_seconds Wall time of nodes, LLM calls and searches.",
+                 "# TYPE legal_bot_latency_seconds histogram"]
+        with self._lock:
+            for (kind, labels), h in sorted(self._histograms.items()):
+                base = (("kind", kind),) + labels
+                for bound, cumulative in zip(LATENCY_BUCKETS, h["buckets"]):
+                    lines.append(f"legal_bot_latency_seconds_bucket{_format_labels(base + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"legal_bot_latency_seconds_bucket{_format_labels(base + (('le', '+Inf'),))} {h['count']}")
+                lines.append(f"legal_bot_latency_seconds_sum{_format_labels(base)} {h['sum']:.6f}")
+                lines.append(f"legal_bot_latency_seconds_count{_format_labels(base)} {h['count']}")
+            counter_names = sorted({name for name, _ in self._counters})
+            for name in counter_names:
+                lines.append(f"# TYPE legal_bot_{name} counter")
+                for (counter, labels), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f"legal_bot_{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _token_usage(response) -> Tuple[Optional[int], Optional[int]]:
+    """Prompt and completion tokens reported by the provider, if any."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("output_tokens")
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    return None, None
+
+
+class MetricsCallback(BaseCallbackHandler):
+    """LangChain callback that times graph nodes and LLM calls into a `Metrics` collector.
+
+    Pass it in the run config: `app.stream(state, config={"callbacks": [MetricsCallback()], ...})`.
+    """
+
+    def __init__(self, collector: Optional[Metrics] = None):
+        self.metrics = collector or metrics
+        self._started: Dict[UUID, Tuple[str, str, float]] = {}
+        self._models: Dict[UUID, str] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       tags=None, metadata=None, **kwargs) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # The node's own run carries its name; runnables invoked inside it only inherit the metadata.
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = ("node", node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id, error=type(error).__name__)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        self._started[run_id] = ("llm", (metadata or {}).get("langgraph_node", "unknown"), time.perf_counter())
+        params = kwargs.get("invocation_params") or {}
+        self._models[run_id] = ((metadata or {}).get("ls_model_name") or params.get("model_name")
+                                or params.get("model") or "unknown")
+
+    on_llm_start = on_chat_model_start
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        from .routing import llm_cost
+        prompt_tokens, completion_tokens = _token_usage(response)
+        started = self._started.get(run_id)
+        node = started[1] if started else "unknown"
+        model = self._models.pop(run_id, "unknown")
+        self.metrics.count("llm_calls_total", node=node, model=model)
+        if prompt_tokens is not None:
+            self.metrics.count("llm_prompt_tokens_total", prompt_tokens, node=node, model=model)
+        if completion_tokens is not None:
+            self.metrics.count("llm_completion_tokens_total", completion_tokens, node=node, model=model)
+        cost = llm_cost(model, prompt_tokens, completion_tokens)
+        if cost is not None:
+            self.metrics.count("llm_cost_usd_total", cost, node=node, model=model)
+        self._finish(run_id, model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost=cost)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        model = self._models.pop(run_id, None)
+        self._finish(run_id, model=model, error=type(error).__name__)
+
+    def _finish(self, run_id: UUID, **fields) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        kind, name, start = started
+        if fields.get("error"):
+            self.metrics.count("errors_total", kind=kind, name=name)
+        self.metrics.observe(kind, name, time.perf_counter() - start, **{k: v for k, v in fields.items() if v is not None})
+
+
+def _default_collector() -> Metrics:
+    from .config import METRICS_JSONL_PATH
+    return Metrics(jsonl_path=METRICS_JSONL_PATH or None)
+
+
+metrics = _default_collector()
@@ -0,0 +1,108 @@
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from pydantic import BaseModel
+
+
+def normalize_prompt(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def hashed_ngram_embedding(text: str, dim: int = 256) -> List[float]:
+    """Cheap, offline embedding: character trigrams hashed into a fixed-size, L2-normalized
+    vector. Good enough to catch rephrasings like "hi" / "hi!" / "hello there"."""
+    vector = [0.0] * dim
+    padded = f"  {normalize_prompt(text)}  "
+    for i in range(len(padded) - 2):
+        digest = hashlib.md5(padded[i:i + 3].encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "little") % dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class ResponseCache:
+    """In-process LRU cache for structured LLM outputs (Pydantic models).
+
+    Lookups are exact on the normalized prompt first; callers can opt into a semantic
+    lookup that returns the closest cached prompt in the same namespace if its embedding
+    similarity is at least `similarity_threshold`. Embeddings must be L2-normalized.
+    """
+
+    def __init__(self, max_entries: int = 1024, similarity_threshold: float = 0.9,
+                 embed_fn: Optional[Callable[[str], List[float]]] = hashed_ngram_embedding):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, prompt: str, semantic: bool = False) -> Optional[BaseModel]:
+        key = (namespace, normalize_prompt(prompt))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry["value"].model_copy()
+        if semantic and self.embed_fn is not None and self.similarity_threshold > 0:
+            vector = self.embed_fn(prompt)
+            best_key, best_score = None, self.similarity_threshold
+            with self._lock:
+                for entry_key, entry in self._entries.items():
+                    if entry_key[0] != namespace or entry["embedding"] is None:
+                        continue
+                    score = _cosine(vector, entry["embedding"])
+                    if score >= best_score:
+                        best_key, best_score = entry_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    return self._entries[best_key]["value"].model_copy()
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, namespace: str, prompt: str, value: BaseModel) -> None:
+        key = (namespace, normalize_prompt(prompt))
+        embedding = self.embed_fn(prompt) if self.embed_fn is not None else None
+        with self._lock:
+            self._entries[key] = {"prompt": prompt, "value": value.model_copy(), "embedding": embedding}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.exact_hits = self.semantic_hits = self.misses = 0
+
+    def entries(self, namespace: Optional[str] = None) -> List[dict]:
+        """Snapshot of cached prompts and values, least recently used first."""
+        with self._lock:
+            return [
+                {"namespace": key[0], "prompt": entry["prompt"], "value": entry["value"].model_dump()}
+                for key, entry in self._entries.items()
+                if namespace is None or key[0] == namespace
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,96 @@
+from typing import Callable, List, Optional
+
+from .context import estimate_tokens
+
+UNKNOWN = "unknown"
+LATEST_MESSAGE = "Latest Message:\n"
+PREVIOUS_MESSAGES = "Previous Messages:\n"
+EARLIER_SUMMARY = "Earlier Conversation (summary): "
+
+
+def _gist(text: str, max_chars: int = 160) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars].rsplit(" ", 1)[0] + "..."
+
+
+def latest_message(user_input: str) -> str:
+    """The newest message of a rendered `user_input` (see ConversationMemory.render)."""
+    return user_input.rsplit(LATEST_MESSAGE, 1)[-1]
+
+
+def has_history(user_input: str) -> bool:
+    """True when a rendered `user_input` carries earlier messages of the conversation or their summary."""
+    head = user_input.rsplit(LATEST_MESSAGE, 1)[0] if LATEST_MESSAGE in user_input else ""
+    return PREVIOUS_MESSAGES in head or EARLIER_SUMMARY in head
+
+
+class ConversationMemory:
+    """Bounded conversation context for the LangGraph workflow.
+
+    The last `window_size` user messages are kept verbatim; older ones are folded into a
+    rolling summary (extractive by default, or via `summarizer`, e.g. a cheap LLM call).
+    `render()` never exceeds `max_tokens`. The extracted project details are kept as
+    structured slots so they carry over to follow-up turns instead of being re-derived
+    from the whole transcript.
+    """
+
+    def __init__(self, window_size: int = 4, max_tokens: int = 600, summary_tokens: int = 200,
+                 summarizer: Optional[Callable[[str, List[str]], str]] = None):
+        self.window_size = window_size
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.window: List[str] = []
+        self.summary = ""
+        self.project_type = UNKNOWN
+        self.city = UNKNOWN
+        self.geo_state = UNKNOWN
+
+    def add_user_message(self, text: str) -> None:
+        self.window.append(text)
+        if len(self.window) > self.window_size:
+            evicted, self.window = self.window[:-self.window_size], self.window[-self.window_size:]
+            self._fold_into_summary(evicted)
+
+    def _fold_into_summary(self, evicted: List[str]) -> None:
+        if self.summarizer is not None:
+            self.summary = self.summarizer(self.summary, evicted)
+        else:
+            self.summary = " | ".join(filter(None, [self.summary] + [_gist(m) for m in evicted]))
+        # Keep the most recent part of the summary when it outgrows its budget.
+        while estimate_tokens(self.summary) > self.summary_tokens and " | " in self.summary:
+            self.summary = self.summary.split(" | ", 1)[1]
+        if estimate_tokens(self.summary) > self.summary_tokens:
+            self.summary = self.summary[-self.summary_tokens * 4:]
+
+    def update_project(self, project_type: str, city: str, geo_state: str) -> None:
+        """Records newly extracted project details; 'unknown' never overwrites a known value."""
+        for slot, value in (("project_type", project_type), ("city", city), ("geo_state", geo_state)):
+            if value and value != UNKNOWN:
+                setattr(self, slot, value)
+
+    def project(self) -> dict:
+        return {"project_type": self.project_type, "city": self.city, "geo_state": self.geo_state}
+
+    def render(self, latest_message: str) -> str:
+        """Builds the `user_input` for the next turn within `max_tokens`."""
+        known = {k: v for k, v in self.project().items() if v != UNKNOWN}
+        previous = self.window[:-1] if self.window and self.window[-1] == latest_message else list(self.window)
+        while True:
+            parts = []
+            if known:
+                parts.append("Known Project Details: " + ", ".join(f"{k}={v}" for k, v in known.items()))
+            if self.summary:
+                parts.append(f"{EARLIER_SUMMARY}{self.summary}")
+            if previous:
+                parts.append(PREVIOUS_MESSAGES + "\n".join(f"- {m}" for m in previous))
+            parts.append(f"{LATEST_MESSAGE}{latest_message}")
+            rendered = "\n\n".join(parts)
+            if estimate_tokens(rendered) <= self.max_tokens or not previous:
+                return rendered
+            previous = previous[1:]
+
+    def clear(self) -> None:
+        self.window = []
+        self.summary = ""
+        self.project_type = self.city = self.geo_state = UNKNOWN
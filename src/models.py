@@ -1,10 +1,11 @@
-from typing import TypedDict, List
+from typing import TypedDict, List, NotRequired
 from pydantic import BaseModel, Field
 
 class TavilyResult(TypedDict):
     title: str
     content: str
     url: str
+    topic: NotRequired[str]  # which jurisdiction query found it (see planner.JURISDICTION_TOPICS)
 
 class AgentState(TypedDict):
     user_input: str
@@ -18,6 +19,10 @@ class AgentState(TypedDict):
     route_decision: str
     tavily_search_results: List[TavilyResult]
     query_type: str
+    # Kept in the checkpoint across turns so follow-ups can reuse the research (see src/followup.py)
+    researched_jurisdiction: NotRequired[str]
+    researched_summary: NotRequired[str]
+    followup_query: NotRequired[str]
 
 class ProjectLocation(BaseModel):
     project_type: str = Field(...)
@@ -25,4 +30,10 @@ class ProjectLocation(BaseModel):
     geo_state: str = Field(...)
 
 class QueryClassifier(BaseModel):
-    query_type: str = Field(...)
\ No newline at end of file
+    query_type: str = Field(...)
+
+class QueryAnalysis(BaseModel):
+    query_type: str = Field(..., description="'legal_query' or 'general_query'")
+    project_type: str = Field("unknown", description="Construction project type, or 'unknown'")
+    city: str = Field("unknown", description="City of the project, or 'unknown'")
+    geo_state: str = Field("unknown", description="US state of the project, or 'unknown'")
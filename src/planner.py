@@ -0,0 +1,117 @@
+"""Chooses which legal-search queries to run for a project, and how deeply.
+
+A window replacement does not need the zoning search an ADU does. Each project type belongs
+to a class (new structure, exterior, interior, equipment) with its own list of topics. Each
+topic has a Tavily search depth ("advanced" costs twice as many credits as "basic") and a
+wave. The queries in wave 1 run first. Wave 2 runs only if wave 1 found fewer than
+`SEARCH_EARLY_EXIT_SOURCES` distinct authoritative (.gov) pages. Project types the planner
+does not recognize get the full plan: every topic, advanced, in one wave.
+"""
+from typing import Dict, List, Optional, Tuple, TypedDict
+from urllib.parse import urlsplit
+
+from .context import normalize_url
+from .gazetteer import match_project_type
+from .models import TavilyResult
+
+# The topics a legal search can cover, in the order their results are presented.
+JURISDICTION_TOPICS = ["Owner-builder rights", "Permit requirements", "Zoning", "Local ordinances", "Building codes"]
+
+# Topics whose sources apply to every project in a jurisdiction; the others are specific to the project type.
+JURISDICTION_WIDE_TOPICS = {"Owner-builder rights", "Local ordinances"}
+
+TOPIC_QUERIES = {
+    "Owner-builder rights": "owner-builder rights {city}, {geo_state}",
+    "Permit requirements": "{project_type} permit requirements {city}, {geo_state}",
+    "Zoning": "zoning laws {city}, {geo_state} {project_type} construction",
+    "Local ordinances": "local construction ordinances {city}, {geo_state}",
+    "Building codes": "building codes {project_type} {city}, {geo_state}",
+}
+
+# Results kept per query at each depth.
+MAX_RESULTS = {"advanced": 5, "basic": 3}
+
+# project class -> [(topic, depth, wave)]
+PLANS: Dict[str, List[Tuple[str, str, int]]] = {
+    "new_structure": [
+        ("Permit requirements", "advanced", 1), ("Zoning", "advanced", 1), ("Building codes", "advanced", 1),
+        ("Owner-builder rights", "basic", 2), ("Local ordinances", "basic", 2),
+    ],
+    "exterior": [
+        ("Permit requirements", "advanced", 1), ("Zoning", "basic", 1),
+        ("Local ordinances", "basic", 2), ("Building codes", "basic", 2),
+    ],
+    "interior": [
+        ("Permit requirements", "advanced", 1), ("Building codes", "basic", 1),
+        ("Owner-builder rights", "basic", 2),
+    ],
+    "equipment": [
+        ("Permit requirements", "advanced", 1), ("Building codes", "basic", 1),
+        ("Local ordinances", "basic", 2),
+    ],
+    "full": [(topic, "advanced", 1) for topic in JURISDICTION_TOPICS],
+}
+
+# Canonical project types from src/gazetteer.py -> project class
+PROJECT_CLASSES = {
+    "ADU": "new_structure", "tiny home": "new_structure", "duplex": "new_structure",
+    "home addition": "new_structure", "single-family home": "new_structure", "garage": "new_structure",
+    "barn": "new_structure",
+    "deck": "exterior", "porch": "exterior", "pool": "exterior", "fence": "exterior",
+    "retaining wall": "exterior", "shed": "exterior", "pergola": "exterior", "driveway": "exterior",
+    "kitchen remodel": "interior", "bathroom remodel": "interior", "basement finish": "interior",
+    "remodel": "interior",
+    "solar panels": "equipment", "roof replacement": "equipment", "window replacement": "equipment",
+}
+
+
+class PlannedQuery(TypedDict):
+    query: str
+    topic: str
+    search_depth: str
+    max_results: int
+    wave: int
+
+
+def jurisdiction_queries(project_type: str, city: str, geo_state: str) -> List[str]:
+    """Every topic query for a jurisdiction, planned or not (e.g. to invalidate their cache entries)."""
+    return [TOPIC_QUERIES[topic].format(project_type=project_type, city=city, geo_state=geo_state)
+            for topic in JURISDICTION_TOPICS]
+
+
+def project_class(project_type: str) -> str:
+    return PROJECT_CLASSES.get(project_type) or PROJECT_CLASSES.get(match_project_type(project_type) or "", "full")
+
+
+def plan_queries(project_type: str, city: str, geo_state: str, enabled: bool = True) -> Tuple[str, List[PlannedQuery]]:
+    """(project class, planned queries in topic order); `enabled=False` returns the full plan."""
+    plan_class = project_class(project_type) if enabled else "full"
+    planned = {topic: (depth, wave) for topic, depth, wave in PLANS[plan_class]}
+    return plan_class, [
+        PlannedQuery(query=TOPIC_QUERIES[topic].format(project_type=project_type, city=city, geo_state=geo_state),
+                     topic=topic, search_depth=planned[topic][0], max_results=MAX_RESULTS[planned[topic][0]],
+                     wave=planned[topic][1])
+        for topic in JURISDICTION_TOPICS if topic in planned
+    ]
+
+
+def authoritative_sources(results: List[TavilyResult], suffixes: Tuple[str, ...] = (".gov",)) -> int:
+    """Distinct pages among the results whose host ends with one of `suffixes`."""
+    pages = set()
+    for result in results:
+        host = urlsplit(result.get("url", "").strip().lower()).hostname or ""
+        if host.endswith(suffixes):
+            pages.add(normalize_url(result["url"]))
+    return len(pages)
+
+
+def parse_suffixes(spec: str) -> Tuple[str, ...]:
+    return tuple(s if s.startswith(".") else f".{s}" for s in (part.strip().lower() for part in spec.split(",")) if s)
+
+
+def should_stop(results: List[TavilyResult], min_sources: int, suffixes: Tuple[str, ...]) -> Optional[int]:
+    """The authoritative source count if it is enough to skip the remaining waves, else None."""
+    if min_sources <= 0:
+        return None
+    found = authoritative_sources(results, suffixes)
+    return found if found >= min_sources else None
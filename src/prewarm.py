@@ -0,0 +1,146 @@
+"""Keeps the cached answers of the most-asked jurisdictions warm.
+
+Most traffic asks about a few (project_type, city, geo_state) combinations, but whoever asks
+first after an answer expires pays for the searches and both LLM calls. A prewarm pass reads
+the top jurisdictions from the query log (src/query_log.py). For each one whose cached answer
+is missing or expires within `PREWARM_REFRESH_MARGIN` seconds, it searches the web again,
+bypassing the search cache and the local corpus (both are updated with what it finds):
+
+  * if the sources are unchanged, only the answer's TTL is restarted (no LLM calls);
+  * otherwise a new summary and roadmap are written.
+
+A pass stops once its budget of provider calls (web searches + LLM calls, charged at their
+upper bound) is spent. Run one pass by hand or from cron:
+
+    python -m src.prewarm --top 20 --budget 100
+    python -m src.prewarm --dry-run     # list what would be refreshed
+
+With PREWARM_ENABLED the HTTP service runs a PrewarmScheduler that makes one pass a day
+inside the off-peak window PREWARM_HOURS (local time, e.g. "2-5").
+"""
+import argparse
+import json
+import threading
+import time
+from typing import Optional, Tuple
+
+from .config import (ANSWER_CACHE_ENABLED, MAP_REDUCE_SUMMARY, SEARCH_PLANNER_ENABLED, SINGLE_CALL_ROADMAP,
+                     PREWARM_HOURS, PREWARM_TOP_N, PREWARM_WINDOW_DAYS, PREWARM_MIN_REQUESTS,
+                     PREWARM_BUDGET_CALLS, PREWARM_REFRESH_MARGIN, PREWARM_CHECK_SECONDS)
+from .instrumentation import metrics
+from .planner import plan_queries
+from .resources import resources
+
+
+def estimated_calls(project_type: str, city: str, geo_state: str) -> int:
+    """Upper bound on the provider calls one refresh makes: every planned search plus the summary calls."""
+    _, planned = plan_queries(project_type, city, geo_state, enabled=SEARCH_PLANNER_ENABLED)
+    if SINGLE_CALL_ROADMAP:
+        llm_calls = 1
+    else:
+        llm_calls = 2 + (len(planned) if MAP_REDUCE_SUMMARY else 0)
+    return len(planned) + llm_calls
+
+
+def prewarm(top: int = PREWARM_TOP_N, budget: int = PREWARM_BUDGET_CALLS, days: float = PREWARM_WINDOW_DAYS,
+            min_requests: int = PREWARM_MIN_REQUESTS, refresh_margin: float = PREWARM_REFRESH_MARGIN,
+            dry_run: bool = False) -> dict:
+    """One pass over the most-asked jurisdictions; returns what was done to each."""
+    report = {"budget": budget, "spent": 0, "jurisdictions": []}
+    if not ANSWER_CACHE_ENABLED:
+        print("Warning: prewarming needs the answer cache. Error: ANSWER_CACHE_ENABLED is false")
+        return report
+    answer_cache = resources.answer_cache
+    for entry in resources.query_log.top(top, days=days, min_requests=min_requests):
+        jurisdiction = (entry["project_type"], entry["city"], entry["geo_state"])
+        item = {"project_type": jurisdiction[0], "city": jurisdiction[1], "geo_state": jurisdiction[2],
+                "requests": entry["requests"]}
+        report["jurisdictions"].append(item)
+        age = answer_cache.age(*jurisdiction)
+        if age is not None and age < answer_cache.ttl - refresh_margin:
+            item["result"] = "fresh"
+            continue
+        cost = estimated_calls(*jurisdiction)
+        if report["spent"] + cost > budget:
+            item["result"] = "over_budget"
+            continue
+        report["spent"] += cost
+        if dry_run:
+            item["result"] = "would_refresh"
+            continue
+        start = time.perf_counter()
+        try:
+            from .agents import prewarm_jurisdiction
+            item["result"] = prewarm_jurisdiction(*jurisdiction)
+        except Exception as e:
+            print(f"Warning: Could not prewarm {jurisdiction}. Error: {e}")
+            item["result"] = "failed"
+        item["seconds"] = round(time.perf_counter() - start, 3)
+        metrics.count("prewarm_jurisdictions_total", result=item["result"])
+    return report
+
+
+def parse_hours(spec: str) -> Tuple[int, int]:
+    """"2-5" -> (2, 5); the window may wrap past midnight ("22-4")."""
+    start, _, end = spec.partition("-")
+    return int(start) % 24, int(end or start) % 24
+
+
+def in_window(hour: int, window: Tuple[int, int]) -> bool:
+    start, end = window
+    if start == end:
+        return True
+    return start <= hour < end if start < end else hour >= start or hour < end
+
+
+class PrewarmScheduler:
+    """Runs one prewarm pass per day, inside the off-peak window, on a daemon thread."""
+
+    def __init__(self, hours: str = PREWARM_HOURS, check_seconds: float = PREWARM_CHECK_SECONDS):
+        self.window = parse_hours(hours)
+        self.check_seconds = check_seconds
+        self.last_run_day: Optional[str] = None
+        self.last_report: Optional[dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="prewarm-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.check_seconds):
+            now = time.localtime()
+            day = time.strftime("%Y-%m-%d", now)
+            if self.last_run_day == day or not in_window(now.tm_hour, self.window):
+                continue
+            self.last_run_day = day
+            try:
+                self.last_report = prewarm()
+            except Exception as e:
+                print(f"Warning: The prewarm pass failed. Error: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the cached answers of the most-asked jurisdictions.")
+    parser.add_argument("--top", type=int, default=PREWARM_TOP_N)
+    parser.add_argument("--budget", type=int, default=PREWARM_BUDGET_CALLS, help="web searches + LLM calls")
+    parser.add_argument("--days", type=float, default=PREWARM_WINDOW_DAYS, help="count requests over this many days")
+    parser.add_argument("--min-requests", type=int, default=PREWARM_MIN_REQUESTS)
+    parser.add_argument("--refresh-margin", type=float, default=PREWARM_REFRESH_MARGIN,
+                        help="refresh answers expiring within this many seconds")
+    parser.add_argument("--dry-run", action="store_true", help="list what would be refreshed without calling providers")
+    args = parser.parse_args()
+
+    report = prewarm(args.top, args.budget, args.days, args.min_requests, args.refresh_margin, args.dry_run)
+    for item in report["jurisdictions"]:
+        print(json.dumps(item))
+    print(f"Spent {report['spent']} of {report['budget']} provider calls; "
+          f"query log: {resources.query_log.stats(args.days)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Daily request counts per jurisdiction, for finding the popular ones.
+
+`check_answer_cache` records the (project_type, city, geo_state) that the entry node
+extracted on every legal query, together with whether the answer cache was warm for it.
+`src/prewarm.py` reads the most-asked jurisdictions back to keep their answers cached.
+Only the canonical jurisdiction is stored, never the user's message.
+"""
+import sqlite3
+import threading
+import time
+from typing import List
+
+
+class QueryLog:
+    """SQLite table of request counts per jurisdiction per day (UTC).
+
+    Days older than `retention_days` are pruned as new ones are written.
+    """
+
+    def __init__(self, path: str = "query_log.db", retention_days: float = 30):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._pruned_day = None
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_log ("
+                " project_type TEXT NOT NULL,"
+                " city TEXT NOT NULL,"
+                " geo_state TEXT NOT NULL,"
+                " day TEXT NOT NULL,"
+                " requests INTEGER NOT NULL,"
+                " warm INTEGER NOT NULL,"
+                " last_seen REAL NOT NULL,"
+                " PRIMARY KEY (project_type, city, geo_state, day))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_query_log_day ON query_log(day)")
+            self._conn.commit()
+
+    @staticmethod
+    def _day(timestamp: float) -> str:
+        return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+    def record(self, project_type: str, city: str, geo_state: str, warm: bool = False) -> None:
+        now = time.time()
+        day = self._day(now)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO query_log (project_type, city, geo_state, day, requests, warm, last_seen) "
+                "VALUES (?, ?, ?, ?, 1, ?, ?) ON CONFLICT (project_type, city, geo_state, day) DO UPDATE SET "
+                "requests = requests + 1, warm = warm + excluded.warm, last_seen = excluded.last_seen",
+                (project_type, city, geo_state, day, int(warm), now),
+            )
+            if self._pruned_day != day:
+                self._conn.execute("DELETE FROM query_log WHERE day < ?",
+                                   (self._day(now - self.retention_days * 24 * 3600),))
+                self._pruned_day = day
+            self._conn.commit()
+
+    def top(self, n: int = 20, days: float = 7, min_requests: int = 1) -> List[dict]:
+        """The `n` jurisdictions with the most requests over the last `days`, most asked first."""
+        since = self._day(time.time() - days * 24 * 3600)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT project_type, city, geo_state, SUM(requests) AS total, SUM(warm), MAX(last_seen) "
+                "FROM query_log WHERE day >= ? GROUP BY project_type, city, geo_state "
+                "HAVING total >= ? ORDER BY total DESC, MAX(last_seen) DESC LIMIT ?",
+                (since, min_requests, n),
+            ).fetchall()
+        return [{"project_type": row[0], "city": row[1], "geo_state": row[2], "requests": row[3],
+                 "warm": row[4], "last_seen": row[5]} for row in rows]
+
+    def stats(self, days: float = 7) -> dict:
+        since = self._day(time.time() - days * 24 * 3600)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(DISTINCT project_type || '|' || city || '|' || geo_state), "
+                "COALESCE(SUM(requests), 0), COALESCE(SUM(warm), 0) FROM query_log WHERE day >= ?", (since,)
+            ).fetchone()
+        return {
+            "jurisdictions": row[0],
+            "requests": row[1],
+            "warm_rate": row[2] / row[1] if row[1] else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM query_log")
+            self._conn.commit()
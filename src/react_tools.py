@@ -0,0 +1,160 @@
+"""Tool-execution layer for the ReAct agent in streamlit_app.py.
+
+`create_react_agent` loops model -> tools -> model until the model stops calling tools. Left
+alone, the model repeats near-identical searches, every raw search payload goes back into the
+context, and a turn can take any number of rounds. This module bounds that loop:
+
+  * `ToolBudget`: at most `max_rounds` tool rounds and `seconds` of wall time per user turn.
+    After that the model is called without tools and told to answer from what it has.
+  * `MemoizedTool`: wraps a search tool. Repeated queries in the same thread (ignoring case,
+    punctuation and word order) are answered from memory, and identical concurrent calls share
+    one request. Outputs are packed into `max_tokens` before they reach the model.
+  * `compact_history`: tool outputs from earlier turns shrink to the URLs they cited.
+
+Several tool calls in one model turn run in parallel: with version="v2" the agent sends each
+call to the tools node as its own task, and LangGraph runs the tasks of a step concurrently.
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+
+from .config import CONTEXT_CHUNK_TOKENS
+from .context import build_context, estimate_tokens
+from .instrumentation import metrics
+from .search_cache import normalize_query
+from .singleflight import SingleFlight
+
+_URL = re.compile(r"https?://[^\s\"'<>)\]]+")
+
+BUDGET_EXHAUSTED_NOTE = ("The search budget for this question is used up. Do not call any more tools; "
+                         "answer now from the search results above and say what could not be verified.")
+
+
+def memo_key(query: str) -> str:
+    """Ignores case, punctuation and word order: "ADU permits Austin, TX" == "austin tx adu permits"."""
+    return " ".join(sorted(set(normalize_query(query).split())))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max_tokens * 4].rsplit(" ", 1)[0] + " ..."
+
+
+def compact_tool_output(output: Any, query: str, max_tokens: int) -> str:
+    """Search results packed into `max_tokens` as "[title](url)\\npassage" blocks; other output is truncated."""
+    if isinstance(output, dict) and isinstance(output.get("results"), list):
+        results = [{"title": r.get("title", ""), "url": r["url"], "content": r.get("content", "")}
+                   for r in output["results"] if isinstance(r, dict) and r.get("url")]
+        if not results:
+            return "No results found."
+        # Chunks must be smaller than the budget, or titles and URLs leave no room for any of them.
+        packed, _ = build_context(results, query, token_budget=max_tokens,
+                                  chunk_tokens=max(1, min(CONTEXT_CHUNK_TOKENS, max_tokens // 2)))
+        text = "\n\n".join(f"[{r['title']}]({r['url']})\n{r['content']}" for r in packed)
+        if text:
+            return text
+        output = results
+    text = output if isinstance(output, str) else json.dumps(output, default=str)
+    return truncate_tokens(text, max_tokens)
+
+
+class ToolMemo:
+    """Compacted tool outputs per (thread, tool, query); least recently used entries go first."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: Tuple[str, str, str], output: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def memoized_tool(tool: BaseTool, memo: ToolMemo, max_tokens: int) -> StructuredTool:
+    """`tool` with the same name, description and arguments, memoized per thread and compacted."""
+    flight = SingleFlight(f"react_{tool.name}")
+
+    def run(config: RunnableConfig, **tool_input) -> str:
+        query = str(tool_input.get("query") or next(iter(tool_input.values()), ""))
+        thread_id = str(config.get("configurable", {}).get("thread_id", ""))
+        key = (thread_id, tool.name, memo_key(query))
+        cached = memo.get(key)
+        metrics.count("react_tool_calls_total", tool=tool.name, result="memo" if cached is not None else "call")
+        if cached is not None:
+            return cached
+
+        def call() -> str:
+            with metrics.timer("tool", tool.name):
+                output = compact_tool_output(tool.invoke(tool_input), query, max_tokens)
+            memo.set(key, output)
+            return output
+
+        output, _ = flight.do(key, call)
+        return output
+
+    return StructuredTool.from_function(func=run, name=tool.name, description=tool.description,
+                                        args_schema=tool.args_schema)
+
+
+def current_turn(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """The messages since (and including) the latest human message."""
+    starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    return messages[starts[-1]:] if starts else list(messages)
+
+
+class ToolBudget:
+    def __init__(self, max_rounds: int = 3, seconds: float = 30.0):
+        self.max_rounds = max_rounds
+        self.seconds = seconds
+
+    def rounds(self, messages: List[BaseMessage]) -> int:
+        return sum(1 for m in current_turn(messages) if isinstance(m, AIMessage) and m.tool_calls)
+
+    def exhausted(self, state: dict) -> bool:
+        """True once the turn has used its tool rounds or its time (`turn_started` in the agent state)."""
+        if self.rounds(state["messages"]) >= self.max_rounds:
+            return True
+        started = state.get("turn_started")
+        return bool(started and self.seconds and time.time() - started >= self.seconds)
+
+    def recursion_limit(self) -> int:
+        # Each round is pre_model_hook -> agent -> tools; the final answer adds pre_model_hook -> agent.
+        return 3 * self.max_rounds + 4
+
+
+def compact_history(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Shrinks tool outputs from earlier turns to the URLs they cited; the answers already summarize them."""
+    turn_start = len(messages) - len(current_turn(messages))
+    compacted = []
+    for i, message in enumerate(messages):
+        if i < turn_start and isinstance(message, ToolMessage):
+            urls = list(dict.fromkeys(_URL.findall(str(message.content))))
+            content = "Earlier search results" + (f"; sources: {', '.join(urls)}" if urls else "") + "."
+            message = message.model_copy(update={"content": content})
+        compacted.append(message)
+    return compacted
+
+
+def budget_note() -> SystemMessage:
+    return SystemMessage(content=BUDGET_EXHAUSTED_NOTE)
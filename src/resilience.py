@@ -0,0 +1,252 @@
+"""Rate limiting, retries, circuit breaking and hedging for Groq and Tavily calls.
+
+Every outbound call goes through a `ProviderClient`, one per provider and shared by all
+threads, which
+  * waits for a token bucket (requests and tokens per minute) instead of tripping 429s,
+  * retries transient failures (429, 5xx, timeouts) with jittered exponential backoff,
+    honouring Retry-After when the provider sends one,
+  * fails fast while the provider's circuit breaker is open.
+
+`ResilientSearchTool` additionally hedges slow searches: if the primary tool has not
+answered within `hedge_after` seconds, a second search (DuckDuckGo) is fired and the
+first successful response wins.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Optional
+
+from .instrumentation import metrics
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class TokenBucket:
+    """Allows `rate_per_minute` units per minute with bursts of up to `capacity`; 0 disables it."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Blocks until `amount` units are available; False if that would exceed `timeout`."""
+        if self.rate <= 0:
+            return True
+        # A single request larger than the bucket could never be admitted otherwise.
+        amount = min(amount, self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait_for = (amount - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait_for > deadline:
+                return False
+            time.sleep(wait_for)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; after `reset_timeout` seconds one
+    trial call is let through (half-open) and its outcome closes or re-opens the circuit."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_running:
+                raise CircuitOpenError("circuit open")
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    for source in (error, getattr(error, "response", None)):
+        code = getattr(source, "status_code", None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def is_transient(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying."""
+    code = _status_code(error)
+    if code is not None:
+        return code == 429 or code >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ("rate limit", "429", "timeout", "timed out", "temporarily", "connection"))
+
+
+def is_timeout(error: Exception) -> bool:
+    if isinstance(error, TimeoutError):
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return "timeout" in text or "timed out" in text
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderClient:
+    """Shared rate limits, retry policy and circuit breaker for one provider."""
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, acquire_timeout: float = 60.0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.acquire_timeout = acquire_timeout
+        self._random = random.Random()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        hinted = retry_after(error)
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        # "Full jitter": spreads retries of parallel callers instead of synchronizing them.
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, fn: Callable[[], Any], tokens: float = 0, retry_timeouts: bool = True) -> Any:
+        """Runs `fn` under the limits; `retry_timeouts=False` lets a caller with a fallback give up on the first timeout."""
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            start = time.perf_counter()
+            if not self.requests.acquire(1, self.acquire_timeout) or not self.tokens.acquire(tokens, self.acquire_timeout):
+                raise TimeoutError(f"{self.name}: rate limiter wait exceeded {self.acquire_timeout:.0f}s")
+            waited = time.perf_counter() - start
+            if waited > 0.01:
+                metrics.observe("rate_limit_wait", self.name, waited)
+            try:
+                result = fn()
+            except Exception as e:
+                transient = is_transient(e)
+                if transient:
+                    self.breaker.record_failure()
+                else:
+                    # A bad request says nothing about the provider's health.
+                    self.breaker.record_success()
+                if not transient or attempt == self.max_attempts - 1 or (not retry_timeouts and is_timeout(e)):
+                    raise
+                metrics.count("retries_total", provider=self.name)
+                time.sleep(self._backoff(attempt, e))
+                continue
+            self.breaker.record_success()
+            return result
+
+
+def duckduckgo_search_tool(max_results: int = 5):
+    """The DuckDuckGo tool `streamlit_app.py` uses, returning structured results; None if unavailable."""
+    try:
+        from langchain_community.tools import DuckDuckGoSearchResults
+        return DuckDuckGoSearchResults(output_format="list", num_results=max_results)
+    except Exception as e:
+        print(f"Warning: DuckDuckGo hedging disabled. Error: {e}")
+        return None
+
+
+def _as_tavily_response(query: str, response: Any) -> dict:
+    """Normalizes a DuckDuckGo result list ({title, snippet, link}) to Tavily's response shape."""
+    if isinstance(response, dict):
+        return response
+    results = []
+    for item in response or []:
+        if isinstance(item, dict) and item.get("link"):
+            results.append({"title": item.get("title", ""), "content": item.get("snippet", ""), "url": item["link"]})
+    return {"query": query, "results": results}
+
+
+class ResilientSearchTool:
+    """Wraps a search tool's `.invoke` with a ProviderClient and optional hedging."""
+
+    def __init__(self, search_tool, client: ProviderClient, hedge_tool=None, hedge_client: Optional[ProviderClient] = None,
+                 hedge_after: Optional[float] = None):
+        self.search_tool = search_tool
+        self.client = client
+        self.hedge_tool = hedge_tool
+        self.hedge_client = hedge_client or ProviderClient("hedge")
+        self.hedge_after = hedge_after
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedged-search")
+
+    def _primary(self, tool_input: dict) -> Any:
+        return self.client.call(lambda: self.search_tool.invoke(tool_input))
+
+    def _hedge(self, tool_input: dict) -> dict:
+        response = self.hedge_client.call(lambda: self.hedge_tool.invoke(tool_input["query"]))
+        return _as_tavily_response(tool_input["query"], response)
+
+    def invoke(self, tool_input: dict) -> Any:
+        if self.hedge_tool is None or not self.hedge_after:
+            return self._primary(tool_input)
+        if self.client.breaker.state == "open":
+            # While the primary provider is known to be down, go straight to the hedge.
+            metrics.count("hedges_total", reason="circuit_open")
+            return self._hedge(tool_input)
+        primary = self._executor.submit(self._primary, tool_input)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done and primary.exception() is None:
+            return primary.result()
+        metrics.count("hedges_total", reason="failed" if done else "slow")
+        hedge = self._executor.submit(self._hedge, tool_input)
+        error = primary.exception() if done else None
+        pending = {hedge} if done else {primary, hedge}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                response = future.result()
+                if future is hedge:
+                    if not response.get("results"):
+                        continue
+                    metrics.count("hedges_won_total")
+                # The loser keeps running in the background; its result is discarded.
+                return response
+        raise error or RuntimeError("hedged search returned no results")
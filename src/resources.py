@@ -0,0 +1,232 @@
+"""Process-wide registry of the expensive objects the workflow needs.
+
+LLM clients, search tools, SQLite-backed caches, the checkpointer and the compiled graph are
+built on first use rather than at import time, exactly once per process, and shared by every
+Streamlit rerun, service request and batch line. Importing `src.agents` or `src.workflow` is
+therefore cheap; entry points call `resources.warmup()` to pay the construction cost up front
+(or in the background) instead of on the first user request.
+
+    from src.resources import resources
+    graph = resources.graph            # same as resources.get("graph")
+    resources.override("llm", fake)    # benchmarks: swaps the LLM and rebuilds what used it
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .instrumentation import metrics
+
+
+class Resources:
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        # name -> resources whose factories called get(name) while building
+        self._dependents: Dict[str, Set[str]] = {}
+        self.build_seconds: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._building = threading.local()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories or name in self._instances
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name not in self:
+            raise AttributeError(name)
+        return self.get(name)
+
+    def get(self, name: str) -> Any:
+        stack = getattr(self._building, "stack", None)
+        if stack:
+            with self._lock:
+                self._dependents.setdefault(name, set()).add(stack[-1])
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        # One global lock: factories depend on each other and builds are rare.
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._factories:
+                raise KeyError(f"unknown resource: {name}")
+            self._building.stack = (stack or []) + [name]
+            start = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            finally:
+                self._building.stack = stack
+            elapsed = time.perf_counter() - start
+            self._instances[name] = instance
+            self.build_seconds[name] = elapsed
+        metrics.observe("startup", name, elapsed)
+        return instance
+
+    def built(self) -> List[str]:
+        return list(self._instances)
+
+    def reset(self, *names: str) -> None:
+        """Forgets the given resources (all if none) and everything built from them."""
+        with self._lock:
+            pending = list(names or self._instances)
+            while pending:
+                name = pending.pop()
+                self._instances.pop(name, None)
+                self.build_seconds.pop(name, None)
+                pending.extend(self._dependents.pop(name, ()))
+
+    def override(self, name: str, value: Any) -> None:
+        """Replaces a resource (e.g. with a fake) and rebuilds its dependents on next use."""
+        with self._lock:
+            self.reset(name)
+            self._instances[name] = value
+
+    def warmup(self, names: Optional[Iterable[str]] = None, background: bool = False) -> Dict[str, float]:
+        """Builds the given resources (default: all registered) now; returns build seconds per resource.
+
+        With `background` the builds run on a daemon thread and an empty dict is returned.
+        """
+        names = list(names or self._factories)
+        if background:
+            if all(name in self._instances for name in names):
+                return {}
+            threading.Thread(target=self.warmup, args=(names,), name="resources-warmup", daemon=True).start()
+            return {}
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Warning: could not warm up {name}. Error: {e}")
+        return {name: self.build_seconds[name] for name in names if name in self.build_seconds}
+
+
+resources = Resources()
+
+
+# Factories. Provider SDKs are imported here, not at module level, so importing the package stays fast.
+
+def _llm():
+    from langchain_groq import ChatGroq
+    from .config import MODEL_SMALL
+    # Retries are handled by the groq ProviderClient, so the SDK's own retries are turned off.
+    return ChatGroq(model=MODEL_SMALL, max_retries=0)
+
+
+def _llm_large():
+    from langchain_groq import ChatGroq
+    from .config import MODEL_LARGE, MODEL_LARGE_TIMEOUT
+    # The timeout is what lets the router fall back to the small model instead of waiting.
+    return ChatGroq(model=MODEL_LARGE, max_retries=0, timeout=MODEL_LARGE_TIMEOUT)
+
+
+def _router():
+    from .config import NODE_MODEL_TIERS
+    from .routing import ModelRouter, parse_node_tiers
+    return ModelRouter(parse_node_tiers(NODE_MODEL_TIERS))
+
+
+def _search_tool():
+    from langchain_tavily import TavilySearch
+    return TavilySearch(max_results=5, search_depth="advanced")
+
+
+def _hedge_tool():
+    from .config import SEARCH_HEDGE_AFTER
+    from .resilience import duckduckgo_search_tool
+    return duckduckgo_search_tool() if SEARCH_HEDGE_AFTER > 0 else None
+
+
+def _resilient_search_tool():
+    from .config import SEARCH_HEDGE_AFTER
+    from .resilience import ResilientSearchTool
+    return ResilientSearchTool(resources.get("search_tool"), resources.get("tavily_client"),
+                               hedge_tool=resources.get("hedge_tool"), hedge_after=SEARCH_HEDGE_AFTER)
+
+
+def _provider_client(name: str, requests_setting: str, tokens_setting: Optional[str] = None):
+    def build():
+        from . import config
+        from .resilience import ProviderClient
+        return ProviderClient(name, getattr(config, requests_setting),
+                              getattr(config, tokens_setting) if tokens_setting else 0,
+                              max_attempts=config.PROVIDER_MAX_ATTEMPTS,
+                              failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+                              reset_timeout=config.CIRCUIT_RESET_SECONDS)
+    return build
+
+
+def _search_cache():
+    from .config import SEARCH_CACHE_PATH, SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES
+    from .search_cache import SearchCache
+    return SearchCache(SEARCH_CACHE_PATH, ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX_ENTRIES)
+
+
+def _cached_search_tool():
+    from .search_cache import CachedSearchTool
+    return CachedSearchTool(resources.get("resilient_search_tool"), resources.get("search_cache"))
+
+
+def _legal_corpus():
+    from .config import LOCAL_CORPUS_PATH, LOCAL_CORPUS_MAX_AGE
+    from .corpus import LegalCorpus
+    return LegalCorpus(LOCAL_CORPUS_PATH, max_age=LOCAL_CORPUS_MAX_AGE)
+
+
+def _llm_response_cache():
+    from .config import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_SIMILARITY_THRESHOLD
+    from .llm_cache import ResponseCache
+    return ResponseCache(max_entries=LLM_CACHE_MAX_ENTRIES, similarity_threshold=LLM_CACHE_SIMILARITY_THRESHOLD)
+
+
+def _answer_cache():
+    from .config import ANSWER_CACHE_PATH, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES
+    from .answer_cache import AnswerCache
+    return AnswerCache(ANSWER_CACHE_PATH, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES)
+
+
+def _query_log():
+    from .config import QUERY_LOG_PATH, QUERY_LOG_RETENTION_DAYS
+    from .query_log import QueryLog
+    return QueryLog(QUERY_LOG_PATH, retention_days=QUERY_LOG_RETENTION_DAYS)
+
+
+def _gazetteer():
+    from .gazetteer import get_gazetteer
+    return get_gazetteer()
+
+
+def _checkpointer():
+    from .config import CHECKPOINT_PATH, CHECKPOINT_RETENTION_DAYS, CHECKPOINT_KEEP_LAST
+    from .checkpoint import PooledSqliteSaver
+    return PooledSqliteSaver(CHECKPOINT_PATH, retention_seconds=CHECKPOINT_RETENTION_DAYS * 24 * 3600,
+                             keep_last=CHECKPOINT_KEEP_LAST)
+
+
+def _graph():
+    from .workflow import build_workflow
+    return build_workflow().compile(checkpointer=resources.get("checkpointer"))
+
+
+resources.register("llm", _llm)
+resources.register("llm_large", _llm_large)
+resources.register("router", _router)
+resources.register("search_tool", _search_tool)
+resources.register("hedge_tool", _hedge_tool)
+resources.register("groq_client", _provider_client("groq", "GROQ_REQUESTS_PER_MINUTE", "GROQ_TOKENS_PER_MINUTE"))
+resources.register("groq_large_client",
+                   _provider_client("groq-large", "GROQ_LARGE_REQUESTS_PER_MINUTE", "GROQ_LARGE_TOKENS_PER_MINUTE"))
+resources.register("tavily_client", _provider_client("tavily", "TAVILY_REQUESTS_PER_MINUTE"))
+resources.register("resilient_search_tool", _resilient_search_tool)
+resources.register("search_cache", _search_cache)
+resources.register("cached_search_tool", _cached_search_tool)
+resources.register("legal_corpus", _legal_corpus)
+resources.register("llm_response_cache", _llm_response_cache)
+resources.register("answer_cache", _answer_cache)
+resources.register("query_log", _query_log)
+resources.register("gazetteer", _gazetteer)
+resources.register("checkpointer", _checkpointer)
+resources.register("graph", _graph)
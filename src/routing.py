@@ -0,0 +1,98 @@
+"""Per-node model selection with fallback, and LLM cost accounting.
+
+Each graph node is mapped to a model tier (`NODE_MODEL_TIERS`, e.g.
+"analyze_and_summarize=large,generate_roadmap=large"); unlisted nodes use the small tier.
+Routing, classification and extraction stay on the fast 8B model, and only the summary and
+roadmap, where quality matters, go to the large model. A large-model call that times out
+(or whose circuit is open) is retried once on the small model, so a slow provider degrades
+answer quality instead of failing the request.
+
+Each tier has its own ChatGroq client and ProviderClient (Groq's rate limits are per model),
+both built lazily in src/resources.py.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from .config import GROQ_COMPLETION_TOKENS_ESTIMATE, MODEL_PRICES
+from .context import estimate_tokens
+from .instrumentation import metrics
+from .resilience import CircuitOpenError, is_timeout
+from .resources import resources
+
+SMALL = "small"
+LARGE = "large"
+
+# tier -> (model resource, provider client resource) in src/resources.py
+TIER_RESOURCES = {
+    SMALL: ("llm", "groq_client"),
+    LARGE: ("llm_large", "groq_large_client"),
+}
+
+
+def parse_node_tiers(spec: str) -> Dict[str, str]:
+    """"node=tier,node=tier" -> {node: tier}; unknown tiers are ignored with a warning."""
+    tiers = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        node, _, tier = item.partition("=")
+        if tier.strip() not in TIER_RESOURCES:
+            print(f"Warning: ignoring model tier for {node.strip()!r}. Error: unknown tier {tier.strip()!r}")
+            continue
+        tiers[node.strip()] = tier.strip()
+    return tiers
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """"model=input/output,..." (USD per million tokens) -> {model: (input, output)}."""
+    prices = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, price = item.rpartition("=")
+        try:
+            prompt_price, _, completion_price = price.partition("/")
+            prices[model.strip()] = (float(prompt_price), float(completion_price or prompt_price))
+        except ValueError as e:
+            print(f"Warning: ignoring price for {model.strip()!r}. Error: {e}")
+    return prices
+
+
+PRICES = parse_prices(MODEL_PRICES)
+
+
+def llm_cost(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    """USD cost of one call, or None for models without a price in MODEL_PRICES."""
+    price = PRICES.get(model)
+    if price is None:
+        return None
+    return ((prompt_tokens or 0) * price[0] + (completion_tokens or 0) * price[1]) / 1_000_000
+
+
+class ModelRouter:
+    def __init__(self, node_tiers: Dict[str, str], default_tier: str = SMALL, fallback_tier: str = SMALL):
+        self.node_tiers = node_tiers
+        self.default_tier = default_tier
+        self.fallback_tier = fallback_tier
+
+    def tier_for(self, node: str) -> str:
+        return self.node_tiers.get(node, self.default_tier)
+
+    def _call(self, tier: str, prompt, inputs: dict, schema, retry_timeouts: bool, tags):
+        model_name, client_name = TIER_RESOURCES[tier]
+        model = resources.get(model_name)
+        chain = prompt | (model.with_structured_output(schema) if schema is not None else model)
+        tokens = estimate_tokens(prompt.format(**inputs)) + GROQ_COMPLETION_TOKENS_ESTIMATE
+        config = {"tags": tags} if tags else None
+        return resources.get(client_name).call(lambda: chain.invoke(inputs, config=config), tokens=tokens,
+                                               retry_timeouts=retry_timeouts)
+
+    def invoke(self, node: str, prompt, inputs: dict, schema=None, tags: Optional[List[str]] = None):
+        """Runs `prompt | model` (structured when `schema` is given) on the node's tier."""
+        tier = self.tier_for(node)
+        if tier == self.fallback_tier:
+            return self._call(tier, prompt, inputs, schema, True, tags)
+        try:
+            return self._call(tier, prompt, inputs, schema, False, tags)
+        except Exception as e:
+            if not (is_timeout(e) or isinstance(e, CircuitOpenError)):
+                raise
+            reason = "circuit_open" if isinstance(e, CircuitOpenError) else "timeout"
+            metrics.count("model_fallbacks_total", node=node, tier=tier, reason=reason)
+            print(f"Warning: {node} fell back from the {tier} to the {self.fallback_tier} model. Error: {e}")
+            return self._call(self.fallback_tier, prompt, inputs, schema, True, tags)
@@ -0,0 +1,75 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional, TypedDict
+
+
+class SearchOutcome(TypedDict):
+    query: str
+    response: Optional[Any]
+    error: Optional[str]
+    elapsed: float
+
+
+def run_search_queries(search_tool, queries: List[str], max_workers: int = 5,
+                       query_timeout: float = 15.0, total_timeout: float = 25.0,
+                       search_options: Optional[Dict[str, dict]] = None) -> List[SearchOutcome]:
+    """Fans the queries out to the search tool on a bounded thread pool.
+
+    Every query gets its own timeout (measured from when it actually starts) and the
+    whole fan-out has a hard deadline. Queries that fail or time out are reported with
+    an error instead of a response, so callers keep whatever partial results came back.
+    The returned list is always in the same order as `queries`. `search_options` maps a
+    query to extra tool arguments (e.g. `{"search_depth": "basic"}`).
+    """
+    outcomes: List[SearchOutcome] = [
+        {"query": query, "response": None, "error": None, "elapsed": 0.0} for query in queries
+    ]
+    if not queries:
+        return outcomes
+
+    started_at = {}
+
+    def _run(index: int, query: str):
+        started_at[index] = time.monotonic()
+        return search_tool.invoke({"query": query, **(search_options or {}).get(query, {})})
+
+    deadline = time.monotonic() + total_timeout
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries))),
+                                  thread_name_prefix="legal-search")
+    try:
+        pending = {executor.submit(_run, i, q): i for i, q in enumerate(queries)}
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            # Expire queries that have been running longer than their own timeout.
+            for future, index in list(pending.items()):
+                if index in started_at and now - started_at[index] >= query_timeout:
+                    future.cancel()
+                    outcomes[index]["error"] = f"timed out after {query_timeout:.1f}s"
+                    outcomes[index]["elapsed"] = now - started_at[index]
+                    del pending[future]
+            if not pending:
+                break
+            wake_at = deadline
+            for index in pending.values():
+                if index in started_at:
+                    wake_at = min(wake_at, started_at[index] + query_timeout)
+            done, _ = wait(list(pending), timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                outcomes[index]["elapsed"] = time.monotonic() - started_at.get(index, now)
+                try:
+                    outcomes[index]["response"] = future.result()
+                except Exception as e:
+                    outcomes[index]["error"] = str(e) or type(e).__name__
+        for future, index in pending.items():
+            future.cancel()
+            outcomes[index]["error"] = f"cancelled at the {total_timeout:.1f}s search deadline"
+            if index in started_at:
+                outcomes[index]["elapsed"] = time.monotonic() - started_at[index]
+    finally:
+        # Don't wait for stragglers; their results are discarded.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return outcomes
@@ -0,0 +1,146 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from .instrumentation import metrics
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cases the query and collapses punctuation/whitespace so that
+    "ADU permit requirements Los Angeles, CA" and "adu permit requirements los angeles ca"
+    share a cache entry."""
+    return " ".join(re.sub(r"[^\w\s.-]", " ", query.lower()).split())
+
+
+class SearchCache:
+    """Disk-backed (SQLite) cache of raw search tool responses.
+
+    Entries are keyed on the normalized query string (plus a `variant`, such as a cheaper
+    search depth), expire after `ttl` seconds and are evicted least-recently-used first once
+    the cache holds more than `max_entries` rows.
+    """
+
+    def __init__(self, path: str = "search_cache.db", ttl: float = 7 * 24 * 3600, max_entries: int = 5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY,"
+                " query TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access)")
+            self._conn.commit()
+
+    @staticmethod
+    def _key(query: str, variant: str = "") -> str:
+        return normalize_query(query) + (f"|{variant}" if variant else "")
+
+    def get(self, query: str, variant: str = "") -> Optional[Any]:
+        """The cached response; a `variant` lookup is also answered by the plain entry."""
+        keys = [self._key(query)] + ([self._key(query, variant)] if variant else [])
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, response, created_at FROM search_cache WHERE key IN ({', '.join('?' * len(keys))})", keys
+            ).fetchall()
+            expired = [row[0] for row in rows if now - row[2] > self.ttl]
+            if expired:
+                self._conn.executemany("DELETE FROM search_cache WHERE key = ?", [(key,) for key in expired])
+                self._conn.commit()
+            fresh = sorted((row for row in rows if row[0] not in expired), key=lambda row: keys.index(row[0]))
+            if not fresh:
+                self.misses += 1
+                return None
+            key, response = fresh[0][0], fresh[0][1]
+            self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(response)
+
+    def set(self, query: str, response: Any, variant: str = "") -> None:
+        key = self._key(query, variant)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, query, json.dumps(response), now, now),
+            )
+            self._conn.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                " SELECT key FROM search_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def invalidate(self, query: str) -> None:
+        """Drops the query's entry and all of its variants."""
+        key = normalize_query(query)
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache WHERE key = ? OR substr(key, 1, ?) = ?",
+                               (key, len(key) + 1, key + "|"))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class CachedSearchTool:
+    """Wraps a search tool's `invoke` with a SearchCache; only responses that carry a
+    non-empty `results` list are stored, so transient errors are never cached.
+
+    Searches at the tool's default depth are stored under the plain query and cheaper depths
+    as a variant of it. With `refresh` every call goes to the tool and overwrites the cache.
+    """
+
+    def __init__(self, search_tool, cache: SearchCache, default_depth: str = "advanced", refresh: bool = False):
+        self.search_tool = search_tool
+        self.cache = cache
+        self.default_depth = default_depth
+        self.refresh = refresh
+
+    def refreshing(self) -> "CachedSearchTool":
+        """This tool with cache reads bypassed; fresh responses are still written back."""
+        return CachedSearchTool(self.search_tool, self.cache, self.default_depth, refresh=True)
+
+    def invoke(self, tool_input: dict) -> Any:
+        query = tool_input["query"]
+        depth = tool_input.get("search_depth") or self.default_depth
+        variant = "" if depth == self.default_depth else depth
+        if not self.refresh:
+            cached = self.cache.get(query, variant)
+            metrics.count("cache_lookups_total", cache="search", result="miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+        response = self.search_tool.invoke(tool_input)
+        if isinstance(response, dict) and response.get("results"):
+            self.cache.set(query, response, variant)
+        return response
@@ -0,0 +1,203 @@
+"""Headless HTTP/SSE service for the LangGraph workflow.
+
+    uvicorn src.service:api --host 0.0.0.0 --port 8000
+
+POST /chat streams Server-Sent Events while the graph runs:
+
+    event: node   data: {"node": "legal_search_agent"}
+    event: token  data: {"node": "generate_roadmap", "text": "..."}
+    event: final  data: {"thread_id": ..., "project_roadmap": ..., "project_type": ..., ...}
+    event: error  data: {"detail": "..."}
+
+GET /metrics serves node, LLM and search latencies and token counts in the Prometheus text format.
+With PREWARM_ENABLED the service also refreshes popular jurisdictions off-peak (src/prewarm.py).
+
+All conversation state lives in the checkpointer (keyed by thread_id), so any replica
+behind a load balancer can serve any turn as long as they share the checkpoint store.
+At most SERVICE_MAX_CONCURRENCY graph runs execute at once; up to SERVICE_MAX_QUEUE more
+wait for a slot and anything beyond that is rejected with 429 so clients back off.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from .config import (SERVICE_MAX_CONCURRENCY, SERVICE_MAX_QUEUE, SERVICE_WORKER_THREADS,
+                     SERVICE_RUN_TIMEOUT, PREWARM_ENABLED)
+from .followup import FOLLOWUP_NODES, FollowupStreamFilter
+from .instrumentation import MetricsCallback, metrics
+from .memory import ConversationMemory, latest_message
+from .trace import LoggingTrace, use_trace
+from .resources import resources
+
+logger = logging.getLogger("legal_bot.service")
+
+# Nodes whose LLM tokens are forwarded to the client as they are generated.
+ANSWER_NODES = {"generate_roadmap", "handle_general_query", "summarize_and_plan"} | FOLLOWUP_NODES
+
+
+class ChatRequest(BaseModel):
+    message: str
+    thread_id: Optional[str] = None
+
+
+class _Admission:
+    """Counts running and waiting runs so overload is rejected instead of queued forever,
+    and serializes runs of the same thread_id."""
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.running = 0
+        self._thread_locks = {}
+
+    def admit(self) -> None:
+        # Only checks: a response whose stream never starts (client gone first) must not hold a place.
+        if self.waiting >= self.max_queue and self.slots.locked():
+            raise HTTPException(status_code=429, detail="Server busy, retry shortly.", headers={"Retry-After": "2"})
+
+    @asynccontextmanager
+    async def slot(self, thread_id: str):
+        """Waits (counted in `waiting`) for a worker slot and the thread's lock."""
+        self.waiting += 1
+        lock, users = self._thread_locks.get(thread_id, (asyncio.Lock(), 0))
+        self._thread_locks[thread_id] = (lock, users + 1)
+        acquired = False
+        try:
+            async with self.slots:
+                self.waiting -= 1
+                acquired = True
+                self.running += 1
+                try:
+                    async with lock:
+                        yield
+                finally:
+                    self.running -= 1
+        finally:
+            if not acquired:
+                self.waiting -= 1
+            lock, users = self._thread_locks[thread_id]
+            if users <= 1:
+                del self._thread_locks[thread_id]
+            else:
+                self._thread_locks[thread_id] = (lock, users - 1)
+
+
+@asynccontextmanager
+async def lifespan(api: FastAPI):
+    # Sync nodes run on this bounded pool when the graph is driven with astream.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=SERVICE_WORKER_THREADS, thread_name_prefix="graph-node"))
+    # Clients, caches and the graph are built before the first request instead of during it.
+    await asyncio.to_thread(resources.warmup)
+    # The pooled checkpointer serves the async API from the same connection pool as the UI.
+    api.state.graph = resources.graph
+    api.state.admission = _Admission(SERVICE_MAX_CONCURRENCY, SERVICE_MAX_QUEUE)
+    scheduler = None
+    if PREWARM_ENABLED:
+        from .prewarm import PrewarmScheduler
+        scheduler = PrewarmScheduler()
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        scheduler.stop()
+
+
+api = FastAPI(title="OBC Project Assistant", lifespan=lifespan)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _initial_state(graph, config: dict, message: str) -> dict:
+    """Carries the project details and the previous message of earlier turns over from the checkpoint."""
+    memory = ConversationMemory()
+    snapshot = await graph.aget_state(config)
+    if snapshot and snapshot.values:
+        values = snapshot.values
+        memory.update_project(values.get("project_type"), values.get("city"), values.get("geo_state"))
+        if values.get("user_input"):
+            memory.add_user_message(latest_message(values["user_input"]))
+    return {
+        "user_input": memory.render(message),
+        **memory.project(),
+        "legal_info_found": False,
+        "legal_summary": "",
+        "suggested_websites": [],
+        "project_roadmap": "",
+        "route_decision": "",
+    }
+
+
+async def _run(graph, admission: _Admission, thread_id: str, message: str):
+    config = {"configurable": {"thread_id": thread_id}, "callbacks": [MetricsCallback()]}
+    try:
+        async with admission.slot(thread_id):
+            state = await _initial_state(graph, config, message)
+            with use_trace(LoggingTrace()):
+                async with asyncio.timeout(SERVICE_RUN_TIMEOUT):
+                    followup_filters = {node: FollowupStreamFilter() for node in FOLLOWUP_NODES}
+                    async for mode, chunk in graph.astream(state, config=config, stream_mode=["messages", "updates"]):
+                        if mode == "updates":
+                            for node in chunk:
+                                yield _sse("node", {"node": node})
+                            continue
+                        message_chunk, metadata = chunk
+                        node = metadata.get("langgraph_node")
+                        if node in ANSWER_NODES and isinstance(message_chunk.content, str) and message_chunk.content:
+                            text = message_chunk.content
+                            if node in followup_filters:
+                                text = followup_filters[node].feed(text)
+                            if text:
+                                yield _sse("token", {"node": node, "text": text})
+            final = (await graph.aget_state(config)).values
+            yield _sse("final", {
+                "thread_id": thread_id,
+                "project_roadmap": final.get("project_roadmap", ""),
+                "query_type": final.get("query_type"),
+                "project_type": final.get("project_type"),
+                "city": final.get("city"),
+                "geo_state": final.get("geo_state"),
+            })
+    except asyncio.CancelledError:
+        # Client disconnected; the run is abandoned.
+        raise
+    except TimeoutError:
+        yield _sse("error", {"detail": f"Run exceeded {SERVICE_RUN_TIMEOUT:.0f}s."})
+    except Exception as e:
+        logger.exception("Graph run failed for thread %s", thread_id)
+        yield _sse("error", {"detail": str(e)})
+
+
+@api.post("/chat")
+async def chat(request: ChatRequest):
+    admission: _Admission = api.state.admission
+    admission.admit()
+    thread_id = request.thread_id or str(uuid.uuid4())
+    return StreamingResponse(
+        _run(api.state.graph, admission, thread_id, request.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Thread-Id": thread_id},
+    )
+
+
+@api.get("/healthz")
+async def healthz():
+    admission: _Admission = api.state.admission
+    return {"status": "ok", "running": admission.running, "waiting": admission.waiting,
+            "max_concurrency": admission.max_concurrency, "max_queue": admission.max_queue}
+
+
+@api.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return metrics.prometheus()
@@ -0,0 +1,59 @@
+"""In-process coalescing of identical concurrent calls ("single flight").
+
+When several sessions ask about the same jurisdiction at once, only the first (the leader)
+runs the searches or the LLM call; the others wait for the leader's result instead of
+repeating the upstream work. Nothing is cached once the call finishes; this only removes
+duplicates that are in flight at the same time.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .corpus import normalize_place
+from .instrumentation import metrics
+
+
+def jurisdiction_key(project_type: str, city: str, geo_state: str) -> Tuple[str, str, str]:
+    return normalize_place(project_type), normalize_place(city), normalize_place(geo_state)
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Runs `fn` unless an identical call is in flight; returns (result, shared).
+
+        Followers receive the leader's result object (or its exception), so callers must
+        copy anything they intend to mutate.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        metrics.count("singleflight_calls_total", group=self.name, role="leader" if leader else "coalesced")
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
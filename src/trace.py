@@ -0,0 +1,88 @@
+"""Where node-level progress messages go.
+
+Nodes in `agents.py` never talk to a UI directly; they call `trace.info(...)`, `trace.json(...)`
+and so on, guarded by `trace.enabled()`. The active sink is chosen per run with `use_trace`:
+the Streamlit app renders into the page, the HTTP service logs, and everything else
+(batch jobs, benchmarks) drops the messages.
+"""
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+
+class NullTrace:
+    def enabled(self) -> bool:
+        return False
+
+    def _drop(self, *args, **kwargs) -> None:
+        pass
+
+    info = markdown = write = json = caption = success = warning = error = _drop
+
+
+class LoggingTrace:
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger("legal_bot.trace")
+
+    def enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.INFO)
+
+    def info(self, body: Any) -> None:
+        self.logger.info("%s", body)
+
+    success = info
+
+    def markdown(self, body: Any) -> None:
+        self.logger.debug("%s", body)
+
+    write = caption = markdown
+
+    def json(self, body: Any) -> None:
+        self.logger.debug("%s", json.dumps(body, default=str))
+
+    def warning(self, body: Any) -> None:
+        self.logger.warning("%s", body)
+
+    def error(self, body: Any) -> None:
+        self.logger.error("%s", body)
+
+
+class StreamlitTrace:
+    """Renders into the current Streamlit page when 'Show Detailed Agent Trace' is ticked."""
+
+    def __init__(self, session_key: str = "verbose_output"):
+        import streamlit as st
+        self._st = st
+        self.session_key = session_key
+
+    def enabled(self) -> bool:
+        return bool(self._st.session_state.get(self.session_key))
+
+    def __getattr__(self, name: str):
+        if name in ("info", "markdown", "write", "json", "caption", "success", "warning", "error"):
+            return getattr(self._st, name)
+        raise AttributeError(name)
+
+
+_current_trace: ContextVar = ContextVar("legal_bot_trace", default=NullTrace())
+
+
+@contextmanager
+def use_trace(sink):
+    token = _current_trace.set(sink)
+    try:
+        yield sink
+    finally:
+        _current_trace.reset(token)
+
+
+class _TraceProxy:
+    """Module-level handle that forwards to whichever sink is active for the current run."""
+
+    def __getattr__(self, name: str):
+        return getattr(_current_trace.get(), name)
+
+
+trace = _TraceProxy()
@@ -1,33 +1,85 @@
 from langgraph.graph import StateGraph, END
 from .models import AgentState
-from .agents import classify_query, handle_general_query, parse_user_input, legal_search_agent, analyze_and_summarize, generate_project_roadmap, route_query_type
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
-
-conn = sqlite3.connect("checkpoints.db", check_same_thread=False)
-memory = SqliteSaver(conn)
-
-workflow = StateGraph(AgentState)
-
-
-workflow = StateGraph(AgentState)
-workflow.add_node("classify_query", classify_query)
-workflow.add_node("handle_general_query", handle_general_query)
-workflow.add_node("parse_user_input", parse_user_input)
-workflow.add_node("legal_search_agent", legal_search_agent)
-workflow.add_node("analyze_and_summarize", analyze_and_summarize)
-workflow.add_node("generate_roadmap", generate_project_roadmap)
-workflow.set_entry_point("classify_query")
-workflow.add_conditional_edges("classify_query", route_query_type, {
-    "legal_query": "parse_user_input",
-    "general_query": "handle_general_query",
-})
-workflow.add_edge("parse_user_input", "legal_search_agent")
-workflow.add_edge("legal_search_agent", "analyze_and_summarize")
-workflow.add_edge("analyze_and_summarize", "generate_roadmap")
-workflow.add_edge("generate_roadmap", END)
-workflow.add_edge("handle_general_query", END)
-
-
-# Add nodes and edges as in main file
-app = workflow.compile(checkpointer=memory)
\ No newline at end of file
+from .agents import classify_query, analyze_query, handle_general_query, parse_user_input, check_answer_cache, legal_search_agent, analyze_and_summarize, generate_project_roadmap, summarize_and_plan, answer_followup, research_followup, route_query_type, route_answer_cache, route_analyzed_query, route_followup, route_followup_answer
+from .config import COMBINED_QUERY_ANALYSIS, SINGLE_CALL_ROADMAP
+from .resources import resources
+
+
+def build_workflow(combined_query_analysis: bool = COMBINED_QUERY_ANALYSIS,
+                   single_call_roadmap: bool = SINGLE_CALL_ROADMAP) -> StateGraph:
+    """Builds the (uncompiled) graph.
+
+    With `combined_query_analysis` the entry node `analyze_query` classifies the query and
+    extracts project details in one LLM call; otherwise the original
+    classify_query -> parse_user_input path is used.
+
+    With `single_call_roadmap` the node `summarize_and_plan` writes the legal summary and the
+    roadmap in one LLM call; otherwise analyze_and_summarize -> generate_roadmap run in series.
+
+    Legal queries first pass through `check_answer_cache`, which ends the run with the cached
+    summary and roadmap when the jurisdiction has already been answered.
+
+    Legal follow-ups about the jurisdiction this thread has already researched (see
+    src/followup.py) skip the searches and the summary: `answer_followup` answers from the
+    checkpointed results, and `research_followup` runs one targeted search if they fall short.
+    """
+    workflow = StateGraph(AgentState)
+    workflow.add_node("handle_general_query", handle_general_query)
+    workflow.add_node("check_answer_cache", check_answer_cache)
+    workflow.add_node("legal_search_agent", legal_search_agent)
+    workflow.add_conditional_edges("check_answer_cache", route_answer_cache, {
+        "cached": END,
+        "search": "legal_search_agent",
+    })
+    workflow.add_node("answer_followup", answer_followup)
+    workflow.add_node("research_followup", research_followup)
+    workflow.add_conditional_edges("answer_followup", route_followup_answer, {
+        "answered": END,
+        "search": "research_followup",
+    })
+    workflow.add_edge("research_followup", END)
+
+    if combined_query_analysis:
+        workflow.add_node("analyze_query", analyze_query)
+        workflow.set_entry_point("analyze_query")
+        workflow.add_conditional_edges("analyze_query", route_analyzed_query, {
+            "legal_query": "check_answer_cache",
+            "general_query": "handle_general_query",
+            "followup": "answer_followup",
+        })
+    else:
+        workflow.add_node("classify_query", classify_query)
+        workflow.add_node("parse_user_input", parse_user_input)
+        workflow.set_entry_point("classify_query")
+        workflow.add_conditional_edges("classify_query", route_query_type, {
+            "legal_query": "parse_user_input",
+            "general_query": "handle_general_query",
+        })
+        workflow.add_conditional_edges("parse_user_input", route_followup, {
+            "research": "check_answer_cache",
+            "followup": "answer_followup",
+        })
+
+    if single_call_roadmap:
+        workflow.add_node("summarize_and_plan", summarize_and_plan)
+        workflow.add_edge("legal_search_agent", "summarize_and_plan")
+        workflow.add_edge("summarize_and_plan", END)
+    else:
+        workflow.add_node("analyze_and_summarize", analyze_and_summarize)
+        workflow.add_node("generate_roadmap", generate_project_roadmap)
+        workflow.add_edge("legal_search_agent", "analyze_and_summarize")
+        workflow.add_edge("analyze_and_summarize", "generate_roadmap")
+        workflow.add_edge("generate_roadmap", END)
+
+    workflow.add_edge("handle_general_query", END)
+    return workflow
+
+
+def __getattr__(name: str):
+    # `app` (the compiled graph) and `memory` (its checkpointer) are built on first access.
+    if name == "app":
+        return resources.graph
+    if name == "memory":
+        return resources.checkpointer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
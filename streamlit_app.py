@@ -1,13 +1,18 @@
 import streamlit as st
-import os, uuid
+import os, time, uuid
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_tavily import TavilySearch
 from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, trim_messages
 from langchain.globals import set_verbose
 from langchain_community.tools import DuckDuckGoSearchRun
+from src.context import estimate_tokens
+from src.config import (REACT_HISTORY_MAX_TOKENS, REACT_MODEL, REACT_MAX_TOOL_ROUNDS, REACT_TOOL_BUDGET_SECONDS,
+                        REACT_TOOL_OUTPUT_TOKENS, REACT_TOOL_MEMO_ENTRIES)
+from src.react_tools import ToolBudget, ToolMemo, budget_note, compact_history, memoized_tool
 
 
 # 1️⃣ Page setup
@@ -38,8 +43,8 @@ def clear_everything():
     st.session_state.messages = [
         {"role": "assistant", "content": "👋 Welcome! Ask me about legal requirements."}
     ]
+    # A new thread_id starts a fresh conversation; the cached agent (and its clients) is reused.
     st.session_state.thread_id = str(uuid.uuid4())
-    st.cache_resource.clear() # Clear cache when resetting chat to re-initialize agent
 
 # 3️⃣ Initialize session state
 if "thread_id" not in st.session_state:
@@ -61,12 +66,24 @@ for msg in st.session_state.messages:
         st.markdown(msg["content"])
 
 # 6️⃣ Build agent (once per session)
+tool_budget = ToolBudget(max_rounds=REACT_MAX_TOOL_ROUNDS, seconds=REACT_TOOL_BUDGET_SECONDS)
+
+
+class ReactState(AgentState):
+    turn_started: float  # when the current user turn began, for the tool time budget
+
+
 @st.cache_resource
 def get_agent():
-    llm = ChatGroq(model="meta-llama/llama-4-scout-17b-16e-instruct", temperature=0) # Set temperature to 0 for more deterministic behavior
+    llm = ChatGroq(model=REACT_MODEL, temperature=0) # Set temperature to 0 for more deterministic behavior
 
-    tavily_tool = TavilySearch(max_results=5, search_depth="advanced", include_domains=[".gov"])
-    duckduckgosearch_tool = DuckDuckGoSearchRun()
+    # Repeated searches within a thread are answered from memory, and every output is compacted.
+    memo = ToolMemo(max_entries=REACT_TOOL_MEMO_ENTRIES)
+    tools = [
+        memoized_tool(TavilySearch(max_results=5, search_depth="advanced", include_domains=[".gov"]), memo, REACT_TOOL_OUTPUT_TOKENS),
+        memoized_tool(DuckDuckGoSearchRun(), memo, REACT_TOOL_OUTPUT_TOKENS),
+    ]
+    llm_with_tools = llm.bind_tools(tools)
     
     prompt = (
     """
@@ -105,8 +122,33 @@ def get_agent():
     """
 )
     memory = MemorySaver()
-    # Set debug=True for more verbose LangGraph internal logging
-    return create_react_agent(model=llm, tools=[tavily_tool, duckduckgosearch_tool], prompt=prompt, checkpointer=memory, debug=True)
+
+    def bound_history(state):
+        # Only the most recent messages (within a token cap) are sent to the model each step,
+        # with the tool outputs of earlier turns cut down to their sources.
+        messages = compact_history(state["messages"])
+        trimmed = trim_messages(
+            messages,
+            max_tokens=REACT_HISTORY_MAX_TOKENS,
+            token_counter=lambda messages: sum(estimate_tokens(str(m.content)) for m in messages),
+            strategy="last",
+            start_on="human",
+        )
+        if not trimmed:
+            # The current turn alone is over the cap; never drop it.
+            last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+            trimmed = messages[last_human:]
+        if tool_budget.exhausted(state):
+            trimmed = trimmed + [budget_note()]
+        return {"llm_input_messages": trimmed}
+
+    def select_model(state, runtime):
+        # Once the turn's tool rounds or time are used up, the model can only answer.
+        return llm if tool_budget.exhausted(state) else llm_with_tools
+
+    # version="v2" runs the tool calls of one model turn in parallel.
+    return create_react_agent(model=select_model, tools=tools, prompt=prompt, checkpointer=memory,
+                              pre_model_hook=bound_history, state_schema=ReactState, version="v2")
 
 agent = get_agent()
 
@@ -116,25 +158,12 @@ if user_input := st.chat_input("Your project question…"):
     with st.chat_message("user"):
         st.markdown(user_input)
 
-    # LangGraph expects a list of HumanMessage objects, and we should preserve the full history
-    # The `history` variable should contain all messages for the agent to maintain context.
-    # When sending to the agent, we need to convert Streamlit messages to LangChain message types.
-    langchain_messages = []
-    for msg in st.session_state.messages:
-        if msg["role"] == "user":
-            langchain_messages.append(HumanMessage(content=msg["content"]))
-        elif msg["role"] == "assistant":
-            # For assistant messages, we need to correctly handle tool_calls if they were present
-            # This part is more complex if you're not explicitly storing tool_calls in session_state.
-            # For now, we'll treat them as generic AIMessage content.
-            langchain_messages.append(AIMessage(content=msg["content"]))
-        # Add a placeholder for tool messages if they were to be stored
-        # elif msg["role"] == "tool":
-        #     langchain_messages.append(ToolMessage(content=msg["content"], tool_call_id=msg["tool_call_id"]))
-
-
-    history = {"messages": langchain_messages}
-    config = {"configurable": {"thread_id": st.session_state.thread_id}}
+    # The checkpointer already holds this thread's history, so only the new message is sent;
+    # resending the full history would append duplicate copies to the thread every turn.
+    history = {"messages": [HumanMessage(content=user_input)], "turn_started": time.time()}
+    # The recursion limit is a backstop; the tool budget normally ends the loop first.
+    config = {"configurable": {"thread_id": st.session_state.thread_id},
+              "recursion_limit": tool_budget.recursion_limit()}
 
     full_response = ""
     step_logs = []  # 🧠 Collect thinking steps for this interaction only
@@ -0,0 +1,36 @@
+"""Points every on-disk store at a scratch directory before `src` is imported; no network or API keys."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmp = tempfile.mkdtemp(prefix="legal-bot-tests-")
+for _name, _file in {"CHECKPOINT_PATH": "checkpoints.db", "SEARCH_CACHE_PATH": "search_cache.db",
+                     "LOCAL_CORPUS_PATH": "legal_corpus.db", "ANSWER_CACHE_PATH": "answer_cache.db",
+                     "QUERY_LOG_PATH": "query_log.db"}.items():
+    os.environ[_name] = os.path.join(_tmp, _file)
+os.environ["METRICS_JSONL_PATH"] = ""
+os.environ.setdefault("GROQ_API_KEY", "offline-tests")
+os.environ.setdefault("TAVILY_API_KEY", "offline-tests")
+for _limit in ("GROQ_REQUESTS_PER_MINUTE", "GROQ_TOKENS_PER_MINUTE", "GROQ_LARGE_REQUESTS_PER_MINUTE",
+               "GROQ_LARGE_TOKENS_PER_MINUTE", "TAVILY_REQUESTS_PER_MINUTE"):
+    os.environ.setdefault(_limit, "0")
+
+
+@pytest.fixture
+def fakes():
+    """Fake Groq and Tavily (see benchmarks/fakes.py) behind fresh stores; yields (llm, search_tool)."""
+    from benchmarks.fakes import FakeChatModel, FakeSearchTool, install_fakes
+    from src.resources import resources
+
+    resources.reset()
+    for store in ("search_cache", "answer_cache", "query_log", "llm_response_cache"):
+        getattr(resources, store).clear()
+    llm, search_tool = FakeChatModel(), FakeSearchTool(0.0)
+    install_fakes(llm, search_tool)
+    yield llm, search_tool
+    resources.reset()
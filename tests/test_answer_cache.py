@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_invalidate_with_searches_drops_the_corpus_documents_too(fakes):
+    from src.agents import prewarm_jurisdiction
+    from src.planner import plan_queries
+    from src.resources import resources
+
+    jurisdiction = ("deck", "Austin", "TX")
+    assert prewarm_jurisdiction(*jurisdiction) == "refreshed"
+    query = plan_queries(*jurisdiction)[1][0]["query"]
+    assert resources.legal_corpus.search(query, "Austin", "TX", project_type="deck")
+
+    subprocess.run([sys.executable, "-m", "src.answer_cache", "invalidate", "--city", "Austin", "--state", "TX",
+                    "--project-type", "deck", "--with-searches"], cwd=ROOT, env=os.environ, check=True,
+                   capture_output=True)
+
+    assert resources.answer_cache.age(*jurisdiction) is None
+    assert resources.search_cache.get(query) is None
+    assert resources.legal_corpus.search(query, "Austin", "TX", project_type="deck") == []
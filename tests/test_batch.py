@@ -0,0 +1,22 @@
+import json
+
+from src.batch import run_batch
+
+
+def test_malformed_line_fails_alone_and_is_retried_on_resume(fakes, tmp_path):
+    from src.resources import resources
+
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    input_path.write_text(json.dumps({"query": "Do I need a permit for a deck in Austin, TX?"}) + "\nnot json\n[1]\n")
+
+    counts = run_batch(str(input_path), str(output_path), concurrency=2, graph=resources.graph, log=None)
+
+    assert (counts["succeeded"], counts["failed"]) == (1, 2)
+    results = {r["line"]: r for r in map(json.loads, output_path.read_text().splitlines())}
+    assert results[1]["error"] is None and results[1]["project_roadmap"]
+    assert results[2]["error"].startswith("JSONDecodeError")
+    assert results[3]["error"].startswith("ValueError")
+
+    input_path.write_text(input_path.read_text().replace("not json", json.dumps({"query": "hi"})))
+    counts = run_batch(str(input_path), str(output_path), concurrency=2, graph=resources.graph, log=None)
+    assert (counts["skipped"], counts["succeeded"], counts["failed"]) == (1, 1, 1)
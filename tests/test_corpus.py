@@ -0,0 +1,58 @@
+from src.corpus import LegalCorpus
+from src.planner import JURISDICTION_WIDE_TOPICS
+
+
+def _page(project: str, topic: str, i: int = 0) -> dict:
+    return {"title": f"{project} {topic} Austin, TX #{i}", "url": f"https://austintexas.gov/{project}/{topic}/{i}",
+            "content": f"{project} permit requirements and {topic} rules for owner-builders in Austin."}
+
+
+def test_project_specific_search_ignores_other_project_types(tmp_path):
+    corpus = LegalCorpus(str(tmp_path / "corpus.db"))
+    corpus.ingest([_page("deck", "permits", i) for i in range(3)], "Austin", "TX", "deck")
+
+    assert corpus.search("fence permit requirements Austin, TX", "Austin", "TX", project_type="fence") == []
+    assert len(corpus.search("deck permit requirements Austin, TX", "Austin", "TX", project_type="deck")) == 3
+    # Jurisdiction-wide topics search without a project type and share the deck's pages.
+    assert corpus.search("permit requirements Austin, TX", "Austin", "TX")
+
+
+def test_invalidate_drops_one_project_type_or_the_whole_jurisdiction(tmp_path):
+    corpus = LegalCorpus(str(tmp_path / "corpus.db"))
+    corpus.ingest([_page("deck", "permits")], "Austin", "TX", "deck")
+    corpus.ingest([_page("fence", "permits")], "Austin", "TX", "fence")
+    corpus.ingest([_page("deck", "permits")], "Dallas", "TX", "deck")
+
+    assert corpus.invalidate("Austin", "TX", "deck") == 1
+    assert corpus.search("fence permit requirements", "Austin", "TX", project_type="fence")
+    assert corpus.invalidate("austin", "tx") == 1
+    assert corpus.stats()["documents"] == 1
+
+
+def test_second_project_type_in_a_city_searches_the_web(fakes):
+    from src.agents import legal_search_agent
+    from src.resources import resources
+
+    _, fake_search = fakes
+    calls = []
+
+    class CountingSearchTool:
+        def invoke(self, tool_input):
+            calls.append(tool_input["query"])
+            return fake_search.invoke(tool_input)
+
+    resources.override("search_tool", CountingSearchTool())
+    resources.legal_corpus.invalidate("Austin", "TX")
+
+    def search(project_type):
+        calls.clear()
+        return legal_search_agent({"user_input": f"{project_type} in Austin, TX", "project_type": project_type,
+                                   "city": "Austin", "geo_state": "TX", "legal_info_found": False,
+                                   "legal_summary": "", "suggested_websites": [], "project_roadmap": "",
+                                   "route_decision": ""})["tavily_search_results"]
+
+    search("deck")
+    fence_results = search("fence")
+    assert calls
+    specific = [r for r in fence_results if r["topic"] not in JURISDICTION_WIDE_TOPICS]
+    assert specific and not [r for r in specific if "deck" in r["title"].lower()]
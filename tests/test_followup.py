@@ -0,0 +1,70 @@
+import json
+
+from src.instrumentation import metrics
+from src.memory import ConversationMemory
+
+QUERY = "Do I need a permit for a deck in Austin, TX?"
+
+
+def _followups() -> float:
+    return sum(c["value"] for c in metrics.snapshot()["counters"] if c["name"] == "followup_turns_total")
+
+
+def _turn(graph, thread_id: str, memory: ConversationMemory, message: str) -> list:
+    memory.add_user_message(message)
+    state = {"user_input": memory.render(message), **memory.project(), "legal_info_found": False,
+             "legal_summary": "", "suggested_websites": [], "project_roadmap": "", "route_decision": ""}
+    config = {"configurable": {"thread_id": thread_id}}
+    nodes = [node for chunk in graph.stream(state, config, stream_mode="updates") for node in chunk]
+    final = graph.get_state(config).values
+    memory.update_project(final["project_type"], final["city"], final["geo_state"])
+    return nodes
+
+
+def test_followup_in_the_same_conversation_reuses_the_research(fakes):
+    from src.resources import resources
+
+    memory = ConversationMemory()
+    assert "legal_search_agent" in _turn(resources.graph, "followup-1", memory, QUERY)
+    assert _turn(resources.graph, "followup-1", memory, "What about setbacks?")[-1] == "answer_followup"
+
+
+def test_cleared_conversation_on_the_same_thread_runs_in_full(fakes):
+    from src.resources import resources
+
+    memory = ConversationMemory()
+    _turn(resources.graph, "followup-2", memory, QUERY)
+    memory.clear()
+    resources.answer_cache.clear()
+    nodes = _turn(resources.graph, "followup-2", memory, QUERY)
+    assert "answer_followup" not in nodes and "legal_search_agent" in nodes
+
+
+def test_rerunning_a_batch_does_not_answer_from_the_previous_run(fakes, tmp_path):
+    from src.batch import run_batch
+    from src.resources import resources
+
+    input_path = tmp_path / "in.jsonl"
+    input_path.write_text("\n".join(json.dumps(row) for row in [
+        {"id": "deck", "query": QUERY},
+        {"id": "fence", "project_type": "fence", "city": "Austin", "geo_state": "TX"},
+    ]) + "\n")
+    before = _followups()
+    outputs = []
+    for run in ("first", "second"):
+        output_path = tmp_path / f"{run}.jsonl"
+        run_batch(str(input_path), str(output_path), concurrency=2, graph=resources.graph)
+        outputs.append({r["id"]: r for r in map(json.loads, output_path.read_text().splitlines())})
+    assert _followups() == before
+    for line_id in ("deck", "fence"):
+        assert outputs[0][line_id]["thread_id"] != outputs[1][line_id]["thread_id"]
+        assert outputs[1][line_id]["error"] is None and outputs[1][line_id]["project_roadmap"]
+
+
+def test_clear_chat_starts_a_new_thread():
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file("../app.py", default_timeout=30).run()
+    thread_id = app.session_state.thread_id
+    next(button for button in app.sidebar.button if button.label == "Clear Chat").click().run()
+    assert app.session_state.thread_id != thread_id
@@ -0,0 +1,26 @@
+import pytest
+
+from src.gazetteer import get_gazetteer, match_project_type
+
+
+@pytest.mark.parametrize("city", ["Pasadena", "Arlington", "Glendale", "Springfield", "Portland", "Aurora"])
+def test_ambiguous_city_without_state_keeps_state_unknown(city):
+    assert get_gazetteer().canonicalize(city, "unknown") == (city, "unknown")
+
+
+def test_city_resolves_with_its_state_or_when_unique():
+    gazetteer = get_gazetteer()
+    assert gazetteer.canonicalize("Pasadena", "Texas") == ("Pasadena", "TX")
+    assert gazetteer.canonicalize("Portland, Ore.", "unknown") == ("Portland", "OR")
+    assert gazetteer.canonicalize("chicago", "unknown") == ("Chicago", "IL")
+
+
+def test_fast_path_leaves_ambiguous_city_to_the_llm():
+    assert get_gazetteer().extract_location("Permits for a deck in Springfield?") is None
+
+
+def test_home_addition_needs_an_addition_phrase():
+    assert match_project_type("In addition, I want a deck in Austin, TX") == "deck"
+    assert match_project_type("In addition, what permits do I need in Austin, TX?") is None
+    assert match_project_type("Planning a room addition in Austin") == "home addition"
+    assert match_project_type("We want to build an addition to our house") == "home addition"
@@ -0,0 +1,28 @@
+from src.llm_cache import ResponseCache
+from src.models import QueryClassifier
+
+PREFIX = ("Known Project Details: project_type=ADU, city=Los Angeles, geo_state=CA\n\n"
+          "Previous Messages:\n- Do I need a permit for an ADU in Los Angeles, CA?\n- How long do inspections take?\n\n"
+          "Latest Message:\n")
+
+
+def test_semantic_lookup_matches_rephrased_single_turn():
+    cache = ResponseCache()
+    cache.set("query_classifier", "Do I need a permit for an ADU in Los Angeles?", QueryClassifier(query_type="legal_query"))
+    assert cache.get("query_classifier", "do i need a permit for an ADU in los angeles", semantic=True) is not None
+
+
+def test_turns_sharing_a_conversation_prefix_are_classified_separately(fakes):
+    from src.agents import classify_query
+    from src.resources import resources
+
+    llm, _ = fakes
+    cache = resources.llm_response_cache
+    cache.set("query_classifier", PREFIX + "thanks, bye!", QueryClassifier(query_type="general_query"))
+    # The shared prefix makes the hashed-trigram embeddings nearly identical.
+    assert cache.get("query_classifier", PREFIX + "what about impact fees?", semantic=True) is not None
+
+    result = classify_query({"user_input": PREFIX + "what about impact fees?"})
+
+    assert result["query_type"] == "legal_query"
+    assert cache.get("query_classifier", PREFIX + "what about impact fees?").query_type == "legal_query"
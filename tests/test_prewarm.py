@@ -0,0 +1,49 @@
+from src.agents import prewarm_jurisdiction
+from src.planner import plan_queries
+
+
+class CountingSearchTool:
+    def __init__(self, fake, url_suffix=""):
+        self.fake, self.url_suffix, self.calls = fake, url_suffix, 0
+
+    def invoke(self, tool_input):
+        self.calls += 1
+        response = self.fake.invoke(tool_input)
+        for result in response["results"]:
+            result["url"] += self.url_suffix
+        return response
+
+
+def _age_answer(resources, jurisdiction, seconds):
+    # An entry written `seconds` ago, as the prewarm pass would find it near expiry.
+    with resources.answer_cache._lock:
+        resources.answer_cache._conn.execute("UPDATE answer_cache SET created_at = created_at - ?", (seconds,))
+        resources.answer_cache._conn.commit()
+    assert resources.answer_cache.age(*jurisdiction) >= seconds
+
+
+def test_prewarm_searches_the_web_past_cached_sources(fakes):
+    from src.resources import resources
+
+    _, fake_search = fakes
+    jurisdiction = ("deck", "Austin", "TX")
+    # The fake's sources are all .gov, so the planner stops after the first wave.
+    planned = len([item for item in plan_queries(*jurisdiction)[1] if item["wave"] == 1])
+    assert prewarm_jurisdiction(*jurisdiction) == "refreshed"
+
+    # Same sources on the web: the TTL restarts, but only after asking the web again.
+    unchanged = CountingSearchTool(fake_search)
+    resources.override("search_tool", unchanged)
+    _age_answer(resources, jurisdiction, 6.5 * 24 * 3600)
+    assert prewarm_jurisdiction(*jurisdiction) == "touched"
+    assert unchanged.calls >= planned
+    assert resources.answer_cache.age(*jurisdiction) < 60
+
+    # Changed sources replace the answer and the cached search responses.
+    changed = CountingSearchTool(fake_search, url_suffix="/v2")
+    resources.override("search_tool", changed)
+    assert prewarm_jurisdiction(*jurisdiction) == "refreshed"
+    assert changed.calls >= planned
+    query = plan_queries(*jurisdiction)[1][0]["query"]
+    cached = resources.search_cache.get(query)
+    assert cached is not None and cached["results"][0]["url"].endswith("/v2")
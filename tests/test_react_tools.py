@@ -0,0 +1,22 @@
+import pytest
+
+from src.context import estimate_tokens
+from src.react_tools import compact_tool_output
+
+RESPONSE = {"results": [
+    {"title": f"ADU permits Austin {i}", "url": f"https://austintexas.gov/adu/{i}",
+     "content": "Permit rules for accessory dwelling units in Austin. " * 40}
+    for i in range(3)
+]}
+
+
+@pytest.mark.parametrize("max_tokens", [100, 40])
+def test_small_budget_still_returns_sources(max_tokens):
+    text = compact_tool_output(RESPONSE, "adu permits austin", max_tokens)
+    assert "https://austintexas.gov/adu/" in text
+    assert estimate_tokens(text) <= max_tokens + 1
+
+
+def test_budget_too_small_for_any_chunk_truncates_the_raw_output():
+    text = compact_tool_output(RESPONSE, "adu permits austin", 10)
+    assert text and estimate_tokens(text) <= 11
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.service import ChatRequest, _Admission, api, chat
+
+
+def test_requests_dropped_before_streaming_do_not_hold_queue_places():
+    async def scenario():
+        admission = _Admission(max_concurrency=1, max_queue=1)
+        api.state.admission, api.state.graph = admission, None
+        await admission.slots.acquire()  # the only worker slot is busy
+        for _ in range(5):
+            response = await chat(ChatRequest(message="hi"))
+            await response.body_iterator.aclose()  # client went away before the stream started
+        assert admission.waiting == 0
+        admission.admit()
+
+        # A stream that starts waits in the queue; the next request is turned away until it leaves.
+        response = await chat(ChatRequest(message="hi"))
+        waiting = asyncio.ensure_future(response.body_iterator.__anext__())
+        await asyncio.sleep(0)
+        assert admission.waiting == 1
+        with pytest.raises(HTTPException):
+            admission.admit()
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert admission.waiting == 0
+
+    asyncio.run(scenario())